@@ -1,29 +1,40 @@
+import os
+
 from beeai_framework.adapters.a2a import A2AServer, A2AServerConfig
 from beeai_framework.agents.requirement import RequirementAgent
 from beeai_framework.backend import ChatModel
-from beeai_framework.memory import UnconstrainedMemory
 from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
-from beeai_framework.serve.utils import LRUMemoryManager
 from beeai_framework.tools.search.duckduckgo import DuckDuckGoSearchTool
 from beeai_framework.tools.weather import OpenMeteoTool
 from dotenv import load_dotenv
 
+from beeai_framework_starter.helpers.memory_manager import PersistentMemoryManager
+from beeai_framework_starter.helpers.session_memory import BoundedSessionMemory
+
 load_dotenv()
 
 
 def main() -> None:
+    llm = ChatModel.from_name("ollama:granite3.3:8b")
     agent = RequirementAgent(
-        llm=ChatModel.from_name("ollama:granite3.3:8b"),
+        llm=llm,
         tools=[DuckDuckGoSearchTool(), OpenMeteoTool()],
-        memory=UnconstrainedMemory(),
+        # Cloned for every A2A session (context id), each bounded to its last turns plus a summary
+        memory=BoundedSessionMemory(llm),
         middlewares=[GlobalTrajectoryMiddleware(included=[ChatModel])],
     )
 
-    server = A2AServer(
-        config=A2AServerConfig(port=9999, protocol="jsonrpc"), memory_manager=LRUMemoryManager(maxsize=100)
+    # Sessions live in SQLite, so several server processes can share them without sticky sessions
+    memory_manager = PersistentMemoryManager(
+        {"path": os.getenv("A2A_MEMORY_PATH", "tmp/a2a_memory.sqlite"), "cache_size": 100},
+        memory_factory=lambda: BoundedSessionMemory(llm),
     )
+    server = A2AServer(config=A2AServerConfig(port=9999, protocol="jsonrpc"), memory_manager=memory_manager)
     server.register(agent)
-    server.serve()
+    try:
+        server.serve()
+    finally:
+        memory_manager.close()
 
 
 if __name__ == "__main__":
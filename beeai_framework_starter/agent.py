@@ -15,23 +15,31 @@ from beeai_framework.tools.weather import OpenMeteoTool
 from dotenv import load_dotenv
 
 from beeai_framework_starter.helpers.io import ConsoleReader
+from beeai_framework_starter.helpers.parallel_tools import bounded_tools
+from beeai_framework_starter.helpers.tool_cache import ToolCacheMiddleware
 
 load_dotenv()
 
 
 async def main() -> None:
     agent = RequirementAgent(
-        llm=ChatModel.from_name(os.getenv("LLM_CHAT_MODEL_NAME", "ollama:granite3.3:8b")),
-        tools=[ThinkTool(), OpenMeteoTool(), DuckDuckGoSearchTool()],
+        llm=ChatModel.from_name(
+            os.getenv("LLM_CHAT_MODEL_NAME", "ollama:granite3.3:8b"), allow_parallel_tool_calls=True
+        ),
+        # Independent tool calls of one step (e.g. weather + search) run concurrently, each with a timeout
+        tools=bounded_tools(
+            [ThinkTool(), OpenMeteoTool(), DuckDuckGoSearchTool()], {"max_concurrency": 4, "timeout": 20}
+        ),
         instructions="Plan activities for a given destination based on current weather and events.",
         requirements=[
             ConditionalRequirement(ThinkTool, force_at_step=1, max_invocations=3),
-            ConditionalRequirement(
-                DuckDuckGoSearchTool, only_after=[OpenMeteoTool], min_invocations=1, max_invocations=2
-            ),
+            ConditionalRequirement(DuckDuckGoSearchTool, min_invocations=1, max_invocations=2),
+        ],
+        # Log intermediate steps to the console; repeated tool calls are answered from the cache
+        middlewares=[
+            GlobalTrajectoryMiddleware(included=[Tool]),
+            ToolCacheMiddleware({"disk_path": os.getenv("TOOL_CACHE_PATH")}),
         ],
-        # Log intermediate steps to the console
-        middlewares=[GlobalTrajectoryMiddleware(included=[Tool])],
     )
 
     reader = ConsoleReader({"fallback": "What to do in Boston?"})
@@ -6,11 +6,11 @@ import traceback
 from beeai_framework.agents.react import ReActAgent
 from beeai_framework.backend import ChatModel
 from beeai_framework.errors import FrameworkError
-from beeai_framework.memory import UnconstrainedMemory
 from beeai_framework.tools.code import LocalPythonStorage, PythonTool, SandboxTool
 from dotenv import load_dotenv
 
 from beeai_framework_starter.helpers.io import ConsoleReader
+from beeai_framework_starter.helpers.session_memory import BoundedSessionMemory
 
 load_dotenv()
 
@@ -61,7 +61,8 @@ def get_riddle() -> Optional[Dict[str, str]]:
 """,
     )
 
-    agent = ReActAgent(llm=llm, tools=[python_tool, sandbox_tool], memory=UnconstrainedMemory())
+    # Keeps the last turns verbatim and summarizes older ones, so long sessions don't grow the prompt
+    agent = ReActAgent(llm=llm, tools=[python_tool, sandbox_tool], memory=BoundedSessionMemory(llm))
 
     reader = ConsoleReader({"fallback": "Generate a random riddle."})
 
@@ -14,28 +14,34 @@ from beeai_framework.tools.tool import Tool
 from beeai_framework.tools.weather import OpenMeteoTool
 from dotenv import load_dotenv
 
-from beeai_framework_starter.helpers.instrumentation import setup_observability
+from beeai_framework_starter.helpers.instrumentation import setup_metrics, setup_observability
 from beeai_framework_starter.helpers.io import ConsoleReader
+from beeai_framework_starter.helpers.metrics import AgentMetricsMiddleware
+from beeai_framework_starter.helpers.parallel_tools import bounded_tools
 
 load_dotenv()
 
 # Enable OpenTelemetry integration
 setup_observability("http://localhost:6006/v1/traces")
+setup_metrics(os.getenv("OTEL_METRICS_ENDPOINT", "http://localhost:4318/v1/metrics"))
 
 
 async def main() -> None:
     agent = RequirementAgent(
-        llm=ChatModel.from_name(os.getenv("LLM_CHAT_MODEL_NAME", "ollama:granite3.3:8b")),
-        tools=[ThinkTool(), OpenMeteoTool(), DuckDuckGoSearchTool()],
+        llm=ChatModel.from_name(
+            os.getenv("LLM_CHAT_MODEL_NAME", "ollama:granite3.3:8b"), allow_parallel_tool_calls=True
+        ),
+        # Independent tool calls of one step (e.g. weather + search) run concurrently, each with a timeout
+        tools=bounded_tools(
+            [ThinkTool(), OpenMeteoTool(), DuckDuckGoSearchTool()], {"max_concurrency": 4, "timeout": 20}
+        ),
         instructions="Plan activities for a given destination based on current weather and events.",
         requirements=[
             ConditionalRequirement(ThinkTool, force_at_step=1, max_invocations=3),
-            ConditionalRequirement(
-                DuckDuckGoSearchTool, only_after=[OpenMeteoTool], min_invocations=1, max_invocations=2
-            ),
+            ConditionalRequirement(DuckDuckGoSearchTool, min_invocations=1, max_invocations=2),
         ],
-        # Log intermediate steps to the console
-        middlewares=[GlobalTrajectoryMiddleware(included=[Tool])],
+        # Log intermediate steps to the console and record iteration / tool / token metrics
+        middlewares=[GlobalTrajectoryMiddleware(included=[Tool]), AgentMetricsMiddleware()],
     )
 
     reader = ConsoleReader({"fallback": "What to do in Boston?"})
@@ -8,15 +8,17 @@ from beeai_framework.tools.search.duckduckgo import DuckDuckGoSearchTool
 from beeai_framework.tools.think import ThinkTool
 from beeai_framework.tools.weather import OpenMeteoTool
 
+from beeai_framework_starter.helpers.parallel_tools import bounded_tools
+
 
 async def main() -> None:
     agent = RequirementAgent(
-        llm=ChatModel.from_name("ollama:granite3.3:8b"),
-        tools=[ThinkTool(), OpenMeteoTool(), DuckDuckGoSearchTool()],
+        llm=ChatModel.from_name("ollama:granite3.3:8b", allow_parallel_tool_calls=True),
+        tools=bounded_tools([ThinkTool(), OpenMeteoTool(), DuckDuckGoSearchTool()], {"timeout": 20}),
         instructions="Plan activities for a given destination based on current weather and events.",
         requirements=[
             ConditionalRequirement(ThinkTool, force_at_step=1),
-            ConditionalRequirement(DuckDuckGoSearchTool, only_after=[OpenMeteoTool], min_invocations=1),
+            ConditionalRequirement(DuckDuckGoSearchTool, min_invocations=1),
         ],
     )
 
@@ -13,6 +13,7 @@ from beeai_framework.tools.weather import OpenMeteoTool
 from dotenv import load_dotenv
 
 from beeai_framework_starter.helpers.io import ConsoleReader
+from beeai_framework_starter.helpers.tool_cache import ToolCacheMiddleware
 
 load_dotenv()
 
@@ -21,13 +22,14 @@ async def main() -> None:
     llm = ChatModel.from_name(os.getenv("LLM_CHAT_MODEL_NAME", "ollama:granite3.3:8b"))
     agent = ToolCallingAgent(llm=llm, tools=[DuckDuckGoSearchTool(), OpenMeteoTool()], memory=TokenMemory(llm))
 
+    tool_cache = ToolCacheMiddleware({"disk_path": os.getenv("TOOL_CACHE_PATH")})
     reader = ConsoleReader({"fallback": "What is the current weather in Las Vegas?"})
 
     def on_success(data: ToolCallingAgentSuccessEvent, event: EventMeta) -> None:
         reader.write("Agent 🤖(update) : ", str(data.state.memory.messages[-1].to_plain()))
 
     for prompt in reader:
-        response = await agent.run(prompt).on("success", on_success)
+        response = await agent.run(prompt).on("success", on_success).middleware(tool_cache)
         reader.write("Agent 🤖 : ", response.last_message.text)
 
 
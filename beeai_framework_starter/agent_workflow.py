@@ -7,17 +7,19 @@ from beeai_framework.backend import ChatModel
 from beeai_framework.errors import FrameworkError
 from beeai_framework.tools.search.wikipedia import WikipediaTool
 from beeai_framework.tools.weather import OpenMeteoTool
-from beeai_framework.workflows.agent import AgentWorkflow, AgentWorkflowInput
+from beeai_framework.workflows.agent import AgentWorkflowInput
 from dotenv import load_dotenv
 
+from beeai_framework_starter.helpers.concurrent_workflow import ConcurrentAgentWorkflow, ConcurrentSchema
 from beeai_framework_starter.helpers.io import ConsoleReader
+from beeai_framework_starter.helpers.tool_cache import ToolCacheMiddleware
 
 load_dotenv()
 
 
 async def main() -> None:
     llm = ChatModel.from_name(os.getenv("LLM_CHAT_MODEL_NAME", "ollama:granite3.3:8b"))
-    workflow = AgentWorkflow(name="Smart assistant")
+    workflow = ConcurrentAgentWorkflow(name="Smart assistant")
 
     workflow.add_agent(
         name="Researcher",
@@ -33,6 +35,7 @@ async def main() -> None:
         instructions="You provide detailed weather reports.",
         tools=[OpenMeteoTool()],
         llm=llm,
+        depends_on=[],  # independent of the Researcher, so both run at the same time
     )
 
     workflow.add_agent(
@@ -40,30 +43,42 @@ async def main() -> None:
         role="A meticulous and creative data synthesizer",
         instructions="You can combine disparate information into a final coherent summary.",
         llm=llm,
+        depends_on=["Researcher", "WeatherForecaster"],
     )
 
+    # Shared by all runs, so asking about the same location again skips the Wikipedia / weather calls
+    tool_cache = ToolCacheMiddleware({"disk_path": os.getenv("TOOL_CACHE_PATH")})
     reader = ConsoleReader()
 
+    def report(step: str, state: ConcurrentSchema) -> None:
+        # A step runs one or more agents concurrently
+        for name in workflow.agents_of(step):
+            reader.write(
+                f"-> Step '{name}' has been completed with the following outcome:\n", state.final_answers[name]
+            )
+
     reader.write("Assistant 🤖 : ", "What location do you want to learn about?")
     for prompt in reader:
-        await workflow.run(
-            inputs=[
-                AgentWorkflowInput(prompt="Provide a short history of the location.", context=prompt),
-                AgentWorkflowInput(
-                    prompt="Provide a comprehensive weather summary for the location today.",
-                    expected_output="Essential weather details such as chance of rain, temperature and wind. Only report information that is available.",  # noqa: E501
-                ),
-                AgentWorkflowInput(
-                    prompt="Summarize the historical and weather data for the location.",
-                    expected_output="A paragraph that describes the history of the location, followed by the current weather conditions.",  # noqa: E501
-                ),
-            ]
-        ).on(
-            "success",
-            lambda data, event: reader.write(
-                f"-> Step '{data.step}' has been completed with the following outcome:\n",
-                data.state.final_answer,
-            ),
+        await (
+            workflow.run(
+                inputs=[
+                    AgentWorkflowInput(prompt="Provide a short history of the location.", context=prompt),
+                    AgentWorkflowInput(
+                        prompt="Provide a comprehensive weather summary for the location today.",
+                        context=prompt,
+                        expected_output="Essential weather details such as chance of rain, temperature and wind. Only report information that is available.",  # noqa: E501
+                    ),
+                    AgentWorkflowInput(
+                        prompt="Summarize the historical and weather data for the location.",
+                        expected_output="A paragraph that describes the history of the location, followed by the current weather conditions.",  # noqa: E501
+                    ),
+                ]
+            )
+            .on(
+                "success",
+                lambda data, event: report(data.step, data.state),
+            )
+            .middleware(tool_cache)
         )
         reader.write("Assistant 🤖 : ", "What location do you want to learn about?")
 
@@ -0,0 +1,139 @@
+import asyncio
+from collections.abc import Callable, Coroutine, Sequence
+from typing import Any
+
+from beeai_framework.backend.message import AnyMessage
+from beeai_framework.context import Run
+from beeai_framework.workflows.agent import AgentWorkflow, AgentWorkflowInput
+from beeai_framework.workflows.agent.agent import Schema
+from beeai_framework.workflows.types import WorkflowRun
+from pydantic import Field, InstanceOf
+
+AgentStep = Callable[[Schema], Coroutine[Any, Any, None]]
+
+STEP_SEPARATOR = "+"
+
+
+class ConcurrentSchema(Schema):
+    # Messages each agent added, and each agent's answer, by agent name.
+    messages_by_agent: dict[str, list[InstanceOf[AnyMessage]]] = Field(default_factory=dict)
+    final_answers: dict[str, str] = Field(default_factory=dict)
+
+
+class ConcurrentAgentWorkflow(AgentWorkflow):
+    """
+    AgentWorkflow whose agents declare what they depend on; agents whose dependencies are done run concurrently.
+
+    `add_agent(..., depends_on=[...])` names earlier agents whose output this agent needs; `depends_on=None`
+    (default) depends on every earlier agent, which is the sequential AgentWorkflow behavior, and `[]` only on
+    the run inputs. Each agent sees the messages of its (transitive) dependencies in declaration order. Agents
+    of one level run as one workflow step named "A+B"; their messages are joined in declaration order before
+    the next level, so a downstream synthesizer sees the same context as in the sequential workflow.
+    Inputs are matched to agents in declaration order, as in AgentWorkflow.
+    """
+
+    def __init__(self, name: str = "AgentWorkflow") -> None:
+        super().__init__(name)
+        self._agents: dict[str, AgentStep] = {}
+        self._dependencies: dict[str, set[str]] = {}
+
+    def add_agent(
+        self, instance: Any = None, /, *, depends_on: Sequence[str] | None = None, **kwargs: Any
+    ) -> "ConcurrentAgentWorkflow":
+        known = list(self._agents)
+        unknown = [name for name in depends_on or [] if name not in self._agents]
+        if unknown:
+            raise ValueError(f"Unknown dependencies {unknown}; add those agents first (known: {known}).")
+
+        # Let AgentWorkflow build the agent's step on an empty workflow, then take it over.
+        # AgentWorkflow accepts `name` for instances too; it is the step name dependencies refer to.
+        self._clear_steps()
+        super().add_agent(instance, **kwargs)
+        name = self.workflow.step_names[0]
+        handler = self.workflow.steps[name].handler
+        self.workflow.delete_step(name)
+        if name in self._agents:
+            self._build_steps()
+            raise ValueError(f"The name '{name}' has already been used!")
+        self._agents[name] = handler  # type: ignore[assignment]
+
+        direct = set(known if depends_on is None else depends_on)
+        self._dependencies[name] = direct.union(*(self._dependencies[dep] for dep in direct))
+        self._build_steps()
+        return self
+
+    def del_agent(self, name: str) -> "ConcurrentAgentWorkflow":
+        dependents = [agent for agent, deps in self._dependencies.items() if name in deps]
+        if dependents:
+            raise ValueError(f"Agent '{name}' is required by {dependents}.")
+        del self._agents[name], self._dependencies[name]
+        self._build_steps()
+        return self
+
+    def levels(self) -> list[list[str]]:
+        """Agents grouped by execution order; agents within a level run concurrently."""
+        depth: dict[str, int] = {}
+        for name in self._agents:  # dependencies are always declared earlier
+            depth[name] = max((depth[dep] + 1 for dep in self._dependencies[name]), default=0)
+        return [[name for name in self._agents if depth[name] == level] for level in range(max(depth.values()) + 1)]
+
+    def agents_of(self, step: str) -> list[str]:
+        return step.split(STEP_SEPARATOR)
+
+    def run(self, inputs: Sequence[AgentWorkflowInput | AnyMessage]) -> Run[WorkflowRun[Any, Any]]:
+        schema = ConcurrentSchema(
+            inputs=[
+                input if isinstance(input, AgentWorkflowInput) else AgentWorkflowInput.from_message(input)
+                for input in inputs
+            ],
+        )
+        return self.workflow.run(schema)
+
+    def _clear_steps(self) -> None:
+        for step in self.workflow.step_names:
+            self.workflow.delete_step(step)
+
+    def _build_steps(self) -> None:
+        self._clear_steps()
+        if not self._agents:
+            return
+        order = list(self._agents)
+        for level in self.levels():
+            self.workflow.add_step(STEP_SEPARATOR.join(level), self._level_step(level, order))
+
+    def _level_step(self, level: list[str], order: list[str]) -> AgentStep:
+        async def step(state: Schema) -> None:
+            assert isinstance(state, ConcurrentSchema)
+            # Inputs are consumed in declaration order, whatever level the agents land in.
+            inputs = {name: state.inputs[order.index(name)] for name in level if order.index(name) < len(state.inputs)}
+            agent_states = {
+                name: Schema(
+                    inputs=[inputs[name]] if name in inputs else [],
+                    new_messages=[
+                        message
+                        for dep in order
+                        if dep in self._dependencies[name]
+                        for message in state.messages_by_agent.get(dep, [])
+                    ],
+                )
+                for name in level
+            }
+            context_sizes = {name: len(agent_state.new_messages) for name, agent_state in agent_states.items()}
+
+            tasks = [asyncio.create_task(self._agents[name](agent_states[name])) for name in level]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+            for name in level:
+                produced = agent_states[name].new_messages[context_sizes[name] :]
+                state.messages_by_agent[name] = produced
+                state.new_messages.extend(produced)
+                state.final_answers[name] = agent_states[name].final_answer or ""
+                state.final_answer = agent_states[name].final_answer
+                state.current_input = agent_states[name].current_input
+
+        return step
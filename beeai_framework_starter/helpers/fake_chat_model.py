@@ -0,0 +1,79 @@
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+
+from beeai_framework.backend import AssistantMessage, ChatModel
+from beeai_framework.backend.constants import ProviderName
+from beeai_framework.backend.types import ChatModelInput, ChatModelOutput, ChatModelUsage
+from beeai_framework.context import RunContext
+
+
+def _echo(messages: list[Any]) -> str:
+    last = messages[-1].text if messages else ""
+    return f"Echo: {last}"
+
+
+class FakeChatModel(ChatModel):
+    """
+    Deterministic, offline chat model for smoke tests and benchmarks.
+
+    The response is `respond(messages)` (echo of the last message by default): a text, or an AssistantMessage
+    (e.g. with tool calls) that is returned as is. Streaming yields a text response word by word; `latency` is
+    slept once before the first token and `token_latency` between tokens.
+    """
+
+    def __init__(
+        self,
+        respond: Callable[[list[Any]], str | AssistantMessage] = _echo,
+        *,
+        latency: float = 0.0,
+        token_latency: float = 0.0,
+        model_id: str = "fake-chat",
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self._respond = respond
+        self._latency = latency
+        self._token_latency = token_latency
+        self._model_id = model_id
+        self.calls = 0
+
+    @property
+    def model_id(self) -> str:
+        return self._model_id
+
+    @property
+    def provider_id(self) -> ProviderName:
+        return "beeai"
+
+    def _usage(self, input: ChatModelInput, text: str) -> ChatModelUsage:
+        prompt_tokens = sum(len(m.text.split()) for m in input.messages)
+        completion_tokens = len(text.split())
+        return ChatModelUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+
+    async def _create(self, input: ChatModelInput, run: RunContext) -> ChatModelOutput:
+        self.calls += 1
+        await asyncio.sleep(self._latency)
+        reply = self._respond(input.messages)
+        message = reply if isinstance(reply, AssistantMessage) else AssistantMessage(reply)
+        return ChatModelOutput(output=[message], usage=self._usage(input, message.text), finish_reason="stop")
+
+    async def _create_stream(self, input: ChatModelInput, run: RunContext) -> AsyncGenerator[ChatModelOutput]:
+        self.calls += 1
+        await asyncio.sleep(self._latency)
+        reply = self._respond(input.messages)
+        if isinstance(reply, AssistantMessage):
+            yield ChatModelOutput(output=[reply], usage=self._usage(input, reply.text), finish_reason="stop")
+            return
+        text = reply
+        words = text.split(" ")
+        for idx, word in enumerate(words):
+            if idx:
+                await asyncio.sleep(self._token_latency)
+            delta = word if idx == len(words) - 1 else f"{word} "
+            yield ChatModelOutput(output=[AssistantMessage(delta)])
+        yield ChatModelOutput(output=[], usage=self._usage(input, text), finish_reason="stop")
@@ -0,0 +1,44 @@
+import math
+import re
+import zlib
+
+from beeai_framework.backend import EmbeddingModel
+from beeai_framework.backend.constants import ProviderName
+from beeai_framework.backend.types import EmbeddingModelInput, EmbeddingModelOutput
+from beeai_framework.context import RunContext
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class FakeEmbeddingModel(EmbeddingModel):
+    """
+    Deterministic, offline embedding model for smoke tests and benchmarks.
+
+    Each text becomes an L2-normalized hashed bag of words of size `dim`, so texts sharing words are close
+    under cosine similarity and the same text always maps to the same vector.
+    """
+
+    def __init__(self, dim: int = 64, *, model_id: str = "fake-embedding") -> None:
+        super().__init__()
+        self.dim = dim
+        self._model_id = model_id
+        self.calls = 0
+
+    @property
+    def model_id(self) -> str:
+        return self._model_id
+
+    @property
+    def provider_id(self) -> ProviderName:
+        return "beeai"
+
+    def embed(self, text: str) -> list[float]:
+        vec = [0.0] * self.dim
+        for token in _TOKEN_RE.findall(text.lower()):
+            vec[zlib.crc32(token.encode("utf-8")) % self.dim] += 1.0
+        norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+        return [x / norm for x in vec]
+
+    async def _create(self, input: EmbeddingModelInput, run: RunContext) -> EmbeddingModelOutput:
+        self.calls += 1
+        return EmbeddingModelOutput(values=input.values, embeddings=[self.embed(text) for text in input.values])
@@ -1,20 +1,194 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from beeai_framework.utils.models import ModelLike, to_model_optional
 from openinference.instrumentation.beeai import BeeAIInstrumentor
+from opentelemetry import context as context_api
+from opentelemetry import metrics as metrics_api
 from opentelemetry import trace as trace_api
+from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
 from opentelemetry.sdk import trace as trace_sdk
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import MetricReader, PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, Sampler, TraceIdRatioBased
+from opentelemetry.trace import StatusCode
+from pydantic import BaseModel
+
+
+class TailSamplingOptions(BaseModel):
+    latency_threshold_ms: float = 1000.0
+    keep_errors: bool = True
+    max_pending_traces: int = 1000
+
+
+class ObservabilityOptions(BaseModel):
+    batch: bool = True
+    # None falls back to the OTEL_BSP_* environment variables / SDK defaults.
+    max_queue_size: int | None = None
+    max_export_batch_size: int | None = None
+    schedule_delay_millis: float | None = None
+    export_timeout_millis: float | None = None
+    sample_ratio: float = 1.0
+    parent_based: bool = True
+    tail_sampling: TailSamplingOptions | None = None
+    file_path: str | None = None
+
+
+class MetricsOptions(BaseModel):
+    export_interval_millis: float = 10000.0
+    export_timeout_millis: float = 10000.0
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends finished spans as JSON lines to a local file (offline runs)."""
 
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "a", encoding="utf-8")  # noqa: SIM115
+        self._lock = threading.Lock()
 
-def setup_observability(endpoint: str = "http://localhost:6006/v1/traces") -> None:
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        with self._lock:
+            for span in spans:
+                self._file.write(span.to_json(indent=None) + "\n")
+            self._file.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
     """
-    Sets up OpenTelemetry with OTLP HTTP exporter and instruments the beeai framework.
+    Buffers the spans of each trace until its local root span ends, then forwards the whole trace to the
+    downstream processors only if it was slow (root duration >= latency_threshold_ms) or contains an error.
     """
 
+    def __init__(self, downstream: Sequence[SpanProcessor], options: TailSamplingOptions) -> None:
+        self._downstream = list(downstream)
+        self._options = options
+        self._pending: OrderedDict[int, list[ReadableSpan]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span: trace_sdk.Span, parent_context: context_api.Context | None = None) -> None:
+        for processor in self._downstream:
+            processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context is None:
+            return
+        trace_id = span.context.trace_id
+        with self._lock:
+            spans = self._pending.setdefault(trace_id, [])
+            spans.append(span)
+            while len(self._pending) > self._options.max_pending_traces:
+                self._pending.popitem(last=False)  # traces whose root never ended are dropped
+            if span.parent is not None and not span.parent.is_remote:
+                return
+            del self._pending[trace_id]
+        if self._keep(span, spans):
+            for buffered in spans:
+                for processor in self._downstream:
+                    processor.on_end(buffered)
+
+    def _keep(self, root: ReadableSpan, spans: list[ReadableSpan]) -> bool:
+        if self._options.keep_errors and any(s.status.status_code == StatusCode.ERROR for s in spans):
+            return True
+        if root.start_time is None or root.end_time is None:
+            return True
+        return (root.end_time - root.start_time) / 1e6 >= self._options.latency_threshold_ms
+
+    def shutdown(self) -> None:
+        for processor in self._downstream:
+            processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return all(processor.force_flush(timeout_millis) for processor in self._downstream)
+
+
+def _sampler(options: ObservabilityOptions) -> Sampler:
+    ratio = TraceIdRatioBased(options.sample_ratio)
+    return ParentBased(root=ratio) if options.parent_based else ratio
+
+
+def _export_processor(exporter: SpanExporter, options: ObservabilityOptions) -> SpanProcessor:
+    if not options.batch:
+        return SimpleSpanProcessor(exporter)
+    return BatchSpanProcessor(
+        exporter,
+        max_queue_size=options.max_queue_size,
+        max_export_batch_size=options.max_export_batch_size,
+        schedule_delay_millis=options.schedule_delay_millis,
+        export_timeout_millis=options.export_timeout_millis,
+    )
+
+
+def setup_observability(
+    endpoint: str | None = "http://localhost:6006/v1/traces",
+    options: ModelLike[ObservabilityOptions] | None = None,
+) -> trace_sdk.TracerProvider:
+    """
+    Sets up OpenTelemetry and instruments the beeai framework.
+
+    Spans are exported off the request path by a BatchSpanProcessor (OTLP HTTP to `endpoint`, and/or a JSONL
+    file with `file_path`). Head sampling is ratio-based (parent-based by default); optional tail sampling keeps
+    only slow or errored traces.
+    """
+
+    opts = to_model_optional(ObservabilityOptions, options) or ObservabilityOptions()
+    exporters: list[SpanExporter] = []
+    if endpoint:
+        exporters.append(OTLPSpanExporter(endpoint))
+    if opts.file_path:
+        exporters.append(FileSpanExporter(opts.file_path))
+
     resource = Resource(attributes={})
-    tracer_provider = trace_sdk.TracerProvider(resource=resource)
-    tracer_provider.add_span_processor(SimpleSpanProcessor(OTLPSpanExporter(endpoint)))
-    # tracer_provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+    tracer_provider = trace_sdk.TracerProvider(resource=resource, sampler=_sampler(opts))
+    processors = [_export_processor(exporter, opts) for exporter in exporters]
+    if opts.tail_sampling is not None:
+        tracer_provider.add_span_processor(TailSamplingSpanProcessor(processors, opts.tail_sampling))
+    else:
+        for processor in processors:
+            tracer_provider.add_span_processor(processor)
     trace_api.set_tracer_provider(tracer_provider)
 
     BeeAIInstrumentor().instrument()
+    return tracer_provider
+
+
+def setup_metrics(
+    endpoint: str | None = "http://localhost:4318/v1/metrics",
+    options: ModelLike[MetricsOptions] | None = None,
+    readers: Sequence[MetricReader] = (),
+) -> MeterProvider:
+    """
+    Sets up the global OpenTelemetry MeterProvider used by AgentMetricsMiddleware.
+
+    Metrics are pushed to `endpoint` (OTLP HTTP) every `export_interval_millis`; extra `readers` (e.g. an
+    InMemoryMetricReader) are attached as well.
+    """
+
+    opts = to_model_optional(MetricsOptions, options) or MetricsOptions()
+    metric_readers = list(readers)
+    if endpoint:
+        metric_readers.append(
+            PeriodicExportingMetricReader(
+                OTLPMetricExporter(endpoint),
+                export_interval_millis=opts.export_interval_millis,
+                export_timeout_millis=opts.export_timeout_millis,
+            )
+        )
+
+    meter_provider = MeterProvider(metric_readers=metric_readers, resource=Resource(attributes={}))
+    metrics_api.set_meter_provider(meter_provider)
+    return meter_provider
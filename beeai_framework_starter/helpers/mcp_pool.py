@@ -0,0 +1,350 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import sqlite3
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Self
+
+import anyio
+from beeai_framework.context import RunContext
+from beeai_framework.logger import Logger
+from beeai_framework.tools import ToolError
+from beeai_framework.tools.mcp import MCPClient, MCPTool
+from beeai_framework.tools.types import JSONToolOutput, ToolRunOptions
+from beeai_framework.utils.models import ModelLike, to_model_optional
+from beeai_framework.utils.strings import to_json
+from mcp import ClientSession, StdioServerParameters, stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, CallToolResult, ServerNotification, TextContent, ToolListChangedNotification
+from mcp.types import Tool as MCPToolInfo
+from pydantic import BaseModel
+
+logger = Logger(__name__)
+
+
+class MCPPoolOptions(BaseModel):
+    # SQLite file with the tool schemas of every server seen, shared across processes; None = in-memory only.
+    schema_cache_path: str | None = "tmp/mcp_tool_schemas.sqlite"
+    # With cached schemas, tools are returned without connecting; the session opens on the first tool call.
+    lazy_connect: bool = True
+    connect_timeout_s: float = 30.0
+    call_timeout_s: float | None = 300.0
+    # A call that fails because the connection dropped is retried on a fresh session this many times.
+    reconnect_attempts: int = 1
+
+
+class MCPEndpoint:
+    """An MCP server the pool can (re)connect to: a stable identity and a factory for a new client transport."""
+
+    def __init__(self, identity: str, connect: Callable[[], MCPClient]) -> None:
+        self.identity = identity
+        self.connect = connect
+
+    @classmethod
+    def stdio(cls, params: StdioServerParameters) -> "MCPEndpoint":
+        env = hashlib.sha256(json.dumps(params.env or {}, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        identity = f"stdio:{json.dumps([params.command, *params.args])}@{params.cwd or '.'}#{env}"
+        return cls(identity, lambda: stdio_client(params))
+
+    @classmethod
+    def http(cls, url: str, headers: dict[str, str] | None = None) -> "MCPEndpoint":
+        identity = f"http:{url}"
+        if headers:
+            identity += "#" + hashlib.sha256(json.dumps(headers, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        return cls(identity, lambda: streamablehttp_client(url, headers=headers))
+
+
+class _SchemaStore:
+    def __init__(self, path: str | None) -> None:
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mcp_tool_schemas ("
+            " identity TEXT PRIMARY KEY, server_version TEXT NOT NULL, tools TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, identity: str) -> tuple[str, list[MCPToolInfo]] | None:
+        row = self._conn.execute(
+            "SELECT server_version, tools FROM mcp_tool_schemas WHERE identity = ?", (identity,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], [MCPToolInfo.model_validate(tool) for tool in json.loads(row[1])]
+
+    def put(self, identity: str, server_version: str, tools: list[MCPToolInfo]) -> None:
+        data = json.dumps([tool.model_dump(mode="json", exclude_none=True) for tool in tools], separators=(",", ":"))
+        self._conn.execute(
+            "INSERT INTO mcp_tool_schemas (identity, server_version, tools, updated_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(identity) DO UPDATE SET"
+            " server_version = excluded.server_version, tools = excluded.tools, updated_at = excluded.updated_at",
+            (identity, server_version, data, time.time()),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class _Connection:
+    """One live ClientSession, owned by a background task (transport contexts must exit in the task that entered)."""
+
+    def __init__(self) -> None:
+        self.session: ClientSession | None = None
+        self.server_version = ""
+        self.ready = asyncio.Event()
+        self.stop = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.error: Exception | None = None
+        self.task: asyncio.Task[None] | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and not self.closed.is_set() and not self.stop.is_set()
+
+
+class _PooledServer:
+    def __init__(
+        self, endpoint: MCPEndpoint, options: MCPPoolOptions, store: _SchemaStore, stats: dict[str, int]
+    ) -> None:
+        self.endpoint = endpoint
+        self.options = options
+        self._store = store
+        self._stats = stats
+        self._lock = asyncio.Lock()
+        self._connection: _Connection | None = None
+        self._stale = False
+        cached = store.get(endpoint.identity)
+        self.server_version, tools = cached if cached is not None else ("", [])
+        self.tools: dict[str, MCPToolInfo] = {tool.name: tool for tool in tools}
+
+    @property
+    def cached(self) -> bool:
+        return bool(self.server_version)
+
+    async def connection(self) -> _Connection:
+        async with self._lock:
+            if self._connection is None or not self._connection.alive:
+                await self._disconnect()
+                self._connection = await self._connect()
+            if self._stale:
+                await self._refresh_tools(self._connection)
+            return self._connection
+
+    async def _connect(self) -> _Connection:
+        connection = _Connection()
+
+        async def on_message(message: Any) -> None:
+            if isinstance(message, Exception):
+                logger.warning(f"MCP transport error ({self.endpoint.identity}): {message}")
+                connection.stop.set()
+            elif isinstance(message, ServerNotification) and isinstance(message.root, ToolListChangedNotification):
+                self._stale = True
+
+        async def run() -> None:
+            timeout = timedelta(seconds=self.options.call_timeout_s) if self.options.call_timeout_s else None
+            try:
+                async with (
+                    self.endpoint.connect() as (read, write, *_),
+                    ClientSession(read, write, read_timeout_seconds=timeout, message_handler=on_message) as session,
+                ):
+                    result = await session.initialize()
+                    connection.session = session
+                    connection.server_version = f"{result.serverInfo.name}@{result.serverInfo.version}"
+                    connection.ready.set()
+                    await connection.stop.wait()
+            except Exception as e:
+                connection.error = e
+            finally:
+                connection.closed.set()
+                connection.ready.set()
+
+        connection.task = asyncio.create_task(run())
+        try:
+            async with asyncio.timeout(self.options.connect_timeout_s):
+                await connection.ready.wait()
+        except TimeoutError:
+            connection.task.cancel()
+            raise ConnectionError(f"MCP server {self.endpoint.identity} did not initialize in time") from None
+        if connection.session is None or connection.closed.is_set():
+            raise ConnectionError(f"Cannot connect to MCP server {self.endpoint.identity}") from connection.error
+
+        self._stats["connects"] += 1
+        if connection.server_version != self.server_version or not self.tools:
+            await self._refresh_tools(connection)
+        return connection
+
+    async def _refresh_tools(self, connection: _Connection) -> None:
+        assert connection.session is not None
+        tools: list[MCPToolInfo] = []
+        cursor: str | None = None
+        while True:
+            page = await connection.session.list_tools(cursor)
+            tools.extend(page.tools)
+            if not (cursor := page.nextCursor):
+                break
+        self._stats["schema_fetches"] += 1
+        self._stale = False
+        self.server_version = connection.server_version
+        self.tools = {tool.name: tool for tool in tools}
+        self._store.put(self.endpoint.identity, self.server_version, tools)
+
+    async def reset(self, connection: _Connection) -> None:
+        async with self._lock:
+            if self._connection is connection:
+                await self._disconnect()
+
+    async def _disconnect(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None or connection.task is None:
+            return
+        connection.stop.set()
+        try:
+            async with asyncio.timeout(5):
+                await asyncio.shield(connection.task)
+        except TimeoutError:
+            connection.task.cancel()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._disconnect()
+
+
+def _connection_lost(error: BaseException) -> bool:
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, anyio.ClosedResourceError | anyio.BrokenResourceError | ConnectionError)
+
+
+class PooledMCPTool(MCPTool):
+    """
+    MCPTool that takes its session from the pool on every call, so a dropped session is replaced transparently.
+    Its description and input schema follow the server's current listing: a tool handed out from the schema cache
+    picks up a new schema once the pool sees another server version or tools/list_changed.
+    """
+
+    def __init__(self, server: _PooledServer, tool: MCPToolInfo, **options: Any) -> None:
+        self._server = server
+        super().__init__(None, tool, **options)  # type: ignore[arg-type]
+
+    @property
+    def _tool(self) -> MCPToolInfo:
+        return self._server.tools.get(self._listed.name, self._listed)
+
+    @_tool.setter
+    def _tool(self, tool: MCPToolInfo) -> None:
+        self._listed = tool
+
+    async def _run(self, input_data: Any, options: ToolRunOptions | None, context: RunContext) -> JSONToolOutput:
+        attempts = self._server.options.reconnect_attempts
+        validated = self._tool
+        for attempt in range(attempts + 1):
+            connection = await self._server.connection()
+            tool = self._server.tools.get(self._listed.name)
+            if tool is None:
+                raise ToolError(f"MCP server {self._server.endpoint.identity} no longer offers '{self._listed.name}'.")
+            if tool.inputSchema != validated.inputSchema:
+                # the schema changed after the input was validated (e.g. a cached schema on the first call)
+                input_data = self._validate_input(input_data.model_dump(exclude_unset=True))
+                validated = tool
+            # The session and schema of this attempt are passed in, never stored on the (shared) tool instance.
+            call = asyncio.create_task(self._call(connection, tool, input_data))
+            closed = asyncio.create_task(connection.closed.wait())
+            try:
+                await asyncio.wait({call, closed}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                closed.cancel()
+                if not call.done():
+                    call.cancel()
+            if not call.done() or call.cancelled():
+                error: BaseException = ConnectionError("MCP session closed during the call")
+            elif (error := call.exception()) is None:  # type: ignore[assignment]
+                return call.result()
+            if not _connection_lost(error):
+                raise error
+            await self._server.reset(connection)
+            if attempt == attempts:
+                raise ToolError(f"MCP server {self._server.endpoint.identity} connection lost: {error!r}") from error
+            logger.warning(f"MCP session to {self._server.endpoint.identity} lost, reconnecting: {error!r}")
+        raise AssertionError("unreachable")
+
+    async def _call(self, connection: _Connection, tool: MCPToolInfo, input_data: Any) -> JSONToolOutput:
+        """MCPTool._run against the given session (same result parsing)."""
+        if connection.session is None:
+            raise ConnectionError("MCP session is not connected")
+        result: CallToolResult = await connection.session.call_tool(
+            name=tool.name, arguments=input_data.model_dump(exclude_none=self._exclude_none, exclude_unset=True)
+        )
+        data_result: Any
+        if result.structuredContent is not None:
+            data_result = result.structuredContent
+        elif self._smart_parsing:
+            chunks: list[Any] = []
+            for chunk in result.content:
+                if isinstance(chunk, TextContent):
+                    with contextlib.suppress(json.JSONDecodeError):
+                        chunk = json.loads(chunk.text)
+                chunks.append(chunk)
+            data_result = chunks[0] if len(chunks) == 1 else chunks
+        else:
+            data_result = result.content
+        if result.isError:
+            error_context = (result.meta or {}).get("error_context")
+            raise ToolError(
+                to_json(data_result, indent=4, sort_keys=False),
+                context=error_context if isinstance(error_context, dict) else None,
+            )
+        return JSONToolOutput(data_result)
+
+    def __del__(self) -> None:
+        pass  # sessions belong to the pool
+
+    async def clone(self) -> Self:
+        options = {"smart_parsing": self._smart_parsing, "exclude_none": self._exclude_none, **(self._options or {})}
+        tool = self.__class__(self._server, self._listed.model_copy(), **options)
+        tool.middlewares.extend(self.middlewares)
+        tool._cache = await self.cache.clone()
+        return tool
+
+
+class MCPSessionPool:
+    """
+    Keeps one MCP session per server (stdio or streamable-http) alive across agent runs and reconnects it when it
+    drops. Tool schemas are cached by server identity (in SQLite, so a restarted process can skip the listing) and
+    re-listed only when the server reports another name@version at initialize or sends tools/list_changed.
+    """
+
+    def __init__(self, options: ModelLike[MCPPoolOptions] | None = None) -> None:
+        self.options = to_model_optional(MCPPoolOptions, options) or MCPPoolOptions()
+        self._store = _SchemaStore(self.options.schema_cache_path)
+        self._servers: dict[str, _PooledServer] = {}
+        self.stats = {"connects": 0, "schema_fetches": 0, "schema_cache_hits": 0}
+
+    async def tools(self, endpoint: MCPEndpoint, **tool_options: Any) -> list[PooledMCPTool]:
+        server = self._servers.get(endpoint.identity)
+        if server is None:
+            server = self._servers[endpoint.identity] = _PooledServer(endpoint, self.options, self._store, self.stats)
+        if server.cached and self.options.lazy_connect:
+            self.stats["schema_cache_hits"] += 1
+        else:
+            await server.connection()
+        return [PooledMCPTool(server, tool, **tool_options) for tool in server.tools.values()]
+
+    async def close(self) -> None:
+        servers, self._servers = list(self._servers.values()), {}
+        for server in servers:
+            with contextlib.suppress(Exception):
+                await server.close()
+        self._store.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
@@ -0,0 +1,255 @@
+import asyncio
+import contextlib
+import multiprocessing
+import queue
+import signal
+import socket
+import time
+from collections.abc import Callable, Generator
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+import httpx
+import uvicorn
+from beeai_framework.adapters.mcp import MCPServer
+from beeai_framework.utils.models import ModelLike, to_model_optional
+from pydantic import BaseModel
+
+HEALTH_PATH = "/health"
+
+ASGIApp = Callable[[Any, Any, Any], Any]
+
+
+class MCPWorkerOptions(BaseModel):
+    host: str = "127.0.0.1"
+    port: int = 7777
+    workers: int = 2
+    # Tool calls (POST requests) handled at once per worker; more wait for a slot, at most queue_timeout_s
+    # (None = wait forever), then get 503 with Retry-After.
+    max_concurrency: int = 16
+    queue_timeout_s: float | None = 30.0
+    # On shutdown, /health answers 503 for drain_notice_s while the worker still accepts requests (so a load
+    # balancer stops routing to it), then the listener closes and in-flight requests get drain_timeout_s to finish.
+    drain_notice_s: float = 1.0
+    drain_timeout_s: int = 30
+    ready_timeout_s: float = 60.0
+    log_level: str = "warning"
+
+
+class _WorkerApp:
+    """ASGI wrapper: /health probe and a per-worker limit on concurrent POST requests (tool calls)."""
+
+    def __init__(self, app: ASGIApp, options: MCPWorkerOptions, draining: Callable[[], bool]) -> None:
+        self._app = app
+        self._options = options
+        self._draining = draining
+        self._slots = asyncio.Semaphore(options.max_concurrency)
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+        if scope["path"] == HEALTH_PATH:
+            status, body = (503, b"draining") if self._draining() else (200, b"ok")
+            await self._respond(send, status, body)
+            return
+        if scope["method"] != "POST":
+            await self._app(scope, receive, send)
+            return
+
+        try:
+            async with asyncio.timeout(self._options.queue_timeout_s):
+                await self._slots.acquire()
+        except TimeoutError:
+            await self._respond(send, 503, b"worker busy", [(b"retry-after", b"1")])
+            return
+        try:
+            await self._app(scope, receive, send)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    async def _respond(send: Any, status: int, body: bytes, headers: list[tuple[bytes, bytes]] | None = None) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"text/plain"), *(headers or [])],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+class _DrainingServer(uvicorn.Server):
+    """uvicorn server whose SIGINT / SIGTERM first flips /health to draining and closes the listener later."""
+
+    def __init__(self, config: uvicorn.Config, drain_notice_s: float) -> None:
+        super().__init__(config)
+        self.draining = False
+        self._drain_notice_s = drain_notice_s
+
+    @contextlib.contextmanager
+    def capture_signals(self) -> Generator[None, None, None]:
+        loop = asyncio.get_running_loop()
+
+        def handle(sig: int, frame: Any) -> None:
+            if self.draining:
+                self.force_exit = sig == signal.SIGINT
+                return
+            self.draining = True
+            loop.call_soon_threadsafe(loop.call_later, self._drain_notice_s, setattr, self, "should_exit", True)
+
+        previous = {sig: signal.signal(sig, handle) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            yield
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+
+def _run_worker(
+    factory: Callable[[], MCPServer],
+    options: MCPWorkerOptions,
+    sockets: list[socket.socket],
+    ready: "multiprocessing.Queue[int]",
+    index: int,
+) -> None:
+    server = factory()
+    server._register_members()
+    # MCP sessions live in the process that created them, and requests of one client can land on any worker.
+    server._server.settings.stateless_http = True
+    # Plain JSON responses instead of SSE streams: sse-starlette ends open streams as soon as the signal arrives,
+    # which would cut off in-flight tool calls instead of letting them drain.
+    server._server.settings.json_response = True
+    uvicorn_server: _DrainingServer | None = None
+    app = _WorkerApp(
+        server._server.streamable_http_app(),
+        options,
+        lambda: uvicorn_server is not None and uvicorn_server.draining,
+    )
+    config = uvicorn.Config(
+        app, log_level=options.log_level, timeout_graceful_shutdown=options.drain_timeout_s, lifespan="on"
+    )
+    uvicorn_server = _DrainingServer(config, options.drain_notice_s)
+
+    async def serve() -> None:
+        assert uvicorn_server is not None
+        task = asyncio.create_task(uvicorn_server.serve(sockets=sockets))
+        while not uvicorn_server.started and not task.done():
+            await asyncio.wait({task}, timeout=0.05)
+        if uvicorn_server.started:
+            ready.put(index)
+        await task
+
+    asyncio.run(serve())
+
+
+class MCPWorkerPool:
+    """
+    Serves an MCP server (streamable-http) from `workers` processes sharing one listening socket.
+
+    `factory` builds the MCPServer (agents, tools) inside each worker; it must be picklable, i.e. a module-level
+    function. Workers run stateless MCP sessions, so a client may hit a different worker on every request.
+    `start()` returns once every worker is accepting requests; `stop()` drains them (in-flight requests finish,
+    new connections are refused) and kills stragglers after `drain_timeout_s`.
+    """
+
+    def __init__(self, factory: Callable[[], MCPServer], options: ModelLike[MCPWorkerOptions] | None = None) -> None:
+        self.options = to_model_optional(MCPWorkerOptions, options) or MCPWorkerOptions()
+        self._factory = factory
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: list[BaseProcess] = []
+        self._socket: socket.socket | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.options.host}:{self.options.port}/mcp"
+
+    @property
+    def health_url(self) -> str:
+        return f"http://{self.options.host}:{self.options.port}{HEALTH_PATH}"
+
+    def start(self) -> None:
+        if self._processes:
+            raise RuntimeError("The worker pool is already running.")
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.options.host, self.options.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        self._socket = sock
+
+        ready = self._context.Queue()
+        for index in range(self.options.workers):
+            process = self._context.Process(
+                target=_run_worker,
+                args=(self._factory, self.options, [sock], ready, index),
+                name=f"mcp-worker-{index}",
+            )
+            process.start()
+            self._processes.append(process)
+
+        deadline = time.monotonic() + self.options.ready_timeout_s
+        started = 0
+        while started < self.options.workers:
+            try:
+                ready.get(timeout=max(0.0, min(1.0, deadline - time.monotonic())))
+                started += 1
+            except queue.Empty:
+                if time.monotonic() >= deadline or not all(p.is_alive() for p in self._processes):
+                    self.stop()
+                    raise RuntimeError(f"MCP workers not ready: {started}/{self.options.workers} started") from None
+
+    def stop(self) -> None:
+        for process in self._processes:
+            if process.is_alive() and process.pid is not None:
+                with contextlib.suppress(ProcessLookupError):
+                    process.terminate()  # SIGTERM: /health turns 503, then the worker stops accepting and drains
+        deadline = time.monotonic() + self.options.drain_notice_s + self.options.drain_timeout_s + 5
+        for process in self._processes:
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self._processes.clear()
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def serve(self) -> None:
+        """Blocking: starts the workers and drains them on SIGINT / SIGTERM."""
+        stop = False
+
+        def handle(sig: int, frame: Any) -> None:
+            nonlocal stop
+            stop = True
+
+        previous = {sig: signal.signal(sig, handle) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            self.start()
+            while not stop and all(process.is_alive() for process in self._processes):
+                time.sleep(0.2)
+        finally:
+            self.stop()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+    def __enter__(self) -> "MCPWorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+
+async def wait_until_ready(health_url: str, timeout_s: float = 30.0) -> None:
+    """Readiness probe: polls the health endpoint until it answers 200."""
+    deadline = time.monotonic() + timeout_s
+    async with httpx.AsyncClient(timeout=1.0) as client:
+        while True:
+            with contextlib.suppress(httpx.HTTPError):
+                if (await client.get(health_url)).status_code == 200:
+                    return
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{health_url} not ready after {timeout_s}s")
+            await asyncio.sleep(0.1)
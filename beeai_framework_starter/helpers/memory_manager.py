@@ -0,0 +1,326 @@
+import asyncio
+import contextlib
+import json
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Annotated, Any, TypeVar
+
+from beeai_framework.backend import AnyMessage, AssistantMessage, SystemMessage, ToolMessage, UserMessage
+from beeai_framework.backend.message import (
+    MessageFileContent,
+    MessageImageContent,
+    MessageReasoningContent,
+    MessageTextContent,
+    MessageToolCallContent,
+    MessageToolResultContent,
+)
+from beeai_framework.memory import BaseMemory, UnconstrainedMemory
+from beeai_framework.serve.utils import MemoryManager
+from beeai_framework.utils.models import ModelLike, to_model_optional
+from pydantic import BaseModel, Field, TypeAdapter
+
+_MESSAGE_TYPES: dict[str, type[AnyMessage]] = {
+    "user": UserMessage,
+    "assistant": AssistantMessage,
+    "system": SystemMessage,
+    "tool": ToolMessage,
+}
+_CONTENT = TypeAdapter(
+    list[
+        Annotated[
+            MessageTextContent
+            | MessageImageContent
+            | MessageFileContent
+            | MessageToolCallContent
+            | MessageToolResultContent
+            | MessageReasoningContent,
+            Field(discriminator="type"),
+        ]
+    ]
+)
+_COMPRESSED, _PLAIN = b"z", b"j"
+
+T = TypeVar("T")
+
+
+def dump_messages(messages: Iterable[AnyMessage], *, compress_above: int = 512) -> bytes:
+    """Compact JSON of the messages (short keys, no whitespace), zlib-compressed when it is large."""
+    data = [
+        {
+            "r": str(message.role.value if hasattr(message.role, "value") else message.role),
+            "c": [content.model_dump(exclude_none=True) for content in message.content],
+            "m": message.meta,
+            **({"i": message.id} if message.id else {}),
+        }
+        for message in messages
+    ]
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_json_default).encode("utf-8")
+    return _COMPRESSED + zlib.compress(raw) if len(raw) > compress_above else _PLAIN + raw
+
+
+def load_messages(blob: bytes) -> list[AnyMessage]:
+    raw = zlib.decompress(blob[1:]) if blob[:1] == _COMPRESSED else blob[1:]
+    messages: list[AnyMessage] = []
+    for item in json.loads(raw):
+        meta = item.get("m") or {}
+        if isinstance(meta.get("createdAt"), str):
+            meta["createdAt"] = datetime.fromisoformat(meta["createdAt"])
+        messages.append(_MESSAGE_TYPES[item["r"]](_CONTENT.validate_python(item["c"]), meta, id=item.get("i")))
+    return messages
+
+
+def _json_default(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+class PersistentMemoryOptions(BaseModel):
+    path: str = "tmp/a2a_memory.sqlite"
+    # Sessions kept deserialized in this process; evicted ones are reloaded from the store.
+    cache_size: int = 100
+    # Changed sessions are written in one transaction at most this long after the change,
+    # or on the next event loop turn once `max_pending` sessions are waiting.
+    flush_interval_s: float = 0.25
+    max_pending: int = 64
+    # Compare the cached copy with the stored version on every get (needed with several replicas).
+    check_version: bool = True
+    # Sessions not updated for this long are deleted (None keeps them forever).
+    ttl_s: float | None = 7 * 24 * 3600
+
+
+class _TrackedMemory(BaseMemory):
+    """Delegates to the session memory and reports every change to the manager."""
+
+    def __init__(self, inner: BaseMemory, on_change: Callable[[], None]) -> None:
+        self.inner = inner
+        self._on_change = on_change
+
+    @property
+    def messages(self) -> list[AnyMessage]:
+        return self.inner.messages
+
+    async def add(self, message: AnyMessage, index: int | None = None) -> None:
+        await self.inner.add(message, index)
+        self._on_change()
+
+    async def add_many(self, messages: Iterable[AnyMessage], start: int | None = None) -> None:
+        await self.inner.add_many(messages, start)
+        self._on_change()
+
+    async def delete(self, message: AnyMessage) -> bool:
+        deleted = await self.inner.delete(message)
+        self._on_change()
+        return deleted
+
+    def reset(self) -> None:
+        self.inner.reset()
+        self._on_change()
+
+    async def clone(self) -> "_TrackedMemory":
+        # A copy is not the session, its changes are not persisted.
+        return _TrackedMemory(await self.inner.clone(), lambda: None)
+
+
+class PersistentMemoryManager(MemoryManager):
+    """
+    A2A / serve memory manager backed by SQLite, so several server processes (or restarts) share sessions.
+
+    Sessions are cached in-process (LRU, `cache_size`). The memory handed to the agent reports its changes;
+    changed sessions are written behind, batched into one transaction per `flush_interval_s`. Each write bumps
+    the session's version; with `check_version` a get compares it with the cached copy and reloads a session
+    another process has updated, so no sticky sessions are needed. A session answered by another replica
+    within the flush interval may still be missing its latest turn.
+    All SQLite work runs on one store thread, so a locked database never stalls the event loop.
+    New sessions are created by `memory_factory` when they are loaded from the store.
+    Call `await flush()` or `close()` on shutdown to write pending changes.
+    """
+
+    def __init__(
+        self,
+        options: ModelLike[PersistentMemoryOptions] | None = None,
+        *,
+        memory_factory: Callable[[], BaseMemory] = UnconstrainedMemory,
+    ) -> None:
+        self.options = to_model_optional(PersistentMemoryOptions, options) or PersistentMemoryOptions()
+        self._memory_factory = memory_factory
+        self._cache: OrderedDict[str, tuple[int, _TrackedMemory]] = OrderedDict()
+        self._pending: dict[str, _TrackedMemory] = {}
+        self._flushing: dict[str, _TrackedMemory] = {}
+        self._flush_now = asyncio.Event()
+        self._flush_task: asyncio.Task[None] | None = None
+        self.stats = {"hits": 0, "loads": 0, "reloads": 0, "flushes": 0, "writes": 0}
+
+        path = Path(self.options.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " key TEXT PRIMARY KEY, version INTEGER NOT NULL, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        # The only thread that touches the connection: SQLite calls are serialized in submission order.
+        self._store = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-store")
+
+    async def set(self, key: str, value: BaseMemory) -> None:
+        memory = value if isinstance(value, _TrackedMemory) else self._track(key, value)
+        self._remember(key, self._cached_version(key), memory)
+        self._mark_changed(key, memory)
+
+    async def get(self, key: str) -> BaseMemory:
+        pending = self._pending.get(key) or self._flushing.get(key)
+        if pending is not None:  # newer than the stored copy
+            self._remember(key, self._cached_version(key), pending)
+            self.stats["hits"] += 1
+            return pending
+
+        cached = self._cache.get(key)
+        if cached is not None and not self.options.check_version:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return cached[1]
+
+        row = await self._io(self._read, key, cached[0] if cached is not None else None)
+        if cached is not None and (row is None or row[1] is None):
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return cached[1]
+        if row is None:
+            raise KeyError(key)
+
+        version, messages = row
+        inner = self._memory_factory()
+        await inner.add_many(messages or [])
+        memory = self._track(key, inner)
+        self._remember(key, version, memory)
+        self.stats["reloads" if cached is not None else "loads"] += 1
+        return memory
+
+    async def contains(self, key: str) -> bool:
+        if key in self._cache or key in self._pending or key in self._flushing:
+            return True
+        return await self._io(self._exists, key)
+
+    async def delete(self, key: str) -> None:
+        self._cache.pop(key, None)
+        self._pending.pop(key, None)
+        await self._io(self._conn.execute, "DELETE FROM sessions WHERE key = ?", (key,))
+
+    async def flush(self) -> None:
+        """Writes all changed sessions in one transaction."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self._flushing.update(pending)
+        try:
+            versions = await self._io(self._write, {key: list(memory.messages) for key, memory in pending.items()})
+        except BaseException:
+            self._pending = {**pending, **self._pending}
+            raise
+        finally:
+            for key, memory in pending.items():
+                if self._flushing.get(key) is memory:
+                    del self._flushing[key]
+        self._written(pending, versions)
+
+    def close(self) -> None:
+        """Writes pending sessions (blocking; the server's event loop may already be closed) and closes the store."""
+        if self._flush_task is not None:
+            with contextlib.suppress(RuntimeError):  # the server's event loop may already be closed
+                self._flush_task.cancel()
+            self._flush_task = None
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            snapshot = {key: list(memory.messages) for key, memory in pending.items()}
+            self._written(pending, self._store.submit(self._write, snapshot).result())
+        self._store.submit(self._conn.close).result()
+        self._store.shutdown()
+
+    async def _io(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._store, fn, *args)
+
+    def _read(self, key: str, known_version: int | None) -> tuple[int, list[AnyMessage] | None] | None:
+        # Store thread. The messages are only deserialized when the stored version differs from the cached one.
+        row = self._conn.execute("SELECT version, data FROM sessions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], None if row[0] == known_version else load_messages(row[1])
+
+    def _exists(self, key: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM sessions WHERE key = ?", (key,)).fetchone() is not None
+
+    def _write(self, sessions: dict[str, list[AnyMessage]]) -> dict[str, int]:
+        # Store thread: one transaction for every changed session, plus the TTL cleanup.
+        now = time.time()
+        rows = [(key, dump_messages(messages), now) for key, messages in sessions.items()]
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            versions = {
+                key: self._conn.execute(
+                    "INSERT INTO sessions VALUES (?, 1, ?, ?) ON CONFLICT(key) DO UPDATE"
+                    " SET version = version + 1, data = excluded.data, updated_at = excluded.updated_at"
+                    " RETURNING version",
+                    (key, data, updated_at),
+                ).fetchone()[0]
+                for key, data, updated_at in rows
+            }
+            if self.options.ttl_s is not None:
+                self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.options.ttl_s,))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return versions
+
+    def _written(self, pending: dict[str, _TrackedMemory], versions: dict[str, int]) -> None:
+        for key, version in versions.items():
+            cached = self._cache.get(key)
+            if cached is not None and cached[1] is pending[key]:
+                self._cache[key] = (version, cached[1])
+        self.stats["flushes"] += 1
+        self.stats["writes"] += len(versions)
+
+    def _track(self, key: str, memory: BaseMemory) -> _TrackedMemory:
+        tracked: _TrackedMemory | None = None
+
+        def on_change() -> None:
+            assert tracked is not None
+            self._mark_changed(key, tracked)
+
+        tracked = _TrackedMemory(memory, on_change)
+        return tracked
+
+    def _cached_version(self, key: str) -> int:
+        cached = self._cache.get(key)
+        return cached[0] if cached is not None else 0
+
+    def _remember(self, key: str, version: int, memory: _TrackedMemory) -> None:
+        # Evicted sessions are safe: pending ones are still referenced by _pending until they are flushed.
+        self._cache[key] = (version, memory)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.options.cache_size:
+            self._cache.popitem(last=False)
+
+    def _mark_changed(self, key: str, memory: _TrackedMemory) -> None:
+        # Never writes here: the agent changes its memory in several steps (e.g. reset() then add_many()),
+        # and a write in between would store a half-updated session.
+        self._pending[key] = memory
+        if len(self._pending) >= self.options.max_pending:
+            self._flush_now.set()
+        if self._flush_task is None or self._flush_task.done():
+            with contextlib.suppress(RuntimeError):  # no running loop: written by the next flush() / close()
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        while self._pending:
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(self.options.flush_interval_s):
+                    await self._flush_now.wait()
+            self._flush_now.clear()
+            await self.flush()
@@ -0,0 +1,226 @@
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from beeai_framework.agents import BaseAgent
+from beeai_framework.backend import ChatModel
+from beeai_framework.backend.events import ChatModelSuccessEvent
+from beeai_framework.context import RunContext, RunContextStartEvent, RunMiddlewareProtocol
+from beeai_framework.emitter import EmitterOptions, EventMeta
+from beeai_framework.tools import Tool
+from opentelemetry import metrics as metrics_api
+
+METER_NAME = "beeai_framework_starter.agent"
+
+# Framework defaults applied when a run does not pass the option:
+# (max_iterations, max_retries_per_step, total_max_retries).
+DEFAULT_RUN_LIMITS: dict[str, tuple[int, int, int]] = {
+    "RequirementAgent": (20, 3, 20),
+    "ToolCallingAgent": (10, 3, 20),
+    "ReActAgent": (10, 3, 20),
+}
+
+_RATIO_BUCKETS = [0.1, 0.25, 0.5, 0.75, 0.9, 1.0]
+_COUNT_BUCKETS = [0, 1, 2, 3, 5, 8, 10, 15, 20, 30, 50]
+
+
+@dataclass
+class _AgentRun:
+    agent: str
+    agent_type: str
+    max_iterations: int | None
+    max_retries_per_step: int | None
+    total_max_retries: int | None
+    iterations: int = 0
+    retries: int = 0
+    step_retries: int = 0
+    max_step_retries: int = 0
+    unclaimed_errors: int = 0
+    iteration_started: float | None = None
+
+    @property
+    def attributes(self) -> dict[str, str]:
+        return {"agent": self.agent, "agent.type": self.agent_type}
+
+
+class AgentMetricsMiddleware(RunMiddlewareProtocol):
+    """
+    Records OpenTelemetry metrics for RequirementAgent, ToolCallingAgent and ReActAgent runs (including nested
+    agents, e.g. handoffs):
+
+    - agent.iteration.duration (ms): one agent iteration (start -> success event)
+    - agent.tool.duration (ms), by tool and status
+    - agent.llm.duration (ms) and agent.llm.tokens (prompt / completion), by model
+    - agent.retries: failed attempts charged against the retry limits, by source (tool / llm / agent)
+    - agent.run.iterations, agent.run.retries, agent.step.max_retries: used per run
+    - agent.run.iteration_budget_used, agent.run.retry_budget_used, agent.step.retry_budget_used:
+      the same divided by max_iterations / total_max_retries / max_retries_per_step
+    - agent.run.duration (ms), by status
+
+    Instruments come from the global MeterProvider (see setup_metrics) unless `meter` is given.
+    """
+
+    def __init__(self, *, meter: metrics_api.Meter | None = None) -> None:
+        super().__init__()
+        meter = meter or metrics_api.get_meter(METER_NAME)
+        self._iteration_duration = meter.create_histogram("agent.iteration.duration", unit="ms")
+        self._tool_duration = meter.create_histogram("agent.tool.duration", unit="ms")
+        self._llm_duration = meter.create_histogram("agent.llm.duration", unit="ms")
+        self._llm_tokens = meter.create_counter("agent.llm.tokens", unit="{token}")
+        self._retries = meter.create_counter("agent.retries", unit="{retry}")
+        self._run_duration = meter.create_histogram("agent.run.duration", unit="ms")
+        self._run_iterations = meter.create_histogram(
+            "agent.run.iterations", unit="{iteration}", explicit_bucket_boundaries_advisory=_COUNT_BUCKETS
+        )
+        self._run_retries = meter.create_histogram(
+            "agent.run.retries", unit="{retry}", explicit_bucket_boundaries_advisory=_COUNT_BUCKETS
+        )
+        self._step_retries = meter.create_histogram(
+            "agent.step.max_retries", unit="{retry}", explicit_bucket_boundaries_advisory=_COUNT_BUCKETS
+        )
+        self._iteration_budget = meter.create_histogram(
+            "agent.run.iteration_budget_used", unit="1", explicit_bucket_boundaries_advisory=_RATIO_BUCKETS
+        )
+        self._retry_budget = meter.create_histogram(
+            "agent.run.retry_budget_used", unit="1", explicit_bucket_boundaries_advisory=_RATIO_BUCKETS
+        )
+        self._step_retry_budget = meter.create_histogram(
+            "agent.step.retry_budget_used", unit="1", explicit_bucket_boundaries_advisory=_RATIO_BUCKETS
+        )
+        self._cleanups: list[Callable[[], None]] = []
+        self._owner: dict[str, str] = {}  # run_id -> run_id of the innermost agent run containing it
+        self._agents: dict[str, _AgentRun] = {}
+        self._started: dict[str, float] = {}
+        self._failed: set[str] = set()
+
+    def bind(self, ctx: RunContext) -> None:
+        while self._cleanups:
+            self._cleanups.pop(0)()
+        self._owner.clear()
+        self._agents.clear()
+        self._started.clear()
+        self._failed.clear()
+
+        ctx.emitter.on("*.*", self._on_event, EmitterOptions(match_nested=True))
+        self._cleanups.append(lambda: ctx.emitter.off(callback=self._on_event))
+
+    def _on_event(self, data: Any, meta: EventMeta) -> None:
+        if meta.trace is None:
+            return
+        run_id = meta.trace.run_id
+        if meta.context.get("internal"):
+            assert isinstance(meta.creator, RunContext)
+            self._on_run_event(data, meta, meta.creator.instance, run_id)
+        elif isinstance(meta.creator, BaseAgent):
+            self._on_agent_event(meta.name, run_id)
+        elif isinstance(meta.creator, ChatModel) and isinstance(data, ChatModelSuccessEvent):
+            self._on_llm_success(meta.creator, data, run_id)
+
+    def _on_run_event(self, data: Any, meta: EventMeta, instance: Any, run_id: str) -> None:
+        assert meta.trace is not None
+        if meta.name == "start":
+            self._started[run_id] = time.perf_counter()
+            if isinstance(instance, BaseAgent):
+                self._owner[run_id] = run_id
+                self._agents[run_id] = self._new_agent_run(instance, data)
+            elif meta.trace.parent_run_id in self._owner:
+                self._owner[run_id] = self._owner[meta.trace.parent_run_id]
+        elif meta.name == "error":
+            self._failed.add(run_id)
+            agent_run = self._agent_of(run_id)
+            if agent_run is not None and isinstance(instance, Tool | ChatModel):
+                agent_run.unclaimed_errors += 1
+                self._use_retry(agent_run, "tool" if isinstance(instance, Tool) else "llm")
+        elif meta.name == "finish":
+            self._on_run_finish(instance, run_id)
+
+    def _on_agent_event(self, name: str, run_id: str) -> None:
+        agent_run = self._agents.get(run_id)
+        if agent_run is None:
+            return
+        if name == "start" and agent_run.iteration_started is None:
+            agent_run.iteration_started = time.perf_counter()
+        elif name == "success":
+            self._end_iteration(agent_run)
+        elif name == "error":
+            # ReActAgent reports every failed attempt on its own emitter; LLM errors were already counted.
+            if agent_run.unclaimed_errors:
+                agent_run.unclaimed_errors -= 1
+            else:
+                self._use_retry(agent_run, "agent")
+
+    def _on_llm_success(self, model: ChatModel, event: ChatModelSuccessEvent, run_id: str) -> None:
+        usage = event.value.usage
+        agent_run = self._agent_of(run_id)
+        attributes = (agent_run.attributes if agent_run else {}) | {"model": f"{model.provider_id}:{model.model_id}"}
+        if usage is not None:
+            self._llm_tokens.add(usage.prompt_tokens, attributes | {"token.type": "prompt"})
+            self._llm_tokens.add(usage.completion_tokens, attributes | {"token.type": "completion"})
+
+    def _on_run_finish(self, instance: Any, run_id: str) -> None:
+        started = self._started.pop(run_id, None)
+        failed = run_id in self._failed
+        self._failed.discard(run_id)
+        agent_run = self._agents.pop(run_id, None) if isinstance(instance, BaseAgent) else self._agent_of(run_id)
+        self._owner.pop(run_id, None)
+        if started is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        status = "error" if failed else "success"
+        agent_attributes = agent_run.attributes if agent_run else {}
+
+        if isinstance(instance, Tool):
+            self._tool_duration.record(duration_ms, agent_attributes | {"tool": instance.name, "status": status})
+        elif isinstance(instance, ChatModel):
+            model = f"{instance.provider_id}:{instance.model_id}"
+            self._llm_duration.record(duration_ms, agent_attributes | {"model": model, "status": status})
+        elif isinstance(instance, BaseAgent) and agent_run is not None:
+            if agent_run.iteration_started is not None:
+                self._end_iteration(agent_run)
+            self._run_duration.record(duration_ms, agent_attributes | {"status": status})
+            self._record_budgets(agent_run)
+
+    def _end_iteration(self, agent_run: _AgentRun) -> None:
+        if agent_run.iteration_started is not None:
+            duration_ms = (time.perf_counter() - agent_run.iteration_started) * 1000
+            self._iteration_duration.record(duration_ms, agent_run.attributes)
+        agent_run.iteration_started = None
+        agent_run.iterations += 1
+        agent_run.max_step_retries = max(agent_run.max_step_retries, agent_run.step_retries)
+        agent_run.step_retries = 0
+        agent_run.unclaimed_errors = 0
+
+    def _use_retry(self, agent_run: _AgentRun, source: str) -> None:
+        agent_run.retries += 1
+        agent_run.step_retries += 1
+        self._retries.add(1, agent_run.attributes | {"source": source})
+
+    def _record_budgets(self, agent_run: _AgentRun) -> None:
+        attributes = agent_run.attributes
+        self._run_iterations.record(agent_run.iterations, attributes)
+        self._run_retries.record(agent_run.retries, attributes)
+        self._step_retries.record(agent_run.max_step_retries, attributes)
+        if agent_run.max_iterations:
+            self._iteration_budget.record(agent_run.iterations / agent_run.max_iterations, attributes)
+        if agent_run.total_max_retries:
+            self._retry_budget.record(agent_run.retries / agent_run.total_max_retries, attributes)
+        if agent_run.max_retries_per_step:
+            self._step_retry_budget.record(agent_run.max_step_retries / agent_run.max_retries_per_step, attributes)
+
+    def _agent_of(self, run_id: str) -> _AgentRun | None:
+        owner = self._owner.get(run_id)
+        return self._agents.get(owner) if owner else None
+
+    @staticmethod
+    def _new_agent_run(agent: BaseAgent[Any], event: Any) -> _AgentRun:
+        params = event.input if isinstance(event, RunContextStartEvent) and isinstance(event.input, dict) else {}
+        agent_type = type(agent).__name__
+        defaults = DEFAULT_RUN_LIMITS.get(agent_type, (None, None, None))
+        return _AgentRun(
+            agent=agent.meta.name or agent_type,
+            agent_type=agent_type,
+            max_iterations=params.get("max_iterations") or defaults[0],
+            max_retries_per_step=params.get("max_retries_per_step") or defaults[1],
+            total_max_retries=params.get("total_max_retries") or defaults[2],
+        )
@@ -0,0 +1,63 @@
+import asyncio
+import copy
+from collections.abc import Sequence
+from typing import Any
+
+from beeai_framework.context import RunContext
+from beeai_framework.tools import AnyTool, ToolError, ToolOutput
+from beeai_framework.utils.models import ModelLike, to_model_optional
+from pydantic import BaseModel
+
+
+class ToolExecutionOptions(BaseModel):
+    max_concurrency: int = 4
+    # Seconds per tool call (None disables); `timeouts` overrides it by tool name.
+    timeout: float | None = 30.0
+    timeouts: dict[str, float | None] = {}
+
+
+def bounded_tools(tools: Sequence[AnyTool], options: ModelLike[ToolExecutionOptions] | None = None) -> list[AnyTool]:
+    """
+    Returns copies of `tools` for an agent that runs the tool calls of one step concurrently (RequirementAgent
+    does, in the order the model emitted them).
+
+    The copies share one semaphore, so at most `max_concurrency` tool calls run at once, and each call fails
+    with a ToolError after its timeout; the agent sees that as a regular tool error and can retry or move on.
+    The copies are instances of a subclass of the tool's class with the same name, so requirements that target
+    tool classes still match, and clones (the agent clones its tools) keep the shared cap and the timeout.
+    """
+
+    opts = to_model_optional(ToolExecutionOptions, options) or ToolExecutionOptions()
+    semaphore = asyncio.Semaphore(opts.max_concurrency)
+    return [_bounded(tool, semaphore, opts.timeouts.get(tool.name, opts.timeout)) for tool in tools]
+
+
+def _bounded(tool: AnyTool, semaphore: asyncio.Semaphore, timeout: float | None) -> AnyTool:
+    bounded = copy.copy(tool)
+    bounded.__class__ = _bounded_class(type(tool), semaphore, timeout)
+    return bounded
+
+
+def _bounded_class(cls: type[AnyTool], semaphore: asyncio.Semaphore, timeout: float | None) -> type[AnyTool]:
+    # A subclass of the tool's own class carries the bound: clones built with `self.__class__(...)` keep it,
+    # other clones are bounded again in clone(), and isinstance checks of requirements still match.
+    class Bounded(cls):  # type: ignore[valid-type,misc]
+        async def _run(self, input: Any, options: Any, context: RunContext) -> ToolOutput:
+            async with semaphore:
+                if timeout is None:
+                    return await super()._run(input, options, context)  # type: ignore[no-any-return]
+                timeout_ctx: asyncio.Timeout | None = None
+                try:
+                    async with asyncio.timeout(timeout) as timeout_ctx:
+                        return await super()._run(input, options, context)  # type: ignore[no-any-return]
+                except TimeoutError as e:
+                    if timeout_ctx is None or not timeout_ctx.expired():
+                        raise
+                    raise ToolError(f"Tool '{self.name}' timed out after {timeout}s", cause=e) from e
+
+        async def clone(self) -> Any:
+            cloned = await super().clone()
+            return cloned if isinstance(cloned, Bounded) else _bounded(cloned, semaphore, timeout)
+
+    Bounded.__name__, Bounded.__qualname__ = cls.__name__, cls.__qualname__
+    return Bounded
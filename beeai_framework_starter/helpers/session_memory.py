@@ -0,0 +1,177 @@
+from collections.abc import Callable, Iterable
+from math import ceil
+
+from beeai_framework.backend import AnyMessage, ChatModel, SystemMessage, UserMessage
+from beeai_framework.backend.message import MessageTextContent, MessageToolCallContent, MessageToolResultContent
+from beeai_framework.memory import BaseMemory
+from beeai_framework.utils.models import ModelLike, to_model_optional
+from opentelemetry import metrics as metrics_api
+from pydantic import BaseModel
+
+from beeai_framework_starter.helpers.metrics import METER_NAME
+
+SUMMARY_META_KEY = "session_summary"
+
+SUMMARY_PROMPT = """Update the summary of a conversation between a user and an assistant with the messages below.
+Keep facts, decisions, names, numbers and open questions; drop small talk. Answer with the summary only,
+at most {max_words} words.
+
+Current summary:
+{summary}
+
+Messages:
+{messages}"""
+
+
+def message_text(message: AnyMessage) -> str:
+    """Text of a message including tool calls and tool results, which `message.text` leaves out."""
+    parts: list[str] = []
+    for content in message.content:
+        if isinstance(content, MessageTextContent):
+            parts.append(content.text)
+        elif isinstance(content, MessageToolCallContent):
+            parts.append(f"{content.tool_name}({content.args})")
+        elif isinstance(content, MessageToolResultContent):
+            parts.append(str(content.result))
+    return "\n".join(parts)
+
+
+def estimate_tokens(message: AnyMessage) -> int:
+    return ceil(len(message_text(message)) / 4)
+
+
+class SessionMemoryOptions(BaseModel):
+    # Turns (a user message and everything up to the next one) kept verbatim.
+    max_turns: int = 6
+    # Budget for the summary plus the verbatim turns; older turns are summarized to stay below it.
+    # The latest turn is always kept, even when it alone is over the budget.
+    max_tokens: int = 3000
+    summary_max_tokens: int = 500
+
+
+class BoundedSessionMemory(BaseMemory):
+    """
+    Session memory that keeps the last `max_turns` turns verbatim and rolls older turns into a running summary.
+
+    The summary is written by `llm` and exposed as the first message (a SystemMessage), so the prompt size stays
+    around `max_tokens` however long the session is. Compaction happens when messages are added, i.e. when the
+    agent saves the turn to memory after the run; the agent reads the memory back (summary included) on the
+    next run. Token counts (tool calls and results included) are estimated at 4 characters per token unless
+    `estimate` is given; the size after each update is recorded in the agent.memory.tokens histogram.
+    """
+
+    def __init__(
+        self,
+        llm: ChatModel,
+        options: ModelLike[SessionMemoryOptions] | None = None,
+        *,
+        estimate: Callable[[AnyMessage], int] = estimate_tokens,
+        meter: metrics_api.Meter | None = None,
+    ) -> None:
+        self.llm = llm
+        self.options = to_model_optional(SessionMemoryOptions, options) or SessionMemoryOptions()
+        self._estimate = estimate
+        self._meter = meter
+        self._messages: list[AnyMessage] = []
+        self._summary = ""
+        self._summary_message: SystemMessage | None = None
+        meter = meter or metrics_api.get_meter(METER_NAME)
+        self._tokens_histogram = meter.create_histogram("agent.memory.tokens", unit="{token}")
+        self._summarizations = meter.create_counter("agent.memory.summarizations", unit="{summarization}")
+
+    @property
+    def messages(self) -> list[AnyMessage]:
+        return [self._summary_message, *self._messages] if self._summary_message else list(self._messages)
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @property
+    def tokens(self) -> int:
+        return sum(self._estimate(message) for message in self.messages)
+
+    async def add(self, message: AnyMessage, index: int | None = None) -> None:
+        self._insert(message, index)
+        await self._compact()
+
+    async def add_many(self, messages: Iterable[AnyMessage], start: int | None = None) -> None:
+        for counter, message in enumerate(messages):
+            self._insert(message, None if start is None else start + counter)
+        await self._compact()
+
+    def _insert(self, message: AnyMessage, index: int | None) -> None:
+        # Agents save a run by resetting the memory and adding back everything they read from it (the summary
+        # message included), so the summary message is recognized and restored instead of stored as a turn.
+        if SUMMARY_META_KEY in message.meta:
+            self._set_summary(str(message.meta[SUMMARY_META_KEY]))
+            return
+        if index is None:
+            self._messages.append(message)
+        else:
+            offset = 1 if self._summary_message else 0
+            self._messages.insert(max(index - offset, 0), message)
+
+    async def delete(self, message: AnyMessage) -> bool:
+        if message is self._summary_message:
+            self._set_summary("")
+            return True
+        try:
+            self._messages.remove(message)
+            return True
+        except ValueError:
+            return False
+
+    def reset(self) -> None:
+        self._messages.clear()
+        self._set_summary("")
+
+    async def clone(self) -> "BoundedSessionMemory":
+        cloned = BoundedSessionMemory(self.llm, self.options, estimate=self._estimate, meter=self._meter)
+        cloned._messages = self._messages.copy()
+        cloned._set_summary(self._summary)
+        return cloned
+
+    def _set_summary(self, summary: str) -> None:
+        self._summary = summary
+        self._summary_message = (
+            SystemMessage(f"Summary of the earlier conversation:\n{summary}", meta={SUMMARY_META_KEY: summary})
+            if summary
+            else None
+        )
+
+    def _turns(self) -> list[list[AnyMessage]]:
+        turns: list[list[AnyMessage]] = []
+        for message in self._messages:
+            if isinstance(message, UserMessage) or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    async def _compact(self) -> None:
+        turns = self._turns()
+        summary_tokens = self._estimate(self._summary_message) if self._summary_message else 0
+        kept_tokens = sum(self._estimate(message) for turn in turns for message in turn)
+
+        expired: list[AnyMessage] = []
+        while len(turns) > 1 and (
+            len(turns) > self.options.max_turns or summary_tokens + kept_tokens > self.options.max_tokens
+        ):
+            turn = turns.pop(0)
+            expired.extend(turn)
+            kept_tokens -= sum(self._estimate(message) for message in turn)
+
+        if expired:
+            self._set_summary(await self._summarize(expired))
+            self._messages = [message for turn in turns for message in turn]
+            self._summarizations.add(1)
+        self._tokens_histogram.record(self.tokens)
+
+    async def _summarize(self, messages: list[AnyMessage]) -> str:
+        prompt = SUMMARY_PROMPT.format(
+            max_words=int(self.options.summary_max_tokens * 0.75),
+            summary=self._summary or "(none)",
+            messages="\n".join(f"{message.role}: {message_text(message)}" for message in messages),
+        )
+        response = await self.llm.run([UserMessage(prompt)], max_tokens=self.options.summary_max_tokens)
+        return response.get_text_content().strip()
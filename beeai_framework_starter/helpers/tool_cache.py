@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Collection
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
+
+from beeai_framework.context import RunContext, RunContextStartEvent, RunContextSuccessEvent, RunMiddlewareProtocol
+from beeai_framework.emitter import EmitterOptions, EventMeta
+from beeai_framework.emitter.utils import create_internal_event_matcher
+from beeai_framework.tools import AnyTool, StringToolOutput, Tool, ToolOutput
+from beeai_framework.utils.models import ModelLike, to_model_optional
+from opentelemetry import metrics as metrics_api
+from pydantic import BaseModel, ValidationError
+
+from beeai_framework_starter.helpers.metrics import METER_NAME
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+T = TypeVar("T")
+
+
+class ToolCacheOptions(BaseModel):
+    # TTL in seconds by tool name; only listed tools are cached unless default_ttl_s is set. None = no expiry.
+    ttls: dict[str, float | None] = {"OpenMeteoTool": 600, "DuckDuckGo": 3600, "Wikipedia": 24 * 3600}
+    default_ttl_s: float | None = None
+    max_entries: int = 512
+    # Optional SQLite tier shared across processes and restarts (stores the text content of the output).
+    disk_path: str | None = None
+    disk_max_entries: int = 5000
+    # Input fields by tool name whose values are case-insensitive for the tool ("Boston" == "boston").
+    # Every other string keeps its case, since it may matter to the tool (codes, ids, paths).
+    case_insensitive: dict[str, list[str]] = {
+        "OpenMeteoTool": ["location_name", "country"],
+        "DuckDuckGo": ["query"],
+        "Wikipedia": ["query"],
+    }
+
+
+def normalize_tool_input(tool: AnyTool, input: Any, case_insensitive: Collection[str] = ()) -> dict[str, Any]:
+    """
+    Validated tool input with defaults filled in, None fields dropped and string values trimmed and whitespace
+    collapsed. Top-level fields named in `case_insensitive` are also case-folded, so "Boston" and " boston " share
+    one cache entry there.
+    """
+    data = input.model_dump() if isinstance(input, BaseModel) else input
+    validated = tool.input_schema.model_validate(data)
+    return {
+        key: _normalize(value, key in case_insensitive)
+        for key, value in validated.model_dump(exclude_none=True).items()
+    }
+
+
+def _normalize(value: Any, casefold: bool) -> Any:
+    if isinstance(value, str):
+        value = _WHITESPACE_RE.sub(" ", value).strip()
+        return value.casefold() if casefold else value
+    if isinstance(value, dict):
+        return {key: _normalize(item, casefold) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [_normalize(item, casefold) for item in value]
+    return value
+
+
+def tool_cache_key(tool: AnyTool, input: Any, case_insensitive: Collection[str] = ()) -> str:
+    normalized = normalize_tool_input(tool, input, case_insensitive)
+    data = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{tool.name}|{hashlib.sha256(data.encode('utf-8')).hexdigest()}"
+
+
+class _DiskTier:
+    def __init__(self, path: Path, max_entries: int) -> None:
+        self.max_entries = max_entries
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tool_results ("
+            " key TEXT PRIMARY KEY, text TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, now: float) -> tuple[str, float | None] | None:
+        row = self._conn.execute("SELECT text, expires_at FROM tool_results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= now:
+            self._conn.execute("DELETE FROM tool_results WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        self._conn.execute("UPDATE tool_results SET accessed_at = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+        return str(row[0]), row[1]
+
+    def put(self, key: str, text: str, expires_at: float | None, now: float) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO tool_results VALUES (?, ?, ?, ?)", (key, text, expires_at, now))
+        self._conn.execute("DELETE FROM tool_results WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        self._conn.execute(
+            "DELETE FROM tool_results WHERE key IN"
+            " (SELECT key FROM tool_results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class ToolCacheMiddleware(RunMiddlewareProtocol):
+    """
+    Serves repeated tool calls (same tool, same normalized input) from a cache instead of running the tool.
+
+    Bind it to an agent or workflow run (`middlewares=[...]` or `run(...).middleware(...)`); it observes every
+    nested tool run. On a hit the tool is skipped entirely. Entries expire after the tool's TTL; the in-memory
+    tier keeps the `max_entries` most recently used outputs, the optional disk tier survives restarts.
+    Only successful outputs are cached. Hits and misses are counted in `stats` and the agent.tool.cache metric.
+    Disk reads and writes run on a dedicated thread, never on the event loop.
+    """
+
+    def __init__(
+        self,
+        options: ModelLike[ToolCacheOptions] | None = None,
+        *,
+        meter: metrics_api.Meter | None = None,
+    ) -> None:
+        super().__init__()
+        self.options = to_model_optional(ToolCacheOptions, options) or ToolCacheOptions()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._memory: OrderedDict[str, tuple[float | None, ToolOutput]] = OrderedDict()
+        self._disk = (
+            _DiskTier(Path(self.options.disk_path), self.options.disk_max_entries) if self.options.disk_path else None
+        )
+        # The only thread that touches the disk tier: SQLite calls are serialized in submission order.
+        self._store = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tool-cache-store") if self._disk else None
+        self._pending: dict[str, tuple[str, str]] = {}  # run_id -> (tool name, cache key) of a tool run that missed
+        self._cleanups: list[Callable[[], None]] = []
+        meter = meter or metrics_api.get_meter(METER_NAME)
+        self._lookups = meter.create_counter("agent.tool.cache", unit="{lookup}")
+
+    def bind(self, ctx: RunContext) -> None:
+        while self._cleanups:
+            self._cleanups.pop(0)()
+        self._pending.clear()
+
+        options = EmitterOptions(match_nested=True, is_blocking=True)
+        ctx.emitter.on(create_internal_event_matcher("start"), self._on_start, options)
+        ctx.emitter.on(create_internal_event_matcher(["success", "finish"]), self._on_end, options)
+        self._cleanups.append(lambda: ctx.emitter.off(callback=self._on_start))
+        self._cleanups.append(lambda: ctx.emitter.off(callback=self._on_end))
+
+    def ttl(self, tool_name: str) -> float | None:
+        return self.options.ttls.get(tool_name, self.options.default_ttl_s)
+
+    def is_cached(self, tool_name: str) -> bool:
+        return tool_name in self.options.ttls or self.options.default_ttl_s is not None
+
+    async def _on_start(self, data: Any, meta: EventMeta) -> None:
+        assert isinstance(meta.creator, RunContext)
+        tool = meta.creator.instance
+        if not isinstance(tool, Tool) or not isinstance(data, RunContextStartEvent) or not self.is_cached(tool.name):
+            return
+        try:
+            key = tool_cache_key(tool, data.input.get("input"), self.options.case_insensitive.get(tool.name, ()))
+        except ValidationError:
+            return  # the tool run reports the validation error itself
+
+        output, tier = await self.get(key)
+        self._lookups.add(1, {"tool": tool.name, "result": "miss" if output is None else "hit", "tier": tier or "none"})
+        if output is not None:
+            data.output = output
+        else:
+            self._pending[meta.creator.run_id] = (tool.name, key)
+
+    async def _on_end(self, data: Any, meta: EventMeta) -> None:
+        assert isinstance(meta.creator, RunContext)
+        pending = self._pending.pop(meta.creator.run_id, None)
+        if pending is not None and isinstance(data, RunContextSuccessEvent) and isinstance(data.output, ToolOutput):
+            tool_name, key = pending
+            await self.put(key, tool_name, data.output)
+
+    async def get(self, key: str) -> tuple[ToolOutput | None, str | None]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None and (entry[0] is None or entry[0] > now):
+            self._memory.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1], "memory"
+        if entry is not None:
+            del self._memory[key]
+
+        row = await self._io(self._disk.get, key, now) if self._disk else None
+        if row is not None:
+            output = StringToolOutput(row[0])
+            self._remember(key, row[1], output)
+            self.stats["disk_hits"] += 1
+            return output, "disk"
+
+        self.stats["misses"] += 1
+        return None, None
+
+    async def put(self, key: str, tool_name: str, output: ToolOutput) -> None:
+        now = time.time()
+        ttl = self.ttl(tool_name)
+        expires_at = now + ttl if ttl is not None else None
+        self._remember(key, expires_at, output)
+        if self._disk:
+            await self._io(self._disk.put, key, output.get_text_content(), expires_at, now)
+
+    async def _io(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._store, fn, *args)
+
+    def _remember(self, key: str, expires_at: float | None, output: ToolOutput) -> None:
+        self._memory[key] = (expires_at, output)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.options.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def close(self) -> None:
+        if self._disk and self._store:
+            self._store.submit(self._disk.close).result()
+            self._store.shutdown()
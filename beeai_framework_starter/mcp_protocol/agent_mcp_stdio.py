@@ -5,9 +5,10 @@ from beeai_framework.agents.requirement import RequirementAgent
 from beeai_framework.backend import ChatModel
 from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
 from beeai_framework.tools import Tool
-from beeai_framework.tools.mcp import MCPTool
 from dotenv import load_dotenv
-from mcp import StdioServerParameters, stdio_client
+from mcp import StdioServerParameters
+
+from beeai_framework_starter.helpers.mcp_pool import MCPEndpoint, MCPSessionPool
 
 load_dotenv()
 
@@ -20,17 +21,19 @@ async def main() -> None:
         cwd=Path(__file__).parent.parent.parent.resolve(),  # get project root
     )
 
-    mcp_tools = await MCPTool.from_client(stdio_client(server_params))
-    agent = RequirementAgent(
-        llm=ChatModel.from_name("ollama:granite3.3:8b"),
-        tools=[*mcp_tools],
-        middlewares=[GlobalTrajectoryMiddleware(included=[Tool])],
-    )
-
-    prompt = "What's the last commit message? Use git_status tool."
-    print(f"User: {prompt}")
-    response = await agent.run(prompt)
-    print(f"Agent: {response.last_message.text}")
+    # The pool keeps the `uvx mcp-server-git` session alive across runs and caches its tool schemas
+    async with MCPSessionPool() as pool:
+        mcp_tools = await pool.tools(MCPEndpoint.stdio(server_params))
+        agent = RequirementAgent(
+            llm=ChatModel.from_name("ollama:granite3.3:8b"),
+            tools=[*mcp_tools],
+            middlewares=[GlobalTrajectoryMiddleware(included=[Tool])],
+        )
+
+        prompt = "What's the last commit message? Use git_status tool."
+        print(f"User: {prompt}")
+        response = await agent.run(prompt)
+        print(f"Agent: {response.last_message.text}")
 
 
 if __name__ == "__main__":
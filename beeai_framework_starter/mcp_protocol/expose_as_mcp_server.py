@@ -1,9 +1,7 @@
 import asyncio
 import os
 import sys
-import time
 import traceback
-from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from beeai_framework.adapters.mcp import MCPServer, MCPServerConfig
 from beeai_framework.adapters.mcp.serve.server import MCPSettings
@@ -16,10 +14,19 @@ from beeai_framework.tools.weather import OpenMeteoTool
 from dotenv import load_dotenv
 from mcp.client.streamable_http import streamablehttp_client
 
+from beeai_framework_starter.helpers.mcp_workers import MCPWorkerPool, wait_until_ready
+
 load_dotenv()
 
+WORKER_OPTIONS = {
+    "port": 7777,
+    "workers": int(os.getenv("MCP_WORKERS", "2")),
+    "max_concurrency": int(os.getenv("MCP_MAX_CONCURRENCY", "16")),
+}
 
-def mcp_server() -> None:
+
+def create_server() -> MCPServer:
+    # Called in every worker process.
     agent = RequirementAgent(
         llm=ChatModel.from_name("ollama:granite3.3:8b"),
         tools=[OpenMeteoTool()],
@@ -30,7 +37,11 @@ def mcp_server() -> None:
 
     server = MCPServer(config=MCPServerConfig(transport="streamable-http", settings=MCPSettings(port=7777)))
     server.register_many([agent])
-    server.serve()
+    return server
+
+
+def mcp_server() -> None:
+    MCPWorkerPool(create_server, WORKER_OPTIONS).serve()
 
     # Run npx -y @modelcontextprotocol/inspector
     # Visit: http://127.0.0.1:7777/mcp
@@ -45,18 +56,13 @@ async def mcp_client() -> None:
 
 
 if __name__ == "__main__":
-    with ThreadPoolExecutor(max_workers=2) as pool:
-        try:
-            f1 = pool.submit(mcp_server)
-            time.sleep(3)  # wait for the server to start
-            f2 = pool.submit(asyncio.run, mcp_client())
-
-            done, _ = wait([f1, f2], return_when=FIRST_COMPLETED)
-            for f in done:
-                if f.exception():
-                    raise f.exception()  # type: ignore
-        except Exception as e:
-            traceback.print_exc()
-            sys.exit(str(e))
-        finally:
-            os.kill(os.getpid(), 9)
+    pool = MCPWorkerPool(create_server, WORKER_OPTIONS)
+    try:
+        pool.start()
+        asyncio.run(wait_until_ready(pool.health_url))
+        asyncio.run(mcp_client())
+    except Exception as e:
+        traceback.print_exc()
+        sys.exit(str(e))
+    finally:
+        pool.stop()  # drains in-flight requests
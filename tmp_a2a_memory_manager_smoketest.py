@@ -0,0 +1,135 @@
+import asyncio
+import json
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+from beeai_framework.agents.requirement import RequirementAgent
+from beeai_framework.backend import AssistantMessage, SystemMessage, ToolMessage, UserMessage
+from beeai_framework.backend.message import MessageToolCallContent, MessageToolResultContent
+from beeai_framework.serve.utils import init_agent_memory
+
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+from beeai_framework_starter.helpers.memory_manager import PersistentMemoryManager, dump_messages, load_messages
+from beeai_framework_starter.helpers.session_memory import BoundedSessionMemory
+
+
+def _answer(messages):
+    questions = [m.text for m in messages if isinstance(m, UserMessage)]
+    args = json.dumps({"response": f"answered {len(questions)} questions"})
+    return AssistantMessage(MessageToolCallContent(id="call_final", tool_name="final_answer", args=args))
+
+
+async def _turn(manager, session, prompt):
+    """What the A2A executor does per request: clone the agent, attach the session memory, run."""
+    agent = await RequirementAgent(llm=FakeChatModel(_answer), memory=BoundedSessionMemory(FakeChatModel())).clone()
+    await init_agent_memory(agent, manager, session)
+    return (await agent.run(prompt)).last_message.text
+
+
+def _sample():
+    call = MessageToolCallContent(id="c1", tool_name="OpenMeteoTool", args='{"location_name":"Boston"}')
+    result = MessageToolResultContent(tool_call_id="c1", tool_name="OpenMeteoTool", result="sunny " * 200)
+    return [
+        SystemMessage("Summary of the earlier conversation:\nuser likes jazz", meta={"session_summary": "jazz"}),
+        UserMessage("Weather in Boston?"),
+        AssistantMessage(call),
+        ToolMessage(result),
+        AssistantMessage("It is sunny."),
+    ]
+
+
+async def main():
+    all_ok = True
+    workdir = Path(tempfile.mkdtemp())
+    options = {"path": str(workdir / "memory.sqlite"), "flush_interval_s": 0.5}
+
+    sample = _sample()
+    blob = dump_messages(sample)
+    restored = load_messages(blob)
+    verbose = len(json.dumps([{"role": m.role, "content": [c.model_dump() for c in m.content]} for m in sample]))
+    same = [(type(m), m.content, m.meta) for m in restored] == [(type(m), m.content, m.meta) for m in sample]
+    print(f"[SERIALIZE] same={same} bytes={len(blob)} verbose_json_bytes={verbose} compressed={blob[:1] == b'z'}")
+    all_ok &= same and len(blob) * 3 < verbose
+
+    replica_a = PersistentMemoryManager(options, memory_factory=lambda: BoundedSessionMemory(FakeChatModel()))
+    replica_b = PersistentMemoryManager(options, memory_factory=lambda: BoundedSessionMemory(FakeChatModel()))
+    for idx in range(20):
+        await _turn(replica_a, f"session-{idx}", "Hello?")
+    writes_before = replica_a.stats["writes"]
+    await asyncio.sleep(0.6)
+    print(f"[WRITE_BEHIND] before_flush={writes_before} stats={replica_a.stats}")
+    all_ok &= writes_before == 0 and replica_a.stats["flushes"] == 1 and replica_a.stats["writes"] == 20
+
+    answers = []
+    for turn, replica in enumerate([replica_a, replica_b, replica_a, replica_b]):
+        answers.append(await _turn(replica, "shared", f"Question {turn}?"))
+        await asyncio.sleep(0.6)
+    print(f"[REPLICAS] answers={answers} a={replica_a.stats} b={replica_b.stats}")
+    all_ok &= answers == [f"answered {turn} questions" for turn in range(1, 5)]
+    all_ok &= replica_a.stats["reloads"] == 1 and replica_b.stats["reloads"] == 1
+
+    small = PersistentMemoryManager({**options, "cache_size": 2})
+    for idx in range(5):
+        await small.set(f"lru-{idx}", small._memory_factory())
+        await (await small.get(f"lru-{idx}")).add(UserMessage(f"message {idx}"))
+    await small.flush()
+    kept = [(await small.get(f"lru-{idx}")).messages[0].text for idx in range(5)]
+    print(f"[LRU] cached={len(small._cache)} all_sessions={kept} loads={small.stats['loads']}")
+    all_ok &= kept == [f"message {idx}" for idx in range(5)] and small.stats["loads"] == 5
+
+    await _turn(replica_b, "restart", "Before restart?")
+    replica_b.close()
+    restarted = PersistentMemoryManager(options, memory_factory=lambda: BoundedSessionMemory(FakeChatModel()))
+    answer = await _turn(restarted, "restart", "After restart?")
+    print(f"[RESTART] answer={answer!r} loads={restarted.stats['loads']}")
+    all_ok &= answer == "answered 2 questions" and restarted.stats["loads"] == 1
+
+    # reset() then add_many() (what RequirementAgent does after a run) must not be written in between
+    eager = PersistentMemoryManager({**options, "max_pending": 1})
+    await eager.set("eager", eager._memory_factory())
+    memory = await eager.get("eager")
+    await memory.add(UserMessage("first"))
+    await eager.flush()
+    memory.reset()
+    await memory.add_many([UserMessage("first"), UserMessage("second")])
+    await asyncio.sleep(0.05)
+    stored = load_messages(eager._conn.execute("SELECT data FROM sessions WHERE key = 'eager'").fetchone()[0])
+    print(f"[MAX_PENDING] writes={eager.stats['writes']} stored={[m.text for m in stored]}")
+    all_ok &= eager.stats["writes"] == 2 and [m.text for m in stored] == ["first", "second"]
+
+    # another process holds the write lock: reads and writes wait on the store thread, the event loop keeps running
+    blocker = sqlite3.connect(options["path"], isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    await (await eager.get("eager")).add(UserMessage("third"))  # max_pending=1: written on the next loop turn
+    await asyncio.sleep(0.5)
+    writes_locked = eager.stats["writes"]
+    blocker.execute("COMMIT")
+    await asyncio.sleep(0.1)
+    ticking.cancel()
+    blocker.close()
+    print(f"[OFF_LOOP] loop_ticks_while_locked={ticks} writes_locked={writes_locked} writes={eager.stats['writes']}")
+    all_ok &= ticks >= 20 and writes_locked == 2 and eager.stats["writes"] == 3
+
+    for manager in (replica_a, small, restarted, eager):
+        manager.close()
+
+    if all_ok:
+        print("[OK] a2a memory manager smoketest: 7/7 passed")
+        return 0
+    print("[FAIL] a2a memory manager smoketest")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import sys
+import warnings
+
+from beeai_framework.agents.react import ReActAgent
+from beeai_framework.agents.requirement import RequirementAgent
+from beeai_framework.agents.tool_calling import ToolCallingAgent
+from beeai_framework.backend import AssistantMessage
+from beeai_framework.backend.message import MessageToolCallContent, ToolMessage
+from beeai_framework.memory import UnconstrainedMemory
+from beeai_framework.tools import ToolError, tool
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+from beeai_framework_starter.helpers.metrics import AgentMetricsMiddleware
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+
+@tool
+async def slow_lookup(query: str) -> str:
+    """Looks something up slowly."""
+    await asyncio.sleep(0.05)
+    return f"slow result for {query}"
+
+
+@tool
+async def fast_lookup(query: str) -> str:
+    """Looks something up quickly."""
+    return f"fast result for {query}"
+
+
+_flaky_calls = 0
+
+
+@tool
+async def flaky_lookup(query: str) -> str:
+    """Fails on the first call."""
+    global _flaky_calls
+    _flaky_calls += 1
+    if _flaky_calls == 1:
+        raise ToolError("upstream unavailable")
+    return f"result for {query}"
+
+
+def _tool_call(call_id, name, args):
+    return AssistantMessage(MessageToolCallContent(id=call_id, tool_name=name, args=json.dumps(args)))
+
+
+def _scripted(plan):
+    """One tool call per step from `plan`, then the final answer."""
+
+    def respond(messages):
+        step = sum(isinstance(message, ToolMessage) for message in messages)
+        if step < len(plan):
+            return _tool_call(f"call_{step}", plan[step], {"query": f"boston {step}"})
+        return _tool_call("call_final", "final_answer", {"response": "done"})
+
+    return respond
+
+
+def _collect(reader):
+    points = {}
+    for resource_metrics in reader.get_metrics_data().resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                for point in metric.data.data_points:
+                    points.setdefault(metric.name, []).append((dict(point.attributes), point))
+    return points
+
+
+def _total(points, name, **attributes):
+    matching = [p for attrs, p in points.get(name, []) if all(attrs.get(k) == v for k, v in attributes.items())]
+    return sum(getattr(p, "sum", None) if hasattr(p, "sum") else p.value for p in matching)
+
+
+async def main():
+    all_ok = True
+    reader = InMemoryMetricReader()
+    meter = MeterProvider(metric_readers=[reader]).get_meter("smoke")
+
+    agent = RequirementAgent(
+        llm=FakeChatModel(_scripted(["slow_lookup", "fast_lookup"])),
+        tools=[slow_lookup, fast_lookup],
+        middlewares=[AgentMetricsMiddleware(meter=meter)],
+    )
+    response = await agent.run("What to do in Boston?", max_iterations=6)
+    points = _collect(reader)
+    slow_ms = _total(points, "agent.tool.duration", tool="slow_lookup")
+    fast_ms = _total(points, "agent.tool.duration", tool="fast_lookup")
+    iterations = _total(points, "agent.run.iterations", agent="RequirementAgent")
+    budget = _total(points, "agent.run.iteration_budget_used", agent="RequirementAgent")
+    steps = [p for _, p in points.get("agent.iteration.duration", [])]
+    print(f"[REQUIREMENT] answer={response.last_message.text!r} iterations={iterations} budget={budget}")
+    print(f"[TOOLS] slow_ms={slow_ms:.1f} fast_ms={fast_ms:.1f}")
+    all_ok &= response.last_message.text == "done" and iterations == 3 and budget == 0.5
+    all_ok &= sum(p.count for p in steps) == 3 and slow_ms > 40 > fast_ms
+
+    prompt_tokens = _total(points, "agent.llm.tokens", agent="RequirementAgent", **{"token.type": "prompt"})
+    llm_calls = sum(p.count for attrs, p in points.get("agent.llm.duration", []) if attrs["model"] == "beeai:fake-chat")
+    print(f"[TOKENS] prompt={prompt_tokens} llm_calls={llm_calls}")
+    all_ok &= prompt_tokens > 0 and llm_calls == 3
+
+    agent = RequirementAgent(llm=FakeChatModel(_scripted(["flaky_lookup", "flaky_lookup"])), tools=[flaky_lookup])
+    await agent.run("Retry please", max_retries_per_step=2, total_max_retries=4).middleware(
+        AgentMetricsMiddleware(meter=meter)
+    )
+    points = _collect(reader)
+    retries = _total(points, "agent.retries", agent="RequirementAgent", source="tool")
+    retry_budget = _total(points, "agent.run.retry_budget_used", agent="RequirementAgent")
+    step_budget = _total(points, "agent.step.retry_budget_used", agent="RequirementAgent")
+    errors = _total(points, "agent.tool.duration", tool="flaky_lookup", status="error")
+    print(f"[RETRIES] tool_retries={retries} run_budget={retry_budget} step_budget={step_budget} error_ms={errors:.2f}")
+    all_ok &= retries == 1 and retry_budget == 0.25 and step_budget == 0.5 and errors > 0
+
+    agent = ToolCallingAgent(llm=FakeChatModel(_scripted(["fast_lookup"])), tools=[fast_lookup])
+    await agent.run("Quick one", max_iterations=4).middleware(AgentMetricsMiddleware(meter=meter))
+    points = _collect(reader)
+    iterations = _total(points, "agent.run.iterations", agent="ToolCallingAgent")
+    budget = _total(points, "agent.run.iteration_budget_used", agent="ToolCallingAgent")
+    print(f"[TOOL_CALLING] iterations={iterations} budget={budget}")
+    all_ok &= iterations == 2 and budget == 0.5
+
+    agent = ReActAgent(
+        llm=FakeChatModel(lambda _: "Thought: I know it.\nFinal Answer: done"), tools=[], memory=UnconstrainedMemory()
+    )
+    await agent.run("Anything").middleware(AgentMetricsMiddleware(meter=meter))
+    points = _collect(reader)
+    react = {"agent.type": "ReActAgent"}
+    iterations = _total(points, "agent.run.iterations", **react)
+    budget = _total(points, "agent.run.iteration_budget_used", **react)
+    print(f"[REACT] iterations={iterations} budget={budget}")
+    all_ok &= iterations == 1 and budget == 0.1
+
+    if all_ok:
+        print("[OK] agent metrics smoketest: 5/5 passed")
+        return 0
+    print("[FAIL] agent metrics smoketest")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
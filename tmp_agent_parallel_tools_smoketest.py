@@ -0,0 +1,142 @@
+import asyncio
+import json
+import sys
+import time
+
+from beeai_framework.agents.requirement import RequirementAgent
+from beeai_framework.agents.requirement.requirements.conditional import ConditionalRequirement
+from beeai_framework.backend import AssistantMessage
+from beeai_framework.backend.message import MessageToolCallContent, ToolMessage
+from beeai_framework.tools import tool
+from beeai_framework.tools.think import ThinkTool
+
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+from beeai_framework_starter.helpers.parallel_tools import bounded_tools
+
+TOOL_LATENCY_S = 0.1
+_running = 0
+_peak = 0
+
+
+async def _work(label, seconds):
+    global _running, _peak
+    _running += 1
+    _peak = max(_peak, _running)
+    try:
+        await asyncio.sleep(seconds)
+        return label
+    finally:
+        _running -= 1
+
+
+@tool
+async def weather(city: str) -> str:
+    """Current weather for a city."""
+    return await _work(f"weather in {city}: sunny", TOOL_LATENCY_S * 1.5)
+
+
+@tool
+async def search(query: str) -> str:
+    """Web search."""
+    return await _work(f"events for {query}: jazz festival", TOOL_LATENCY_S)
+
+
+@tool
+async def hanging(query: str) -> str:
+    """Never answers in time."""
+    return await _work("too late", 10)
+
+
+def _calls(*calls):
+    return AssistantMessage(
+        [
+            MessageToolCallContent(id=f"call_{idx}", tool_name=name, args=json.dumps(args))
+            for idx, (name, args) in enumerate(calls)
+        ]
+    )
+
+
+def _scripted(step_calls):
+    """step_calls[i] are the tool calls of step i (after the forced think step); then the final answer."""
+
+    def respond(messages):
+        step = sum(isinstance(message, AssistantMessage) and bool(message.get_tool_calls()) for message in messages)
+        if step == 0:
+            return _calls(("think", {"thoughts": "plan", "next_step": ["weather", "search"]}))
+        if step - 1 < len(step_calls):
+            return _calls(*step_calls[step - 1])
+        return _calls(("final_answer", {"response": "done"}))
+
+    return respond
+
+
+def _tool_results(response):
+    return [
+        (content.tool_name, content.result)
+        for message in response.state.memory.messages
+        if isinstance(message, ToolMessage)
+        for content in message.content
+    ]
+
+
+async def _run(tools, step_calls):
+    agent = RequirementAgent(
+        llm=FakeChatModel(_scripted(step_calls), allow_parallel_tool_calls=True),
+        tools=tools,
+        requirements=[ConditionalRequirement(ThinkTool, force_at_step=1, max_invocations=1)],
+    )
+    start = time.perf_counter()
+    response = await agent.run("What to do in Boston?", max_iterations=6)
+    return response, time.perf_counter() - start
+
+
+async def main():
+    global _peak
+    all_ok = True
+    step = [("weather", {"city": "Boston"}), ("search", {"query": "Boston"})]
+
+    response, elapsed = await _run(bounded_tools([ThinkTool(), weather, search]), [step])
+    results = [name for name, _ in _tool_results(response)]
+    print(f"[PARALLEL] elapsed_s={elapsed:.3f} peak={_peak} order={results}")
+    all_ok &= response.last_message.text == "done" and _peak == 2
+    all_ok &= elapsed < TOOL_LATENCY_S * 2.3 and results == ["think", "weather", "search", "final_answer"]
+
+    _peak = 0
+    fan_out = [("search", {"query": f"topic {i}"}) for i in range(4)]
+    response, elapsed = await _run(bounded_tools([ThinkTool(), search], {"max_concurrency": 2}), [fan_out])
+    answers = [result for name, result in _tool_results(response) if name == "search"]
+    print(f"[CAP] elapsed_s={elapsed:.3f} peak={_peak} answers={len(answers)}")
+    all_ok &= _peak == 2 and elapsed >= TOOL_LATENCY_S * 2
+    all_ok &= answers == [f"events for topic {i}: jazz festival" for i in range(4)]
+
+    tools = bounded_tools([ThinkTool(), search, hanging], {"timeouts": {"hanging": 0.05}})
+    response, elapsed = await _run(tools, [[("hanging", {"query": "x"}), ("search", {"query": "Boston"})]])
+    results = dict(_tool_results(response))
+    print(f"[TIMEOUT] elapsed_s={elapsed:.3f} hanging={results['hanging'][:60]!r}")
+    all_ok &= response.last_message.text == "done" and elapsed < 1.0
+    all_ok &= "timed out after 0.05s" in results["hanging"] and results["search"].startswith("events for Boston")
+
+    _peak = 0
+    think, bounded_search, bounded_hanging = bounded_tools(
+        [ThinkTool(), search, hanging], {"max_concurrency": 2, "timeouts": {"hanging": 0.05}}
+    )
+    agent = RequirementAgent(llm=FakeChatModel(), tools=[think, bounded_search, bounded_hanging])
+    think_clone, search_clone, hanging_clone = (await agent.clone())._tools
+    await asyncio.gather(*(search_clone.run({"query": f"q{i}"}) for i in range(4)))
+    try:
+        await hanging_clone.run({"query": "x"})
+        timed_out = False
+    except Exception as e:
+        timed_out = "timed out after 0.05s" in str(e)
+    print(f"[CLONE] peak={_peak} timed_out={timed_out} think_is_think={isinstance(think_clone, ThinkTool)}")
+    all_ok &= _peak == 2 and timed_out and isinstance(think_clone, ThinkTool) and think_clone is not think
+
+    if all_ok:
+        print("[OK] agent parallel tools smoketest: 4/4 passed")
+        return 0
+    print("[FAIL] agent parallel tools smoketest")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from beeai_framework.agents.requirement import RequirementAgent
+from beeai_framework.backend import AssistantMessage
+from beeai_framework.backend.message import MessageToolCallContent, ToolMessage
+from beeai_framework.tools import StringToolOutput, ToolError, tool
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+from beeai_framework_starter.helpers.tool_cache import ToolCacheMiddleware, tool_cache_key
+
+calls = {"weather": 0, "wiki": 0, "broken": 0}
+
+
+@tool
+def weather(city: str) -> str:
+    """Current weather for a city."""
+    calls["weather"] += 1
+    return f"weather in {city}: sunny"
+
+
+@tool
+def wiki(topic: str) -> str:
+    """Encyclopedia lookup."""
+    calls["wiki"] += 1
+    return f"{topic} was founded in 1630"
+
+
+@tool
+def broken(query: str) -> str:
+    """Always fails."""
+    calls["broken"] += 1
+    raise ToolError("upstream unavailable")
+
+
+def _asks(*tool_calls):
+    """Calls one tool per step in order, then answers with the text of the tool results."""
+
+    def respond(messages):
+        results = [c.result for m in messages if isinstance(m, ToolMessage) for c in m.content]
+        if len(results) < len(tool_calls):
+            name, args = tool_calls[len(results)]
+            content = MessageToolCallContent(id=f"call_{len(results)}", tool_name=name, args=json.dumps(args))
+        else:
+            answer = json.dumps({"response": " | ".join(results)})
+            content = MessageToolCallContent(id="call_final", tool_name="final_answer", args=answer)
+        return AssistantMessage(content)
+
+    return respond
+
+
+async def _ask(cache, *tool_calls):
+    agent = RequirementAgent(llm=FakeChatModel(_asks(*tool_calls)), tools=[weather, wiki, broken])
+    response = await agent.run("What to do in Boston?").middleware(cache)
+    return response.last_message.text
+
+
+def _lookups(reader):
+    counts = {}
+    for resource_metrics in reader.get_metrics_data().resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                if metric.name == "agent.tool.cache":
+                    for point in metric.data.data_points:
+                        key = (point.attributes["result"], point.attributes["tier"])
+                        counts[key] = counts.get(key, 0) + point.value
+    return counts
+
+
+async def main():
+    all_ok = True
+    reader = InMemoryMetricReader()
+    meter = MeterProvider(metric_readers=[reader]).get_meter("smoke")
+    workdir = Path(tempfile.mkdtemp())
+    options = {
+        "ttls": {"weather": 0.2, "wiki": None, "broken": 60},
+        "disk_path": str(workdir / "tools.sqlite"),
+        "case_insensitive": {"weather": ["city"], "wiki": ["topic"]},
+    }
+    cache = ToolCacheMiddleware(options, meter=meter)
+    # every disk-tier call is recorded with the thread it ran on
+    disk_threads = set()
+    for name in ("get", "put"):
+        disk_call = getattr(cache._disk, name)
+
+        def on_thread(*args, _call=disk_call):
+            disk_threads.add(threading.current_thread().name)
+            return _call(*args)
+
+        setattr(cache._disk, name, on_thread)
+
+    first = await _ask(cache, ("weather", {"city": "Boston"}), ("wiki", {"topic": "Boston"}))
+    second = await _ask(cache, ("weather", {"city": "  boston "}), ("wiki", {"topic": "BOSTON"}))
+    print(f"[REPEAT] calls={calls} stats={cache.stats} same_answer={first == second}")
+    all_ok &= first == second and calls["weather"] == 1 and calls["wiki"] == 1 and cache.stats["hits"] == 2
+
+    print(f"[OFF_LOOP] disk_threads={sorted(disk_threads)}")
+    all_ok &= bool(disk_threads) and all(name.startswith("tool-cache-store") for name in disk_threads)
+
+    # only the fields listed in case_insensitive are case-folded; whitespace is collapsed everywhere
+    folded = ["topic"]
+    same_folded = tool_cache_key(wiki, {"topic": "Boston"}, folded) == tool_cache_key(wiki, {"topic": "BOSTON"}, folded)
+    same_exact = tool_cache_key(wiki, {"topic": "Boston"}) == tool_cache_key(wiki, {"topic": "BOSTON"})
+    same_spaces = tool_cache_key(wiki, {"topic": "New  York"}) == tool_cache_key(wiki, {"topic": " New York"})
+    print(f"[CASE] folded_field={same_folded} other_field={same_exact} whitespace={same_spaces}")
+    all_ok &= same_folded and not same_exact and same_spaces
+
+    time.sleep(0.25)
+    await _ask(cache, ("weather", {"city": "Boston"}), ("wiki", {"topic": "Boston"}))
+    print(f"[TTL] weather_calls={calls['weather']} wiki_calls={calls['wiki']}")
+    all_ok &= calls["weather"] == 2 and calls["wiki"] == 1
+
+    await _ask(cache, ("broken", {"query": "x"}))
+    await _ask(cache, ("broken", {"query": "x"}))
+    print(f"[ERRORS] broken_calls={calls['broken']}")
+    all_ok &= calls["broken"] == 2
+
+    restarted = ToolCacheMiddleware(options, meter=meter)
+    third = await _ask(restarted, ("wiki", {"topic": "Boston"}))
+    print(f"[DISK] wiki_calls={calls['wiki']} stats={restarted.stats} answer={third!r}")
+    all_ok &= calls["wiki"] == 1 and restarted.stats["disk_hits"] == 1 and third == "Boston was founded in 1630"
+
+    lru = ToolCacheMiddleware({"ttls": {"wiki": None}, "max_entries": 2}, meter=meter)
+    keys = [tool_cache_key(wiki, {"topic": topic}) for topic in ("a", "b", "c")]
+    for key in keys:
+        await lru.put(key, "wiki", StringToolOutput(key))
+    evicted = [(await lru.get(key))[0] is None for key in keys]
+    print(f"[LRU] evicted={evicted}")
+    all_ok &= evicted == [True, False, False]
+
+    lookups = _lookups(reader)
+    print(f"[METRICS] lookups={lookups}")
+    all_ok &= lookups.get(("hit", "memory")) == 3 and lookups.get(("hit", "disk")) == 1
+    all_ok &= lookups.get(("miss", "none")) == 5
+
+    cache.close()
+    restarted.close()
+    if all_ok:
+        print("[OK] agent tool cache smoketest: 8/8 passed")
+        return 0
+    print("[FAIL] agent tool cache smoketest")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import sys
+import time
+
+from beeai_framework.backend import AssistantMessage
+from beeai_framework.backend.message import MessageToolCallContent, SystemMessage
+from beeai_framework.errors import FrameworkError
+from beeai_framework.workflows.agent import AgentWorkflow, AgentWorkflowInput
+
+from beeai_framework_starter.helpers.concurrent_workflow import ConcurrentAgentWorkflow
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+
+LLM_LATENCY_S = 0.2
+seen: dict[str, list[str]] = {}
+
+
+def _said(message):
+    """Text of a message, or the response passed to final_answer."""
+    if isinstance(message, AssistantMessage) and message.get_tool_calls():
+        return json.loads(message.get_tool_calls()[0].args).get("response", "")
+    return message.text
+
+
+def _agent_llm(name, answer=None, latency=LLM_LATENCY_S):
+    """Answers via the final_answer tool; the synthesizer (answer=None) joins what the others answered."""
+
+    def respond(messages):
+        history = [_said(m) for m in messages if not isinstance(m, SystemMessage)]
+        seen[name] = history
+        if answer is None:
+            text = " + ".join(text for text in history if text.startswith("fact:"))
+        elif answer == "fail":
+            raise RuntimeError(f"{name} is down")
+        else:
+            text = answer
+        args = json.dumps({"response": text})
+        return AssistantMessage(MessageToolCallContent(id=f"call_{name}", tool_name="final_answer", args=args))
+
+    return FakeChatModel(respond, latency=latency)
+
+
+def _workflow(workflow, fan_out=True, weather_answer="fact: sunny in Boston"):
+    independent = {"depends_on": []} if fan_out else {}
+    workflow.add_agent(name="Researcher", llm=_agent_llm("Researcher", "fact: Boston founded 1630"))
+    workflow.add_agent(name="WeatherForecaster", llm=_agent_llm("WeatherForecaster", weather_answer), **independent)
+    synth = {"depends_on": ["Researcher", "WeatherForecaster"]} if fan_out else {}
+    workflow.add_agent(name="DataSynthesizer", llm=_agent_llm("DataSynthesizer"), **synth)
+    return workflow
+
+
+INPUTS = [
+    AgentWorkflowInput(prompt="Provide a short history of the location.", context="Boston"),
+    AgentWorkflowInput(prompt="Provide the weather for the location.", context="Boston"),
+    AgentWorkflowInput(prompt="Summarize the historical and weather data."),
+]
+
+
+async def _run(workflow):
+    steps = []
+    start = time.perf_counter()
+    response = await workflow.run(INPUTS).on("success", lambda data, event: steps.append(data.step))
+    return response, steps, time.perf_counter() - start
+
+
+async def main():
+    all_ok = True
+
+    workflow = _workflow(ConcurrentAgentWorkflow())
+    response, steps, elapsed = await _run(workflow)
+    answers = response.state.final_answers
+    print(f"[FAN_OUT] elapsed_s={elapsed:.3f} levels={workflow.levels()} steps={steps}")
+    all_ok &= workflow.levels() == [["Researcher", "WeatherForecaster"], ["DataSynthesizer"]]
+    all_ok &= steps == ["Researcher+WeatherForecaster", "DataSynthesizer"] and elapsed < LLM_LATENCY_S * 2.5
+    all_ok &= [workflow.agents_of(step) for step in steps] == workflow.levels()
+
+    print(f"[JOIN] final={response.state.final_answer!r} answers={answers}")
+    all_ok &= response.state.final_answer == "fact: Boston founded 1630 + fact: sunny in Boston"
+    all_ok &= answers["WeatherForecaster"] == "fact: sunny in Boston" and len(answers) == 3
+
+    weather_saw_research = any("1630" in text for text in seen["WeatherForecaster"])
+    print(f"[ISOLATION] weather_saw_research={weather_saw_research} synthesizer_saw={len(seen['DataSynthesizer'])}")
+    all_ok &= not weather_saw_research and "Boston" in seen["WeatherForecaster"][-1]
+
+    sequential, _, seq_elapsed = await _run(_workflow(AgentWorkflow(), fan_out=False))
+    ordered, _, _ = await _run(_workflow(ConcurrentAgentWorkflow(), fan_out=False))
+    same = [m.text for m in ordered.state.new_messages] == [m.text for m in sequential.state.new_messages]
+    print(f"[SEQUENTIAL] sequential_s={seq_elapsed:.3f} same_messages={same}")
+    all_ok &= same and ordered.state.final_answer == sequential.state.final_answer
+
+    errors = []
+    try:
+        ConcurrentAgentWorkflow().add_agent(name="A", llm=_agent_llm("A", "x"), depends_on=["B"])
+    except ValueError as e:
+        errors.append(str(e))
+    try:
+        start = time.perf_counter()
+        await _run(_workflow(ConcurrentAgentWorkflow(), weather_answer="fail"))
+    except FrameworkError as e:
+        errors.append(f"{time.perf_counter() - start:.2f}s {e.explain()[:80]}")
+    print(f"[ERRORS] {errors}")
+    all_ok &= len(errors) == 2 and "Unknown dependencies ['B']" in errors[0]
+
+    if all_ok:
+        print("[OK] agent workflow fan-out smoketest: 5/5 passed")
+        return 0
+    print("[FAIL] agent workflow fan-out smoketest")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,122 +1,379 @@
 import argparse
 import asyncio
+import atexit
+import json
 import os
 import sys
+import time
+from collections.abc import AsyncGenerator, Callable, Coroutine
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from beeai_framework.errors import FrameworkError
+
 from tmp_rag_guardrails_impl import run_guardrails
 
+if TYPE_CHECKING:
+    from beeai_framework.backend import AnyMessage, ChatModel
+
+    from tmp_llm_response_cache import ResponseCache
+
+T = TypeVar("T")
+
 
 def _env_truthy(name: str) -> bool:
     value = os.getenv(name, "")
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
-def build_llm_prompt(prompt_payload: dict) -> str:
+def split_llm_prompt(prompt_payload: dict[str, Any]) -> tuple[str, str]:
+    """
+    (stable prefix, variable suffix) of the answer prompt.
+    The prefix (system instruction + instructions) is identical across questions, so it can be cached by the provider.
+    """
     system_instruction = prompt_payload.get("system_instruction", "")
     instructions = prompt_payload.get("instructions", "")
     context = prompt_payload.get("context", "")
     user_query = prompt_payload.get("user_query", "")
 
-    parts = [
-        "SYSTEM INSTRUCTION",
-        system_instruction,
-        "",
-        "INSTRUCTIONS",
-        instructions,
-        "",
-        "CONTEXT",
-        context,
-        "",
-        f"User question: {user_query}",
-    ]
-    return "\n".join(parts)
-
-
-async def generate_answer_real(prompt_payload: dict) -> str:
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        print("Error: GEMINI_API_KEY is not set in the environment.")
-        sys.exit(1)
-
-    prompt = build_llm_prompt(prompt_payload)
-
-    model_id = "gemini-2.5-flash"
+    prefix = "\n".join(["SYSTEM INSTRUCTION", system_instruction, "", "INSTRUCTIONS", instructions])
+    suffix = "\n".join(["CONTEXT", context, "", f"User question: {user_query}"])
+    return prefix, suffix
+
+
+def build_llm_prompt(prompt_payload: dict[str, Any]) -> str:
+    prefix, suffix = split_llm_prompt(prompt_payload)
+    return f"{prefix}\n\n{suffix}"
+
+
+def build_llm_messages(prompt_payload: dict[str, Any]) -> list["AnyMessage"]:
+    """Prefix as the system message, suffix as the user message."""
+    from beeai_framework.backend import SystemMessage, UserMessage
+
+    prefix, suffix = split_llm_prompt(prompt_payload)
+    return [SystemMessage(prefix), UserMessage(suffix)]
+
+
+@dataclass
+class GenerationMetrics:
+    """Per-call latency numbers for model comparison. Times are milliseconds."""
+
+    model_id: str = ""
+    ttft_ms: float | None = None
+    total_ms: float = 0.0
+    completion_tokens: int = 0
+    # True when the provider reported no usage and completion_tokens is a ~4 chars/token estimate.
+    tokens_estimated: bool = False
+    tokens_per_s: float = 0.0
+    # Prompt tokens served from the provider's context cache (0 when unsupported or not reported).
+    cached_prompt_tokens: int = 0
+
+
+DEFAULT_MODEL_ID = "gemini-2.5-flash"
+GEMINI_PROVIDER = "gemini"
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Providers whose beeai/LiteLLM adapters honour cache_control_injection_points (context caching of the prefix).
+CONTEXT_CACHING_PROVIDERS = {"anthropic", "amazon_bedrock", "gemini", "vertexai"}
+# In-process response cache for models without context caching: identical prompts are answered once.
+RESPONSE_CACHE_SIZE = 256
+
+
+def resolve_model_id() -> str:
+    """Gemini model id from the provider profile, falling back to DEFAULT_MODEL_ID."""
     try:
-        from belbin_engine.utils.provider_loader import load_provider_profile
+        from belbin_engine.utils.provider_loader import load_provider_profile  # type: ignore[import-not-found]
 
         profile = load_provider_profile()
         gemini_cfg = profile.get("providers", {}).get("gemini", {}).get("llm", {})
-        model_id = gemini_cfg.get("model_id", model_id)
+        return str(gemini_cfg.get("model_id", DEFAULT_MODEL_ID))
     except Exception:
-        pass
+        return DEFAULT_MODEL_ID
+
+
+class AnswerGenerator:
+    """
+    Long-lived answer generator.
+
+    Chat models are constructed once per model id and reused, so their HTTP clients survive across answers.
+    Use one instance per process (see default_generator()) and call it from a single event loop.
+    model_id overrides the profile's model; llm pins a ready-made chat model (e.g. a local stand-in) as the default.
+
+    Prompts are sent as a stable system prefix plus a variable user suffix. Models with context caching get the
+    prefix marked for caching (Gemini: opt-in via LLM_PROMPT_CACHING=1); other models get an in-process response
+    cache so identical full prompts reach the backend only once.
+    """
+
+    def __init__(
+        self,
+        llm: "ChatModel | None" = None,
+        model_id: str | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        self._models: dict[str, ChatModel] = {}
+        self.max_concurrency = max_concurrency
+        if llm is not None:
+            self._models[llm.model_id] = _with_prompt_caching(llm)
+            self.default_model_id = llm.model_id
+        else:
+            self.default_model_id = model_id or resolve_model_id()
+
+    def model(self, model_id: str | None = None) -> "ChatModel":
+        model_id = model_id or self.default_model_id
+        if model_id not in self._models:
+            from beeai_framework.backend import ChatModel
+
+            if not os.getenv("GEMINI_API_KEY"):
+                raise RuntimeError("GEMINI_API_KEY is not set in the environment.")
+            llm = ChatModel.from_name(
+                f"{GEMINI_PROVIDER}:{model_id}", allow_prompt_caching=_env_truthy("LLM_PROMPT_CACHING")
+            )
+            self._models[model_id] = _with_prompt_caching(llm)
+        return self._models[model_id]
+
+    def model_settings(self, model_id: str | None = None) -> dict[str, Any]:
+        """
+        Provider and generation parameters (temperature, max_tokens, top_p, ...) the model answers with. Read from
+        the configuration when the model is not built yet, so no API key or client is needed.
+        """
+        llm = self._models.get(model_id or self.default_model_id)
+        provider: str
+        if llm is not None:
+            provider, parameters = llm.provider_id, llm.parameters
+        else:
+            from beeai_framework.adapters.gemini import GeminiChatModel
+
+            provider, parameters = GEMINI_PROVIDER, GeminiChatModel.get_default_parameters()
+        return {"provider": provider, "parameters": parameters.model_dump(mode="json", exclude_none=True)}
+
+    async def generate(self, prompt_payload: dict[str, Any], model_id: str | None = None) -> str:
+        llm = self.model(model_id)
+        out = await llm.run(build_llm_messages(prompt_payload), **_run_options(llm))
+        return str(out.get_text_content())
+
+    async def generate_many(
+        self, prompt_payloads: list[dict[str, Any]], model_id: str | None = None, concurrency: int | None = None
+    ) -> list[str]:
+        """Answers in input order, with at most `concurrency` (default max_concurrency) calls in flight."""
+        semaphore = asyncio.Semaphore(concurrency or self.max_concurrency)
+
+        async def _one(payload: dict[str, Any]) -> str:
+            async with semaphore:
+                return await self.generate(payload, model_id=model_id)
+
+        return list(await asyncio.gather(*(_one(payload) for payload in prompt_payloads)))
+
+    async def stream(
+        self, prompt_payload: dict[str, Any], metrics: GenerationMetrics | None = None, model_id: str | None = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Yield answer text deltas as they arrive.
+        If metrics is given it is filled in: time-to-first-token, total latency and tokens/s.
+        """
+        llm = self.model(model_id)
+        metrics = metrics if metrics is not None else GenerationMetrics()
+        metrics.model_id = llm.model_id
+
+        start = time.perf_counter()
+        final_output = None
+        streamed_chars = 0
+        async for data, event in llm.run(build_llm_messages(prompt_payload), stream=True, **_run_options(llm)):
+            if event.name == "new_token":
+                delta = data.value.get_text_content()
+                if not delta:
+                    continue
+                if metrics.ttft_ms is None:
+                    metrics.ttft_ms = round((time.perf_counter() - start) * 1000, 2)
+                streamed_chars += len(delta)
+                yield delta
+            elif event.name == "success":
+                final_output = data.value
+
+        metrics.total_ms = round((time.perf_counter() - start) * 1000, 2)
+        usage_tokens = final_output.usage.completion_tokens if final_output is not None and final_output.usage else 0
+        metrics.completion_tokens = usage_tokens or (streamed_chars + 3) // 4
+        metrics.tokens_estimated = not usage_tokens
+        if final_output is not None and final_output.usage:
+            metrics.cached_prompt_tokens = final_output.usage.cached_prompt_tokens
+        generation_ms = metrics.total_ms - (metrics.ttft_ms or 0.0)
+        if generation_ms > 0:
+            metrics.tokens_per_s = round(metrics.completion_tokens / (generation_ms / 1000), 2)
+
+
+def _supports_context_caching(llm: "ChatModel") -> bool:
+    return llm.provider_id in CONTEXT_CACHING_PROVIDERS and llm.allow_prompt_caching
+
+
+def _with_prompt_caching(llm: "ChatModel") -> "ChatModel":
+    if not _supports_context_caching(llm):
+        from beeai_framework.cache import NullCache, SlidingCache
+
+        if isinstance(llm.cache, NullCache):
+            llm.config(cache=SlidingCache(size=RESPONSE_CACHE_SIZE))
+    return llm
+
+
+def _run_options(llm: "ChatModel") -> dict[str, Any]:
+    if not _supports_context_caching(llm):
+        return {}
+    # Message 0 is the stable prefix (see build_llm_messages).
+    return {"cache_control_injection_points": [{"location": "message", "index": 0}]}
+
+
+_default_generator: AnswerGenerator | None = None
+_runner: asyncio.Runner | None = None
+
+
+def default_generator() -> AnswerGenerator:
+    """Process-wide generator used by the CLI helpers below."""
+    global _default_generator
+    if _default_generator is None:
+        _default_generator = AnswerGenerator()
+    return _default_generator
+
+
+def _run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    # One event loop for all synchronous calls: cached chat models keep clients bound to the loop they first ran on.
+    global _runner
+    if _runner is None:
+        _runner = asyncio.Runner()
+        atexit.register(_runner.close)
+    return _runner.run(coro)
+
+
+def _fail(message: str) -> None:
+    print(message)
+    sys.exit(1)
+
+
+async def stream_answer_real(
+    prompt_payload: dict[str, Any], metrics: GenerationMetrics | None = None, llm: "ChatModel | None" = None
+) -> AsyncGenerator[str, None]:
+    """
+    Yield answer text deltas from the chat model as they arrive (see AnswerGenerator.stream).
+    llm overrides the Gemini chat model (e.g. a local stand-in).
+    """
+    generator = AnswerGenerator(llm=llm) if llm is not None else default_generator()
+    try:
+        async for delta in generator.stream(prompt_payload, metrics):
+            yield delta
+    except RuntimeError as e:
+        _fail(f"Error: {e}")
+    except FrameworkError as e:
+        _fail(e.explain())
+
+
+async def generate_answer_streaming(
+    prompt_payload: dict[str, Any], on_delta: Callable[[str], None] | None = None, llm: "ChatModel | None" = None
+) -> tuple[str, GenerationMetrics]:
+    """Collect a streamed answer, passing each delta to on_delta (e.g. to print it incrementally)."""
+    metrics = GenerationMetrics()
+    parts = []
+    async for delta in stream_answer_real(prompt_payload, metrics, llm=llm):
+        parts.append(delta)
+        if on_delta:
+            on_delta(delta)
+    return "".join(parts), metrics
+
+
+def _print_delta(delta: str) -> None:
+    print(delta, end="", flush=True)
 
-    from beeai_framework.backend import ChatModel, UserMessage
 
-    llm = ChatModel.from_name("gemini:gemini-2.5-flash")
-    run = llm.run([UserMessage(prompt)])
+async def generate_answer_real(prompt_payload: dict[str, Any]) -> str:
     try:
-        out = await run.handler()
+        return await default_generator().generate(prompt_payload)
+    except RuntimeError as e:
+        _fail(f"Error: {e}")
     except FrameworkError as e:
-        print(e.explain())
-        sys.exit(1)
+        _fail(e.explain())
+    return ""
 
-    # Extract assistant text
-    if hasattr(out, "output") and out.output:
-        msg = out.output[-1]
-        if hasattr(msg, "content"):
-            content = msg.content
 
-            # If content is a list of MessageTextContent-like items
-            if isinstance(content, list) and content:
-                first = content[0]
-                if hasattr(first, "text") and first.text:
-                    return first.text
+def guardrails_flags() -> dict[str, bool]:
+    # Guardrails v2 flags are opt-in and default OFF.
+    return {
+        "enable_v2_semantic_support_check": _env_truthy("ENABLE_V2_SEMANTIC_SUPPORT_CHECK"),
+        "enable_v2_strict_claim_extraction": _env_truthy("ENABLE_V2_STRICT_CLAIM_EXTRACTION"),
+        "enable_v2_claim_citation_alignment": _env_truthy("ENABLE_V2_CLAIM_CITATION_ALIGNMENT"),
+    }
 
-            # If content is already a string
-            if isinstance(content, str):
-                return content
 
-            # Fallback
-            return str(content)
-        if hasattr(msg, "text"):
-            return msg.text
+def response_cache_params(
+    flags: dict[str, bool], generator: AnswerGenerator, model_id: str | None = None
+) -> dict[str, Any]:
+    """
+    Everything besides the prompt that changes the answer or its verdict: the chat model's provider and its
+    generation parameters as configured (see AnswerGenerator.model_settings) and the guardrails flags.
+    The model id is keyed separately by the response cache.
+    """
+    return {**generator.model_settings(model_id), "guardrails": flags}
 
-    return str(out)
 
-    message = getattr(out, "message", None)
-    content = getattr(message, "content", None) if message else None
-    if isinstance(content, str) and content.strip():
-        return content
+_response_cache: "ResponseCache | None" = None
 
-    messages = getattr(out, "messages", None)
-    if messages:
-        last = messages[-1]
-        last_content = getattr(last, "content", None)
-        if isinstance(last_content, str) and last_content.strip():
-            return last_content
 
-    text = getattr(out, "text", None)
-    if isinstance(text, str) and text.strip():
-        return text
+def open_response_cache() -> "ResponseCache | None":
+    """
+    Persistent answer cache, enabled with LLM_RESPONSE_CACHE=1.
+    LLM_RESPONSE_CACHE_PATH, LLM_RESPONSE_CACHE_TTL_S and LLM_RESPONSE_CACHE_MAX_ENTRIES override the defaults.
+    """
+    global _response_cache
+    if not _env_truthy("LLM_RESPONSE_CACHE"):
+        return None
+    if _response_cache is None:
+        from pathlib import Path
 
-    return str(out)
+        from tmp_llm_response_cache import (
+            RESPONSE_CACHE_MAX_ENTRIES,
+            RESPONSE_CACHE_PATH,
+            RESPONSE_CACHE_TTL_S,
+            ResponseCache,
+        )
 
+        _response_cache = ResponseCache(
+            path=Path(os.getenv("LLM_RESPONSE_CACHE_PATH", str(RESPONSE_CACHE_PATH))),
+            ttl_s=float(os.getenv("LLM_RESPONSE_CACHE_TTL_S", RESPONSE_CACHE_TTL_S)),
+            max_entries=int(os.getenv("LLM_RESPONSE_CACHE_MAX_ENTRIES", RESPONSE_CACHE_MAX_ENTRIES)),
+        )
+    return _response_cache
 
-def generate_answer(prompt_payload: dict, real: bool = False) -> str:
+
+def generate_answer(prompt_payload: dict[str, Any], real: bool = False, stream: bool = False) -> str:
     _ = build_llm_prompt(prompt_payload)
     if not real:
         return "LLM ANSWER (stub): this is where the model response will go."
-    answer_text = asyncio.run(generate_answer_real(prompt_payload))
-    # Guardrails v2 flags are opt-in and default OFF.
-    guardrails_result = run_guardrails(
-        answer_text=answer_text,
-        retrieved_chunks=prompt_payload.get("retrieved_chunks", []),
-        prompt_context_string=prompt_payload.get("context", ""),
-        enable_v2_semantic_support_check=_env_truthy("ENABLE_V2_SEMANTIC_SUPPORT_CHECK"),
-        enable_v2_strict_claim_extraction=_env_truthy("ENABLE_V2_STRICT_CLAIM_EXTRACTION"),
-        enable_v2_claim_citation_alignment=_env_truthy("ENABLE_V2_CLAIM_CITATION_ALIGNMENT"),
-    )
+
+    flags = guardrails_flags()
+    cache = open_response_cache()
+    generator = default_generator()
+    model_id, cache_params = generator.default_model_id, response_cache_params(flags, generator)
+    cached = cache.get(model_id, cache_params, prompt_payload) if cache is not None else None
+
+    if cached is not None:
+        # A hit skips both the LLM call and guardrails validation.
+        answer_text: str = cached["answer_text"]
+        guardrails_result = cached["guardrails"]
+        if stream:
+            print("STREAMING ANSWER (cached)")
+            print(answer_text)
+    else:
+        if stream:
+            # Deltas are printed as they arrive; guardrails still validate the complete answer below.
+            print("STREAMING ANSWER")
+            answer_text, metrics = _run_sync(generate_answer_streaming(prompt_payload, on_delta=_print_delta))
+            print()
+            print(f"METRICS: {json.dumps(asdict(metrics))}")
+        else:
+            answer_text = _run_sync(generate_answer_real(prompt_payload))
+        guardrails_result = run_guardrails(
+            answer_text=answer_text,
+            retrieved_chunks=prompt_payload.get("retrieved_chunks", []),
+            prompt_context_string=prompt_payload.get("context", ""),
+            **flags,
+        )
+        if cache is not None:
+            cache.put(model_id, cache_params, prompt_payload, answer_text, guardrails_result)
 
     status = guardrails_result.get("status")
     reasons = guardrails_result.get("reasons", []) or []
@@ -141,6 +398,9 @@ def generate_answer(prompt_payload: dict, real: bool = False) -> str:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="LLM Answer Generator (stub or Gemini).")
     parser.add_argument("--real", action="store_true", help="Call Gemini via beeai_framework.")
+    parser.add_argument(
+        "--stream", action="store_true", help="Stream the answer and report TTFT, tokens/s and total latency."
+    )
     args = parser.parse_args()
 
     example_payload = {
@@ -153,4 +413,4 @@ if __name__ == "__main__":
     combined_prompt = build_llm_prompt(example_payload)
     print(combined_prompt)
     print()
-    print(generate_answer(example_payload, real=args.real))
+    print(generate_answer(example_payload, real=args.real, stream=args.stream))
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sys
+
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+from tmp_llm_answer_generator import AnswerGenerator
+
+
+def _payload(i):
+    return {
+        "system_instruction": "Answer only using the provided context.",
+        "instructions": "Cite sources like [C1].",
+        "context": "[C1]\ntext: Example context text.",
+        "user_query": f"question {i}",
+    }
+
+
+async def _run_many(generator, payloads, concurrency):
+    in_flight = {"now": 0, "max": 0}
+    llm = generator.model()
+    original = llm._create
+
+    async def _tracked(input, run):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            return await original(input, run)
+        finally:
+            in_flight["now"] -= 1
+
+    llm._create = _tracked
+    answers = await generator.generate_many(payloads, concurrency=concurrency)
+    return answers, in_flight["max"]
+
+
+def main():
+    all_ok = True
+
+    llm = FakeChatModel(lambda msgs: msgs[-1].text.splitlines()[-1], latency=0.02)
+    generator = AnswerGenerator(llm=llm)
+    payloads = [_payload(i) for i in range(8)]
+    answers, max_in_flight = asyncio.run(_run_many(generator, payloads, concurrency=3))
+    print(f"[GENERATE_MANY] answers={len(answers)} max_in_flight={max_in_flight} calls={llm.calls}")
+    all_ok &= answers == [f"User question: question {i}" for i in range(8)]
+    all_ok &= max_in_flight == 3 and llm.calls == 8
+
+    print(f"[REUSE] same_instance={generator.model() is llm}")
+    all_ok &= generator.model() is llm
+
+    os.environ.setdefault("GEMINI_API_KEY", "smoketest-not-used")
+    configured = AnswerGenerator(model_id="gemini-2.0-flash")
+    first = configured.model()
+    print(f"[MODEL_ID] model_id={first.model_id} cached={configured.model() is first}")
+    all_ok &= first.model_id == "gemini-2.0-flash" and configured.model() is first
+
+    if all_ok:
+        print("[OK] llm generator pool smoketest: 3/3 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
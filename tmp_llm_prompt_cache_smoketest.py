@@ -0,0 +1,63 @@
+import asyncio
+import sys
+
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+from tmp_llm_answer_generator import AnswerGenerator, build_llm_prompt, split_llm_prompt
+
+
+def _payload(query):
+    return {
+        "system_instruction": "Answer only using the provided context.",
+        "instructions": "Cite sources like [C1].",
+        "context": "[C1]\ntext: Example context text.",
+        "user_query": query,
+    }
+
+
+class _ContextCachingFake(FakeChatModel):
+    """Stand-in that reports a provider with context caching and records the request options."""
+
+    def __init__(self):
+        super().__init__(lambda _: "Cached prefix answer [C1].")
+        self.injection_points = []
+
+    @property
+    def provider_id(self):
+        return "anthropic"
+
+    async def _create(self, input, run):
+        self.injection_points.append(getattr(input, "cache_control_injection_points", None))
+        return await super()._create(input, run)
+
+
+async def _answer_twice(generator, payload):
+    return [await generator.generate(payload), await generator.generate(payload)]
+
+
+def main():
+    all_ok = True
+
+    first_prefix, first_suffix = split_llm_prompt(_payload("What is the example about?"))
+    second_prefix, _ = split_llm_prompt(_payload("Who wrote it?"))
+    print(f"[SPLIT] stable_prefix={first_prefix == second_prefix}")
+    all_ok &= first_prefix == second_prefix
+    all_ok &= build_llm_prompt(_payload("What is the example about?")) == f"{first_prefix}\n\n{first_suffix}"
+
+    local = FakeChatModel(lambda msgs: f"{len(msgs)} messages [C1].")
+    answers = asyncio.run(_answer_twice(AnswerGenerator(llm=local), _payload("What is the example about?")))
+    print(f"[RESPONSE_CACHE] answers={answers} backend_calls={local.calls}")
+    all_ok &= answers == ["2 messages [C1].", "2 messages [C1]."] and local.calls == 1
+
+    caching = _ContextCachingFake()
+    asyncio.run(AnswerGenerator(llm=caching).generate(_payload("What is the example about?")))
+    print(f"[CONTEXT_CACHE] injection_points={caching.injection_points}")
+    all_ok &= caching.injection_points == [[{"location": "message", "index": 0}]]
+
+    if all_ok:
+        print("[OK] llm prompt cache smoketest: 3/3 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+RESPONSE_CACHE_PATH = Path("belbin_engine_data/cache/llm_response_cache.sqlite")
+RESPONSE_CACHE_TTL_S = 7 * 24 * 3600
+RESPONSE_CACHE_MAX_ENTRIES = 5000
+
+# Payload fields that determine the model's answer; retrieval metadata (scores, ids) is not part of the key.
+PAYLOAD_KEY_FIELDS = ("system_instruction", "instructions", "context", "user_query")
+
+
+def payload_hash(prompt_payload: dict[str, Any]) -> str:
+    """
+    Canonical sha256 of the prompt fields: key order and missing-vs-empty fields do not change the hash.
+    """
+    canonical = {field: str(prompt_payload.get(field) or "") for field in PAYLOAD_KEY_FIELDS}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def cache_key(model_id: str, params: dict[str, Any], prompt_payload: dict[str, Any]) -> str:
+    return "|".join([model_id, json.dumps(params, sort_keys=True), payload_hash(prompt_payload)])
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of final answers: key -> answer text + guardrails verdict.
+
+    A hit replaces both the LLM call and guardrails validation. Entries expire after ttl_s seconds
+    (None disables expiry); beyond max_entries the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: Path = RESPONSE_CACHE_PATH,
+        ttl_s: float | None = RESPONSE_CACHE_TTL_S,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Callers may run on worker threads (e.g. the pipeline service); access is not concurrent.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model_id TEXT NOT NULL,"
+            " answer_text TEXT NOT NULL,"
+            " guardrails TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, model_id: str, params: dict[str, Any], prompt_payload: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        Returns {"answer_text", "guardrails"} on a hit.
+        """
+        key = cache_key(model_id, params, prompt_payload)
+        row = self._conn.execute(
+            "SELECT answer_text, guardrails, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is not None and self.ttl_s is not None and now - row[2] > self.ttl_s:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+            self.stats["expired"] += 1
+            row = None
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+        self.stats["hits"] += 1
+        return {"answer_text": row[0], "guardrails": json.loads(row[1])}
+
+    def put(
+        self,
+        model_id: str,
+        params: dict[str, Any],
+        prompt_payload: dict[str, Any],
+        answer_text: str,
+        guardrails: dict[str, Any],
+    ) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (cache_key(model_id, params, prompt_payload), model_id, answer_text, json.dumps(guardrails), now, now),
+        )
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        if self.ttl_s is not None:
+            cursor = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_s,))
+            self.stats["expired"] += cursor.rowcount
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+            self.stats["evicted"] += cursor.rowcount
+
+    def __len__(self) -> int:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return int(count)
+
+    def close(self) -> None:
+        self._conn.close()
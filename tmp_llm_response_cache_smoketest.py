@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from beeai_framework.backend import ChatModelParameters
+
+import tmp_llm_answer_generator as runner
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+from tmp_llm_response_cache import ResponseCache, cache_key, payload_hash
+
+PAYLOAD = {
+    "system_instruction": "Answer only using the provided context.",
+    "instructions": "Cite sources like [C1].",
+    "context": "[C1]\ntext: Alpha is first in the series.",
+    "user_query": "What is first?",
+    "retrieved_chunks": [{"id": "C1", "text": "Alpha is first in the series."}],
+}
+
+
+def main():
+    all_ok = True
+    tmp = Path(tempfile.mkdtemp())
+
+    reordered = dict(reversed(list(PAYLOAD.items())))
+    print(f"[HASH] canonical={payload_hash(PAYLOAD) == payload_hash(reordered)}")
+    all_ok &= payload_hash(PAYLOAD) == payload_hash(reordered)
+    all_ok &= payload_hash(PAYLOAD) != payload_hash({**PAYLOAD, "user_query": "What is second?"})
+
+    cache = ResponseCache(tmp / "evict.sqlite", ttl_s=0.2, max_entries=2)
+    for query in ("q1", "q2", "q3"):
+        cache.put("m", {}, {**PAYLOAD, "user_query": query}, f"answer {query}", {"status": "PASS"})
+    evicted = cache.get("m", {}, {**PAYLOAD, "user_query": "q1"}) is None
+    kept = cache.get("m", {}, {**PAYLOAD, "user_query": "q3"})
+    time.sleep(0.3)
+    expired = cache.get("m", {}, {**PAYLOAD, "user_query": "q3"}) is None
+    print(f"[EVICTION] lru_evicted={evicted} kept={kept} ttl_expired={expired} stats={cache.stats}")
+    all_ok &= evicted and kept == {"answer_text": "answer q3", "guardrails": {"status": "PASS"}} and expired
+
+    def key(**parameters):
+        generator = runner.AnswerGenerator(llm=FakeChatModel(parameters=ChatModelParameters(**parameters)))
+        params = runner.response_cache_params(runner.guardrails_flags(), generator)
+        return cache_key(generator.default_model_id, params, PAYLOAD)
+
+    base, same = key(temperature=0.0), key(temperature=0.0)
+    distinct = len({base, key(temperature=0.7), key(temperature=0.0, max_tokens=64)}) == 3
+    print(f"[PARAMS] same_model_same_key={base == same} distinct_params_distinct_keys={distinct}")
+    all_ok &= base == same and distinct
+
+    calls = {"llm": 0, "guardrails": 0}
+
+    async def _stub_generate_answer_real(_prompt_payload):
+        calls["llm"] += 1
+        return "Alpha is first [C1]."
+
+    real_guardrails = runner.run_guardrails
+
+    def _counting_guardrails(**kwargs):
+        calls["guardrails"] += 1
+        return real_guardrails(**kwargs)
+
+    # The configured Gemini model keys the cache without being built: a hit needs no API key.
+    os.environ.pop("GEMINI_API_KEY", None)
+    configured = runner.AnswerGenerator(model_id="gemini-2.5-flash")
+    configured_params = runner.response_cache_params(runner.guardrails_flags(), configured)
+    os.environ["GEMINI_API_KEY"] = "unused"
+    configured.model()
+    built_params = runner.response_cache_params(runner.guardrails_flags(), configured)
+    del os.environ["GEMINI_API_KEY"]
+    print(f"[CONFIGURED_KEY] same_before_and_after_build={configured_params == built_params}")
+    all_ok &= configured_params == built_params
+
+    runner._default_generator = runner.AnswerGenerator(model_id="gemini-2.5-flash")
+    real_generate_answer_real = runner.generate_answer_real
+    runner.generate_answer_real = _stub_generate_answer_real
+    runner.run_guardrails = _counting_guardrails
+    os.environ["LLM_RESPONSE_CACHE"] = "1"
+    os.environ["LLM_RESPONSE_CACHE_PATH"] = str(tmp / "answers.sqlite")
+    answers = [runner.generate_answer(PAYLOAD, real=True) for _ in range(3)]
+    print(f"[GENERATE_ANSWER] answers={answers[0]!r} calls={calls}")
+    all_ok &= answers == ["Alpha is first [C1]."] * 3 and calls == {"llm": 1, "guardrails": 1}
+
+    # A miss without an API key fails with the CLI's error message, not a traceback.
+    runner.generate_answer_real = real_generate_answer_real
+    try:
+        runner.generate_answer({**PAYLOAD, "user_query": "What is second?"}, real=True)
+        exit_code = None
+    except SystemExit as e:
+        exit_code = e.code
+    print(f"[NO_KEY] exit_code={exit_code}")
+    all_ok &= exit_code == 1
+
+    if all_ok:
+        print("[OK] llm response cache smoketest: 6/6 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
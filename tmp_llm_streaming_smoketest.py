@@ -0,0 +1,40 @@
+import asyncio
+import sys
+
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+from tmp_llm_answer_generator import generate_answer_streaming
+
+PAYLOAD = {
+    "system_instruction": "Answer only using the provided context.",
+    "instructions": "Cite sources like [C1].",
+    "context": "[C1]\ntext: Example context text.",
+    "user_query": "What is the example about?",
+}
+
+
+def main():
+    all_ok = True
+    llm = FakeChatModel(lambda _: "The example is about context text [C1].", latency=0.05, token_latency=0.01)
+    deltas = []
+    text, metrics = asyncio.run(generate_answer_streaming(PAYLOAD, on_delta=deltas.append, llm=llm))
+
+    print(f"[DELTAS] count={len(deltas)} text={text!r}")
+    all_ok &= len(deltas) > 1 and "".join(deltas) == text == "The example is about context text [C1]."
+
+    print(f"[TTFT] ttft_ms={metrics.ttft_ms} total_ms={metrics.total_ms}")
+    all_ok &= metrics.ttft_ms is not None and 40 <= metrics.ttft_ms < metrics.total_ms
+
+    print(
+        f"[THROUGHPUT] tokens={metrics.completion_tokens} estimated={metrics.tokens_estimated} "
+        f"tokens_per_s={metrics.tokens_per_s}"
+    )
+    all_ok &= metrics.completion_tokens == 7 and not metrics.tokens_estimated and metrics.tokens_per_s > 0
+
+    if all_ok:
+        print("[OK] llm streaming smoketest: 3/3 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
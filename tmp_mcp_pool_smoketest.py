@@ -0,0 +1,172 @@
+import asyncio
+import contextlib
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+from pathlib import Path
+
+from mcp import StdioServerParameters
+
+from beeai_framework_starter.helpers.mcp_pool import MCPEndpoint, MCPSessionPool
+from tmp_serve_loadtest import spawn_fake_server, wait_ready
+
+
+def serve_stdio(version_file):
+    """Test server: its version comes from `version_file`; version 2 adds a `shout` tool, version 3 its `times`."""
+    from mcp.server.fastmcp import FastMCP
+
+    version = Path(version_file).read_text().strip()
+    server = FastMCP("pool-test", log_level="WARNING")
+    server._mcp_server.version = version
+
+    @server.tool()
+    def pid() -> str:
+        """Process id of the server."""
+        return str(os.getpid())
+
+    @server.tool()
+    async def slow(seconds: float) -> str:
+        """Sleeps, then answers."""
+        import asyncio
+
+        await asyncio.sleep(seconds)
+        return "done"
+
+    if version == "2":
+
+        @server.tool()
+        def shout(text: str) -> str:
+            """Upper-cases the text."""
+            return text.upper()
+
+    if version == "3":
+
+        @server.tool(name="shout")
+        def shout_times(text: str, times: int = 1) -> str:
+            """Upper-cases the text, repeated."""
+            return text.upper() * times
+
+    server.run("stdio")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _call(tools, name, **args):
+    tool = next(t for t in tools if t.name == name)
+    output = (await tool.run(args)).get_text_content()
+    return json.loads(output)["result"]  # str results come back as structured content
+
+
+async def main():
+    passed = 0
+    total = 9
+    tmp = Path(tempfile.mkdtemp(prefix="mcp_pool_"))
+    version_file = tmp / "version"
+    version_file.write_text("1")
+    options = {"schema_cache_path": str(tmp / "schemas.sqlite")}
+    params = StdioServerParameters(command=sys.executable, args=[__file__, "--serve", str(version_file)])
+    endpoint = MCPEndpoint.stdio(params)
+
+    async with MCPSessionPool(options) as pool:
+        tools = await pool.tools(endpoint)
+        pids = {await _call(tools, "pid") for _ in range(5)}
+        again = await pool.tools(endpoint)
+        pids.add(await _call(again, "pid"))
+        print(f"[REUSE] tools={[t.name for t in tools]} server_pids={len(pids)} stats={pool.stats}")
+        passed += len(pids) == 1 and pool.stats["connects"] == 1 and pool.stats["schema_fetches"] == 1
+
+        os.kill(int(pids.pop()), signal.SIGKILL)
+        await asyncio.sleep(0.2)
+        new_pid = await _call(tools, "pid")
+        print(f"[RECONNECT] new_pid={new_pid} stats={pool.stats}")
+        passed += new_pid.isdigit() and pool.stats["connects"] == 2 and pool.stats["schema_fetches"] == 1
+
+        # concurrent calls across a dropped session: each retries on the new session, none sees another's
+        os.kill(int(new_pid), signal.SIGKILL)
+        await asyncio.sleep(0.2)
+        concurrent = await asyncio.gather(*(_call(tools, "pid") for _ in range(5)))
+        print(f"[CONCURRENT] server_pids={len(set(concurrent))} stats={pool.stats}")
+        passed += len(set(concurrent)) == 1 and pool.stats["connects"] == 3
+
+        # cancelling a run cancels the in-flight MCP call too
+        tasks_before = len(asyncio.all_tasks())
+        run = asyncio.create_task(_call(tools, "slow", seconds=30))
+        await asyncio.sleep(0.3)
+        run.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await run
+        await asyncio.sleep(0.1)
+        leftover = len(asyncio.all_tasks()) - tasks_before
+        print(f"[CANCEL] leftover_tasks={leftover}")
+        passed += leftover == 0
+
+    async with MCPSessionPool(options) as pool:
+        tools = await pool.tools(endpoint)
+        lazy = dict(pool.stats)
+        await _call(tools, "pid")
+        print(f"[SCHEMA_CACHE] before_call={lazy} after_call={pool.stats}")
+        passed += lazy["connects"] == 0 and pool.stats == {"connects": 1, "schema_fetches": 0, "schema_cache_hits": 1}
+
+    version_file.write_text("2")
+    async with MCPSessionPool(options) as pool:
+        tools = await pool.tools(endpoint)
+        await _call(tools, "pid")
+        refreshed = await pool.tools(endpoint)
+        shout = await _call(refreshed, "shout", text="hi")
+        print(f"[VERSION] tools={[t.name for t in refreshed]} shout={shout} stats={pool.stats}")
+        passed += shout == "HI" and pool.stats["schema_fetches"] == 1
+
+    # tools handed out lazily from the cache pick up the new schema once the version change is seen
+    version_file.write_text("3")
+    async with MCPSessionPool(options) as pool:
+        tools = await pool.tools(endpoint)
+        shout_tool = next(t for t in tools if t.name == "shout")
+        before = sorted(shout_tool.input_schema.model_json_schema()["properties"])
+        await _call(tools, "pid")
+        after = sorted(shout_tool.input_schema.model_json_schema()["properties"])
+        shout = await _call(tools, "shout", text="hi", times=2)
+        print(f"[SCHEMA_REFRESH] before={before} after={after} shout={shout} stats={pool.stats}")
+        passed += before == ["text"] and after == ["text", "times"] and shout == "HIHI"
+
+    async with MCPSessionPool({**options, "connect_timeout_s": 5}) as pool:
+        try:
+            await pool.tools(MCPEndpoint.http(f"http://127.0.0.1:{_free_port()}/mcp"))
+            down = False
+        except ConnectionError:
+            down = True
+        print(f"[DOWN] ConnectionError={down}")
+        passed += down
+
+    port = _free_port()
+    server = spawn_fake_server("mcp", port, latency=0.01)
+    try:
+        url = f"http://127.0.0.1:{port}/mcp"
+        await wait_ready("mcp", url)
+        async with MCPSessionPool(options) as pool:
+            [agent_tool] = await pool.tools(MCPEndpoint.http(url))
+            answers = [(await agent_tool.run({"input": f"q{i}"})).get_text_content() for i in range(3)]
+            print(f"[HTTP] answers={len(answers)} stats={pool.stats}")
+            passed += all("Echo" in a for a in answers) and pool.stats["connects"] == 1
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    if passed == total:
+        print(f"[OK] mcp pool smoketest: {passed}/{total} passed")
+        return 0
+    print(f"[FAIL] mcp pool smoketest: {passed}/{total} passed")
+    return 1
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--serve"]:
+        serve_stdio(sys.argv[2])
+    else:
+        sys.exit(asyncio.run(main()))
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import os
+import re
+import socket
+import sys
+import threading
+import time
+
+import httpx
+
+from beeai_framework_starter.helpers.mcp_workers import MCPWorkerPool, wait_until_ready
+
+LATENCY = 0.3
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def create_server():
+    # Runs in each worker: the fake agent answers with the worker's pid after LATENCY seconds.
+    from beeai_framework.adapters.mcp import MCPServer, MCPServerConfig
+    from beeai_framework.adapters.mcp.serve.server import MCPSettings
+    from beeai_framework.agents.requirement import RequirementAgent
+    from beeai_framework.backend import AssistantMessage
+    from beeai_framework.backend.message import MessageToolCallContent
+
+    from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+
+    def respond(messages):
+        args = json.dumps({"response": f"pid={os.getpid()}"})
+        return AssistantMessage(MessageToolCallContent(id="call_final", tool_name="final_answer", args=args))
+
+    agent = RequirementAgent(llm=FakeChatModel(respond, latency=LATENCY), name="FakeAgent", description="Pid.")
+    server = MCPServer(config=MCPServerConfig(transport="streamable-http", settings=MCPSettings(log_level="WARNING")))
+    server.register_many([agent])
+    return server
+
+
+async def call_tool(client, url, prompt="hi"):
+    """Raw stateless MCP tools/call (the workers answer plain JSON); returns (status, answer text or None)."""
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {"name": "FakeAgent", "arguments": {"input": prompt}},
+    }
+    headers = {"accept": "application/json, text/event-stream", "content-type": "application/json"}
+    response = await client.post(url, json=payload, headers=headers)
+    if response.status_code != 200:
+        return response.status_code, None
+    return 200, response.json()["result"]["content"][0]["text"]
+
+
+async def main():
+    passed = 0
+    total = 5
+    port = _free_port()
+    options = {"port": port, "workers": 2, "max_concurrency": 2, "queue_timeout_s": 2.0, "drain_notice_s": 0.3}
+    pool = MCPWorkerPool(create_server, options)
+
+    started = time.perf_counter()
+    pool.start()
+    await wait_until_ready(pool.health_url, timeout_s=5)
+    pids = {p.pid for p in pool._processes}
+    print(f"[READY] workers={len(pids)} in {time.perf_counter() - started:.1f}s")
+    passed += len(pids) == 2
+
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            statuses, answers = zip(*await asyncio.gather(*(call_tool(client, pool.url) for _ in range(8))))
+        served = {int(m[1]) for a in answers if a and (m := re.search(r"pid=(\d+)", a))}
+        print(f"[SPREAD] statuses={set(statuses)} served_by={len(served)} workers")
+        passed += set(statuses) == {200} and served == pids
+
+        # one slot: excess requests wait up to queue_timeout_s, then get 503
+        busy = MCPWorkerPool(
+            create_server, {"port": _free_port(), "workers": 1, "max_concurrency": 1, "queue_timeout_s": 0.1}
+        )
+        with busy:
+            async with httpx.AsyncClient(timeout=30) as client:
+                results = await asyncio.gather(*(call_tool(client, busy.url) for _ in range(4)))
+                retry = (await client.get(busy.health_url)).status_code
+        codes = sorted(status for status, _ in results)
+        print(f"[LIMIT] statuses={codes} health={retry}")
+        passed += codes.count(200) >= 1 and 503 in codes and retry == 200
+
+        # graceful drain: /health turns 503 first, calls sent before and during the notice both finish,
+        # the later one after the listener has closed
+        async with httpx.AsyncClient(timeout=30) as client:
+            before = asyncio.create_task(call_tool(client, pool.url))
+            await asyncio.sleep(LATENCY / 3)
+            stopper = threading.Thread(target=pool.stop)
+            stopper.start()
+            health = 200
+            while health == 200:
+                async with httpx.AsyncClient(timeout=2) as probe:
+                    health = (await probe.get(pool.health_url)).status_code
+            during = asyncio.create_task(call_tool(client, pool.url))
+            results = [await before, await during]
+            await asyncio.to_thread(stopper.join)
+        answered = [status == 200 and bool(answer and "pid=" in answer) for status, answer in results]
+        print(f"[DRAIN] health={health} answered={answered}")
+        passed += health == 503 and all(answered)
+    finally:
+        pool.stop()
+
+    try:
+        async with httpx.AsyncClient(timeout=2) as client:
+            await client.get(pool.health_url)
+        down = False
+    except httpx.ConnectError:
+        down = True
+    print(f"[STOPPED] port closed={down} workers alive={sum(p.is_alive() for p in pool._processes)}")
+    passed += down
+
+    if passed == total:
+        print(f"[OK] mcp workers smoketest: {passed}/{total} passed")
+        return 0
+    print(f"[FAIL] mcp workers smoketest: {passed}/{total} passed")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,81 @@
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode
+
+from beeai_framework_starter.helpers.instrumentation import (
+    TailSamplingOptions,
+    TailSamplingSpanProcessor,
+    setup_observability,
+)
+
+
+class _SlowExporter(SpanExporter):
+    """Stands in for an OTLP HTTP round-trip."""
+
+    def export(self, spans):
+        time.sleep(0.005)
+        return SpanExportResult.SUCCESS
+
+
+def _span_cost_ms(processor, spans=40):
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer("smoke")
+    start = time.perf_counter()
+    for _ in range(spans):
+        with tracer.start_as_current_span("step"):
+            pass
+    cost = (time.perf_counter() - start) * 1000 / spans
+    provider.shutdown()
+    return cost
+
+
+def main():
+    all_ok = True
+
+    simple_ms = _span_cost_ms(SimpleSpanProcessor(_SlowExporter()))
+    batch_ms = _span_cost_ms(BatchSpanProcessor(_SlowExporter()))
+    print(f"[BATCH] per_span_ms simple={simple_ms:.3f} batch={batch_ms:.3f}")
+    all_ok &= batch_ms * 10 < simple_ms
+
+    memory = InMemorySpanExporter()
+    provider = TracerProvider()
+    tail = TailSamplingOptions(latency_threshold_ms=20)
+    provider.add_span_processor(TailSamplingSpanProcessor([SimpleSpanProcessor(memory)], tail))
+    tracer = provider.get_tracer("smoke")
+    with tracer.start_as_current_span("fast"), tracer.start_as_current_span("fast_child"):
+        pass
+    with tracer.start_as_current_span("slow"), tracer.start_as_current_span("slow_child"):
+        time.sleep(0.03)
+    with tracer.start_as_current_span("failed"), tracer.start_as_current_span("failed_child") as child:
+        child.set_status(Status(StatusCode.ERROR))
+    kept = sorted(span.name for span in memory.get_finished_spans())
+    print(f"[TAIL] kept={kept}")
+    all_ok &= kept == ["failed", "failed_child", "slow", "slow_child"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "spans.jsonl"
+        provider = setup_observability(None, {"file_path": str(path), "sample_ratio": 1.0})
+        with provider.get_tracer("smoke").start_as_current_span("offline"):
+            pass
+        provider.force_flush()
+        names = [json.loads(line)["name"] for line in path.read_text(encoding="utf-8").splitlines()]
+        print(f"[FILE] spans={names} sampler={provider.sampler.get_description()}")
+        all_ok &= names == ["offline"] and "ParentBased" in provider.sampler.get_description()
+        provider.shutdown()
+
+    if all_ok:
+        print("[OK] observability smoketest: 3/3 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from qdrant_client import QdrantClient
+
+from beeai_framework_starter.helpers.fake_embedding_model import FakeEmbeddingModel
+from tmp_rag_local_index import LocalVectorIndex
+from tmp_rag_quantization import percentile, resolve_quantization
+from tmp_rag_query_planner import FilterStats, collection_filter_stats, plan_query, planner_filter_fields
+from tmp_rag_query_run import COLLECTION, build_query_filter, retrieve, retrieve_speculative
+from tmp_rag_sparse import has_sparse_vector
+from tmp_real_ingest_qdrant import (
+    CONFIG_PATH,
+    DEFAULT_FILTERABLE_FIELDS,
+    EVAL_QUERIES_PATH,
+    EXPECTED_DIM,
+    INGEST_DIR,
+    embed_text,
+    ensure_collection,
+    ensure_payload_indexes,
+    ingest_files,
+    resolve_file_rules,
+)
+
+BENCHMARK_BACKENDS = ("local", "memory")
+STAGES = ("plan", "embed", "retrieve")
+
+
+def load_labeled_queries(path: Path) -> list[dict[str, Any]]:
+    """
+    Labeled eval set (same file as --compare_quantization): JSONL lines with "query" and the relevant chunks,
+    either "expected": [{"source_file": ..., "chunk_index": ...}, ...] or top-level source_file (+ chunk_index).
+    A label without chunk_index matches any chunk of that file. Lines without labels are skipped.
+    """
+    labeled = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        expected = record.get("expected")
+        if expected is None and record.get("source_file"):
+            expected = [{"source_file": record["source_file"], "chunk_index": record.get("chunk_index")}]
+        if expected:
+            labeled.append({"query": record["query"], "expected": expected})
+    return labeled
+
+
+def _relevant(payload: dict[str, Any], expected: list[dict[str, Any]]) -> bool:
+    return any(
+        payload.get("source_file") == label["source_file"]
+        and (label.get("chunk_index") is None or payload.get("chunk_index") == label["chunk_index"])
+        for label in expected
+    )
+
+
+def score_hits(payloads: list[dict[str, Any]], expected: list[dict[str, Any]]) -> tuple[float, float]:
+    """(recall@k, reciprocal rank) of one ranked result list."""
+    found = sum(any(_relevant(payload, [label]) for payload in payloads) for label in expected)
+    first = next((rank for rank, payload in enumerate(payloads, start=1) if _relevant(payload, expected)), None)
+    return found / len(expected), (1.0 / first if first else 0.0)
+
+
+def open_benchmark_client(backend: str, workdir: Path) -> Any:
+    if backend == "local":
+        return LocalVectorIndex(workdir)
+    if backend == "memory":
+        return QdrantClient(":memory:")
+    raise ValueError(f"Unknown benchmark backend: {backend} (expected one of {BENCHMARK_BACKENDS})")
+
+
+async def seed_index(
+    client: Any, cfg: dict[str, Any], corpus_dir: Path, embedder: Any, dense_only: bool = False
+) -> FilterStats:
+    """
+    Ingest corpus_dir through the regular ingest path (chunking, file rules, sparse vectors, payload indexes)
+    into COLLECTION. Returns the filter stats the planner would see.
+    """
+    files = sorted(corpus_dir.glob("*.md"))
+    if not files:
+        raise FileNotFoundError(f"No .md files found in {corpus_dir}")
+    chunking = cfg.get("chunking", {})
+    metadata_defaults = cfg.get("metadata_defaults", {})
+    filterable_fields = cfg.get("filterable_fields", DEFAULT_FILTERABLE_FIELDS)
+
+    sparse_enabled = ensure_collection(client, COLLECTION, resolve_quantization(cfg)) and not dense_only
+    ensure_payload_indexes(client, COLLECTION, filterable_fields)
+    await ingest_files(
+        client,
+        COLLECTION,
+        files,
+        embedder,
+        max_chars=chunking.get("max_chars", 800),
+        overlap=chunking.get("overlap", 100),
+        rules=resolve_file_rules(cfg),
+        source_type=metadata_defaults.get("source_type", "UNKNOWN"),
+        language=metadata_defaults.get("language", "UNKNOWN"),
+        sparse_enabled=sparse_enabled,
+    )
+    return collection_filter_stats(client, COLLECTION, filterable_fields, planner_filter_fields(cfg))
+
+
+async def run_benchmark(
+    client: Any,
+    labeled: list[dict[str, Any]],
+    embedder: Any,
+    stats: FilterStats | None,
+    topk: int | None = None,
+    mode: str = "hybrid",
+    speculative: bool = True,
+) -> dict[str, Any]:
+    """
+    Run each labeled query through plan_query and retrieval; report recall@k, MRR and per-stage latency.
+    topk overrides the planner's topk.
+    """
+    hybrid = mode != "dense" and has_sparse_vector(client, COLLECTION)
+    latencies: dict[str, list[float]] = {stage: [] for stage in (*STAGES, "total")}
+    recalls: list[float] = []
+    reciprocal_ranks: list[float] = []
+    per_query = []
+    for item in labeled:
+        timings = {}
+        start = time.perf_counter()
+        planned = plan_query(item["query"], stats=stats)
+        if topk is not None:
+            planned.topk = topk
+        timings["plan"] = time.perf_counter()
+        embedding = await embed_text(embedder, planned.query_text)
+        timings["embed"] = time.perf_counter()
+        if speculative:
+            points = await retrieve_speculative(client, planned, embedding, hybrid, stats=stats)
+        else:
+            points = retrieve(client, planned, embedding, build_query_filter(planned.filters), hybrid)
+        timings["retrieve"] = time.perf_counter()
+
+        previous = start
+        for stage in STAGES:
+            latencies[stage].append((timings[stage] - previous) * 1000)
+            previous = timings[stage]
+        latencies["total"].append((previous - start) * 1000)
+
+        recall, reciprocal_rank = score_hits([point.payload or {} for point in points], item["expected"])
+        recalls.append(recall)
+        reciprocal_ranks.append(reciprocal_rank)
+        per_query.append(
+            {"query": item["query"], "filters": planned.filters, "recall": recall, "reciprocal_rank": reciprocal_rank}
+        )
+
+    queries = max(1, len(labeled))
+    return {
+        "queries": len(labeled),
+        "topk": topk,
+        "mode": "hybrid" if hybrid else "dense",
+        "speculative_filters": speculative,
+        "recall_at_k": round(sum(recalls) / queries, 4),
+        "mrr": round(sum(reciprocal_ranks) / queries, 4),
+        "latency_ms": {
+            stage: {f"p{pct}": round(percentile(values, pct), 3) for pct in (50, 95, 99)}
+            for stage, values in latencies.items()
+        },
+        "per_query": per_query,
+    }
+
+
+async def main_async() -> None:
+    parser = argparse.ArgumentParser(description="Offline retrieval quality and latency benchmark.")
+    parser.add_argument("--backend", choices=BENCHMARK_BACKENDS, default="local")
+    parser.add_argument("--config", default=str(CONFIG_PATH))
+    parser.add_argument("--corpus_dir", default=str(INGEST_DIR))
+    parser.add_argument("--queries", default=str(EVAL_QUERIES_PATH))
+    parser.add_argument("--topk", type=int, default=None, help="Override the planner's topk.")
+    parser.add_argument("--mode", choices=("hybrid", "dense"), default="hybrid")
+    parser.add_argument("--no_speculative", action="store_true", help="Search with the best filter plan only.")
+    parser.add_argument("--max_chars", type=int, default=None, help="Override chunking.max_chars.")
+    parser.add_argument("--overlap", type=int, default=None, help="Override chunking.overlap.")
+    parser.add_argument("--out", default=None, help="Also write the JSON report to this path.")
+    args = parser.parse_args()
+
+    config_path = Path(args.config)
+    cfg = json.loads(config_path.read_text(encoding="utf-8")) if config_path.exists() else {}
+    chunking = cfg.setdefault("chunking", {})
+    if args.max_chars is not None:
+        chunking["max_chars"] = args.max_chars
+    if args.overlap is not None:
+        chunking["overlap"] = args.overlap
+
+    embedder = FakeEmbeddingModel(dim=EXPECTED_DIM)
+    labeled = load_labeled_queries(Path(args.queries))
+    # Ingest/retrieval progress goes to stderr so stdout is the JSON report only.
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(sys.stderr):
+        client = open_benchmark_client(args.backend, Path(workdir))
+        stats = await seed_index(client, cfg, Path(args.corpus_dir), embedder, dense_only=args.mode == "dense")
+        report = await run_benchmark(
+            client, labeled, embedder, stats, topk=args.topk, mode=args.mode, speculative=not args.no_speculative
+        )
+    report = {"backend": args.backend, "chunking": chunking, **report}
+
+    print(json.dumps(report, indent=2))
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
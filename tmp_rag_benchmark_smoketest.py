@@ -0,0 +1,76 @@
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from beeai_framework_starter.helpers.fake_embedding_model import FakeEmbeddingModel
+from tmp_rag_benchmark import load_labeled_queries, open_benchmark_client, run_benchmark, score_hits, seed_index
+
+CORPUS = {
+    "belbin_roles.md": "The Belbin orchestra assigns each agent a role. The plant generates ideas.",
+    "decision_policy.md": "Decisions need a confidence score. Low confidence decisions are escalated.",
+    "review_template.md": "Review template: list findings with severity, owner and due date.",
+}
+QUERIES = [
+    {"query": "which role generates ideas in the belbin orchestra?", "source_file": "belbin_roles.md"},
+    {"query": "what happens to low confidence decisions?", "expected": [{"source_file": "decision_policy.md"}]},
+    {"query": "review template findings severity", "source_file": "review_template.md", "chunk_index": 0},
+    {"query": "unlabeled query is skipped"},
+]
+CONFIG = {
+    "chunking": {"max_chars": 400, "overlap": 40},
+    "file_rules": [
+        {"pattern": "belbin_roles.md", "type": "CONCEPT", "topic": "belbin_orchestra"},
+        {"pattern": "decision_policy.md", "type": "RULES", "topic": "decision_policy"},
+        {"pattern": "review_template.md", "type": "TEMPLATE", "topic": "review_policy"},
+    ],
+}
+
+
+async def _bench(backend, workdir, corpus_dir, labeled):
+    embedder = FakeEmbeddingModel(dim=768)
+    client = open_benchmark_client(backend, workdir)
+    stats = await seed_index(client, CONFIG, corpus_dir, embedder)
+    return await run_benchmark(client, labeled, embedder, stats, topk=3)
+
+
+def main():
+    all_ok = True
+    ranked = [{"source_file": "a.md"}, {"source_file": "b.md", "chunk_index": 2}]
+    recall, rr = score_hits(ranked, [{"source_file": "b.md", "chunk_index": 2}])
+    print(f"[SCORING] recall={recall} reciprocal_rank={rr}")
+    all_ok &= recall == 1.0 and rr == 0.5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        corpus_dir = tmp / "seed"
+        corpus_dir.mkdir()
+        for name, text in CORPUS.items():
+            (corpus_dir / name).write_text(text, encoding="utf-8")
+        queries_path = tmp / "queries.jsonl"
+        queries_path.write_text("\n".join(json.dumps(q) for q in QUERIES), encoding="utf-8")
+        labeled = load_labeled_queries(queries_path)
+        all_ok &= len(labeled) == 3
+
+        for backend in ("local", "memory"):
+            workdir = tmp / backend
+            workdir.mkdir()
+            report = asyncio.run(_bench(backend, workdir, corpus_dir, labeled))
+            latency = report["latency_ms"]
+            print(
+                f"[{backend.upper()}] mode={report['mode']} recall@k={report['recall_at_k']} mrr={report['mrr']} "
+                f"retrieve_p95={latency['retrieve']['p95']}"
+            )
+            all_ok &= report["queries"] == 3 and report["recall_at_k"] == 1.0 and report["mrr"] > 0.5
+            all_ok &= set(latency) == {"plan", "embed", "retrieve", "total"}
+            all_ok &= all(set(v) == {"p50", "p95", "p99"} for v in latency.values())
+
+    if all_ok:
+        print("[OK] rag benchmark smoketest: 3/3 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from typing import Any
+
+from tmp_rag_prompt_wrapper import window_overlap
+
+
+def merge_adjacent_chunks(retrieved_chunks: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Post-retrieval stage: stitch chunks of the same source_file with consecutive chunk_index values into
+    one span, removing the character overlap produced at ingest (chunking.overlap).
+
+    Each span keeps the first chunk_index, the best score, and a mapping back to its members:
+    - merged_chunk_indices: chunk_index values in the span, ascending
+    - merged_point_ids: point ids of the members (when present)
+    - merged_ranks: 1-based retrieval ranks of the members
+    Spans are returned in order of their best-ranked member; unmergeable chunks pass through unchanged
+    (with the mapping fields filled for a single member).
+    """
+    ranked = [{**chunk, "_rank": rank} for rank, chunk in enumerate(retrieved_chunks, start=1)]
+    by_file: dict[Any, list[dict[str, Any]]] = {}
+    passthrough: list[dict[str, Any]] = []
+    for chunk in ranked:
+        if isinstance(chunk.get("chunk_index"), int) and chunk.get("source_file"):
+            by_file.setdefault(chunk["source_file"], []).append(chunk)
+        else:
+            passthrough.append(chunk)
+
+    spans: list[list[dict[str, Any]]] = []
+    for chunks in by_file.values():
+        seen_indices: set[int] = set()
+        run: list[dict[str, Any]] = []
+        for chunk in sorted(chunks, key=lambda c: c["chunk_index"]):
+            if chunk["chunk_index"] in seen_indices:
+                continue  # same window retrieved twice (e.g. dense + sparse duplicates)
+            seen_indices.add(chunk["chunk_index"])
+            if run and chunk["chunk_index"] == run[-1]["chunk_index"] + 1:
+                run.append(chunk)
+            else:
+                if run:
+                    spans.append(run)
+                run = [chunk]
+        if run:
+            spans.append(run)
+    spans.extend([chunk] for chunk in passthrough)
+
+    merged = [_stitch(span) for span in spans]
+    merged.sort(key=lambda m: m["_rank"])
+    for m in merged:
+        del m["_rank"]
+    return merged
+
+
+def _stitch(span: list[dict[str, Any]]) -> dict[str, Any]:
+    text = str(span[0].get("text") or "")
+    for chunk in span[1:]:
+        following = str(chunk.get("text") or "")
+        text += following[window_overlap(text, following) :]
+
+    best = min(span, key=lambda c: c["_rank"])
+    scores = [c.get("score") for c in span if c.get("score") is not None]
+    return {
+        **best,
+        "chunk_index": span[0].get("chunk_index"),
+        "score": max(scores) if scores else best.get("score"),
+        "text": text,
+        "merged_chunk_indices": [c.get("chunk_index") for c in span],
+        "merged_point_ids": [c["point_id"] for c in span if c.get("point_id") is not None],
+        "merged_ranks": sorted(c["_rank"] for c in span),
+    }
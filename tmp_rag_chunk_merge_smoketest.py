@@ -0,0 +1,52 @@
+import sys
+
+from tmp_rag_chunk_merge import merge_adjacent_chunks
+from tmp_rag_guardrails_impl import run_guardrails
+from tmp_rag_prompt_wrapper import build_prompt
+
+TEXT = (
+    "The decision loop starts with a plan drafted by the coordinator. "
+    "Two reviewers must approve every decision before release. "
+    "Confidence scores are published weekly to the whole team."
+)
+# Same layout as chunk_text(TEXT, max_chars=80, overlap=30) at ingest.
+WINDOWS = [TEXT[0:80], TEXT[50:130], TEXT[100:180]]
+
+
+def main():
+    all_ok = True
+    retrieved = [
+        {"point_id": "b", "score": 0.91, "source_file": "policy.md", "chunk_index": 1, "text": WINDOWS[1]},
+        {"point_id": "x", "score": 0.80, "source_file": "other.md", "chunk_index": 7, "text": "Unrelated text."},
+        {"point_id": "a", "score": 0.75, "source_file": "policy.md", "chunk_index": 0, "text": WINDOWS[0]},
+        {"point_id": "c", "score": 0.70, "source_file": "policy.md", "chunk_index": 2, "text": WINDOWS[2]},
+        {"point_id": "a2", "score": 0.60, "source_file": "policy.md", "chunk_index": 0, "text": WINDOWS[0]},
+    ]
+    merged = merge_adjacent_chunks(retrieved)
+    print(f"[COUNT] {len(retrieved)} -> {len(merged)}")
+    all_ok &= len(merged) == 2
+
+    span = merged[0]
+    print(
+        f"[STITCH] indices={span['merged_chunk_indices']} ids={span['merged_point_ids']} ranks={span['merged_ranks']}"
+    )
+    all_ok &= span["text"] == TEXT[:180] and span["merged_chunk_indices"] == [0, 1, 2]
+    all_ok &= span["merged_point_ids"] == ["a", "b", "c"] and span["score"] == 0.91
+
+    payload = build_prompt("Who approves decisions?", merged)
+    result = run_guardrails(
+        answer_text="Two reviewers must approve every decision before release [C1].",
+        retrieved_chunks=payload["retrieved_chunks"],
+        prompt_context_string=payload["context"],
+    )
+    print(f"[GUARDRAILS] labels={[c['id'] for c in payload['retrieved_chunks']]} status={result['status']}")
+    all_ok &= result["status"] == "PASS"
+
+    if all_ok:
+        print("[OK] rag chunk merge smoketest: 3/3 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
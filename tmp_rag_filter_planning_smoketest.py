@@ -0,0 +1,69 @@
+import sys
+import tempfile
+
+from qdrant_client.http import models as qm
+
+from tmp_rag_local_index import LocalVectorIndex
+from tmp_rag_query_planner import (
+    PlannedQuery,
+    build_filter_stats,
+    choose_filter_strategy,
+    collection_filter_stats,
+    plan_query,
+)
+from tmp_real_ingest_qdrant import ensure_payload_indexes
+
+PAYLOADS = (
+    [{"type": "CONCEPT", "topic": "belbin_orchestra"}] * 80
+    + [{"type": "RULES", "topic": "decision_policy"}] * 15
+    + [{"type": "RULES", "topic": "review_policy"}] * 5
+)
+
+
+def main():
+    all_ok = True
+    stats = build_filter_stats(PAYLOADS, ["type", "topic"])
+
+    planned = plan_query("what is the belbin orchestra?", stats=stats)
+    print(f"[BROAD] strategy={planned.filter_strategy} selectivity={planned.estimated_selectivity}")
+    all_ok &= planned.filter_strategy == "post" and planned.candidate_limit >= planned.topk
+
+    planned = plan_query("how is severity assigned?", stats=stats)
+    print(f"[NARROW] strategy={planned.filter_strategy} selectivity={planned.estimated_selectivity}")
+    all_ok &= planned.filter_strategy == "pre"
+
+    planned = plan_query("hello there", stats=stats)
+    print(f"[NONE] strategy={planned.filter_strategy}")
+    all_ok &= planned.filter_strategy == "none"
+
+    unknown = stats.selectivity({"type": "CONCEPT", "language": "EN"})
+    planned = choose_filter_strategy(PlannedQuery("q", {"type": "CONCEPT", "language": "EN"}, 5), stats)
+    print(f"[UNKNOWN_FIELD] selectivity={unknown} strategy={planned.filter_strategy}")
+    all_ok &= unknown is None and planned.filter_strategy == "pre" and planned.estimated_selectivity is None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = LocalVectorIndex(tmp)
+        client.create_collection("smoke", vectors_config=qm.VectorParams(size=2, distance=qm.Distance.COSINE))
+        created = ensure_payload_indexes(client, "smoke", ["type", "topic"])
+        again = ensure_payload_indexes(client, "smoke", ["type", "topic", "source_file"])
+        print(f"[INDEXES] created={created} then={again}")
+        all_ok &= created == ["type", "topic"] and again == ["source_file"]
+
+        # a later ingest of only the RULES files must not shrink the corpus-wide counts
+        points = [qm.PointStruct(id=idx, vector=[1.0, 0.0], payload=payload) for idx, payload in enumerate(PAYLOADS)]
+        client.upsert("smoke", points[:80])
+        client.upsert("smoke", points[80:])
+        partial = build_filter_stats(PAYLOADS[80:], ["type", "topic"])
+        corpus = collection_filter_stats(client, "smoke", ["type", "topic"], ["language"], batch_size=7)
+        print(f"[COLLECTION_STATS] points={corpus.points} partial_run_points={partial.points}")
+        all_ok &= corpus.points == 100 and corpus.value_counts["type"] == {"CONCEPT": 80, "RULES": 20}
+        all_ok &= corpus.value_counts["language"] == {} and corpus.indexed_fields == ["type", "topic"]
+
+    if all_ok:
+        print("[OK] rag filter planning smoketest: 6/6 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
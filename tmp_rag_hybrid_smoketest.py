@@ -0,0 +1,83 @@
+import sys
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qm
+
+from tmp_rag_sparse import (
+    SPARSE_VECTOR_NAME,
+    average_doc_length,
+    encode_document,
+    encode_query,
+    hybrid_query_points,
+    reciprocal_rank_fusion,
+)
+
+DOCS = [
+    "Decision policy 7.3 requires two reviewers before a confidence score is published.",
+    "The orchestra model assigns Belbin roles to agents in the decision loop.",
+    "Review severity levels range from minor to blocker.",
+]
+
+
+def _dense(text):
+    # Deterministic 3-dim stand-in embedding; deliberately uninformative for policy numbers.
+    lowered = text.lower()
+    return [
+        1.0 + lowered.count("decision"),
+        1.0 + lowered.count("review"),
+        1.0 + lowered.count("belbin"),
+    ]
+
+
+def _seed():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        collection_name="smoke",
+        vectors_config=qm.VectorParams(size=3, distance=qm.Distance.COSINE),
+        sparse_vectors_config={SPARSE_VECTOR_NAME: qm.SparseVectorParams(modifier=qm.Modifier.IDF)},
+    )
+    avgdl = average_doc_length(DOCS)
+    client.upsert(
+        collection_name="smoke",
+        points=[
+            qm.PointStruct(
+                id=idx,
+                vector={"": _dense(text), SPARSE_VECTOR_NAME: encode_document(text, avgdl)},
+                payload={"chunk_index": idx, "text": text},
+            )
+            for idx, text in enumerate(DOCS)
+        ],
+    )
+    return client
+
+
+def main():
+    all_ok = True
+    client = _seed()
+
+    query = "policy 7.3"
+    res = hybrid_query_points(client, "smoke", _dense(query), encode_query(query), None, limit=2)
+    top = res.points[0].payload.get("chunk_index") if res.points else None
+    print(f"[HYBRID] query={query!r} top_chunk_index={top}")
+    all_ok &= top == 0
+
+    dense_only = client.query_points(collection_name="smoke", query=_dense(query), limit=3).points
+    sparse_only = client.query_points(
+        collection_name="smoke", query=encode_query(query), using=SPARSE_VECTOR_NAME, limit=3
+    ).points
+    fused = reciprocal_rank_fusion([dense_only, sparse_only], limit=2)
+    print(f"[LOCAL RRF] ids={[p.id for p in fused]}")
+    all_ok &= len(fused) == 2 and fused[0].id == 0
+
+    empty = encode_query("...")
+    print(f"[EMPTY QUERY] indices={empty.indices}")
+    all_ok &= empty.indices == []
+
+    if all_ok:
+        print("[OK] rag hybrid retrieval smoketest: 3/3 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
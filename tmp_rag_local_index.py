@@ -0,0 +1,334 @@
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+from qdrant_client.http import models as qm
+
+# Default on-disk location for local collections (one sub-directory per collection).
+LOCAL_INDEX_DIR = Path("belbin_engine_data/local_index")
+
+_META_FILE = "meta.json"
+_VECTORS_FILE = "vectors.f32"
+_PAYLOADS_FILE = "payloads.jsonl"
+
+
+class LocalVectorIndex:
+    """
+    In-process, exact top-k vector index exposing the subset of the QdrantClient API used by the RAG scripts
+    (collection_exists, create_collection, get_collection, update_collection, create_payload_index, upsert, count,
+    scroll, query_points).
+
+    Layout per collection:
+    - meta.json: {"dim": int, "distance": "Cosine" | "Dot", "payload_indexes": [field, ...], "quantization": ...}
+    - vectors.f32: row-major float32 matrix, memory-mapped read-only at query time
+    - payloads.jsonl: append-only {"id", "row", "payload"} records; the last record per id wins
+
+    Upserts write vectors before payloads: a point only becomes visible once its payload record is on disk, and
+    vector rows left over from an interrupted upsert are ignored and overwritten by the next one.
+
+    Cosine vectors are L2-normalized on write, so every search is one matrix-vector product.
+    Dense only: get_collection reports no sparse vectors, so hybrid callers fall back to dense search.
+    """
+
+    def __init__(self, root: str | Path = LOCAL_INDEX_DIR) -> None:
+        self.root = Path(root)
+        self._collections: dict[str, _LocalCollection] = {}
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return (self.root / collection_name / _META_FILE).exists()
+
+    def create_collection(self, collection_name: str, vectors_config: qm.VectorParams, **_: Any) -> bool:
+        distance = _distance_name(vectors_config.distance)
+        if distance not in ("Cosine", "Dot"):
+            raise ValueError(f"Local index supports Cosine and Dot distance only, got {distance}")
+        path = self.root / collection_name
+        path.mkdir(parents=True, exist_ok=True)
+        (path / _META_FILE).write_text(json.dumps({"dim": vectors_config.size, "distance": distance}), encoding="utf-8")
+        (path / _VECTORS_FILE).touch()
+        (path / _PAYLOADS_FILE).touch()
+        self._collections.pop(collection_name, None)
+        return True
+
+    def get_collection(self, collection_name: str) -> Any:
+        col = self._get(collection_name)
+        params = SimpleNamespace(
+            vectors=qm.VectorParams(size=col.dim, distance=qm.Distance(col.distance)),
+            sparse_vectors={},
+        )
+        payload_schema = {key: qm.PayloadSchemaType.KEYWORD for key in col.indexed_fields}
+        return SimpleNamespace(
+            points_count=col.count, payload_schema=payload_schema, config=SimpleNamespace(params=params)
+        )
+
+    def update_collection(
+        self, collection_name: str, quantization_config: qm.QuantizationConfig | qm.Disabled | None = None, **_: Any
+    ) -> bool:
+        """
+        Vectors are always searched as exact float32: quantization settings are recorded in meta.json, not applied.
+        """
+        if quantization_config is not None:
+            self._get(collection_name).record_quantization(quantization_config)
+        return True
+
+    def create_payload_index(self, collection_name: str, field_name: str, **_: Any) -> None:
+        self._get(collection_name).create_payload_index(field_name)
+
+    def upsert(self, collection_name: str, points: list[qm.PointStruct], **_: Any) -> None:
+        self._get(collection_name).upsert(points)
+
+    def count(self, collection_name: str, count_filter: qm.Filter | None = None, exact: bool = True) -> Any:
+        col = self._get(collection_name)
+        mask = col.filter_mask(count_filter)
+        total = col.count if mask is None else int(mask.sum())
+        return qm.CountResult(count=total)
+
+    def scroll(
+        self,
+        collection_name: str,
+        limit: int = 10,
+        offset: int | None = None,
+        with_payload: bool | list[str] = True,
+        **_: Any,
+    ) -> tuple[list[qm.Record], int | None]:
+        """Points in insertion order; the offset is a row number (pass back the returned one for the next page)."""
+        col = self._get(collection_name)
+        start = offset or 0
+        end = min(start + limit, col.count)
+        records = []
+        for row in range(start, end):
+            payload = col.payloads[row]
+            if isinstance(with_payload, list):
+                payload = {key: payload[key] for key in with_payload if key in payload}
+            records.append(qm.Record(id=col.ids[row], payload=payload if with_payload else None))
+        return records, end if end < col.count else None
+
+    def query_points(
+        self,
+        collection_name: str,
+        query: list[float] | None = None,
+        query_filter: qm.Filter | None = None,
+        limit: int = 10,
+        with_payload: bool = True,
+        **kwargs: Any,
+    ) -> qm.QueryResponse:
+        if kwargs.get("prefetch") or kwargs.get("using"):
+            raise ValueError("Local index does not support prefetch/named vectors; use dense queries")
+        if query is None:
+            raise ValueError("Local index requires a dense query vector")
+        return qm.QueryResponse(points=self._get(collection_name).search(query, query_filter, limit, with_payload))
+
+    def _get(self, collection_name: str) -> "_LocalCollection":
+        col = self._collections.get(collection_name)
+        if col is None:
+            if not self.collection_exists(collection_name):
+                raise ValueError(f"Local collection not found: {self.root / collection_name}")
+            col = _LocalCollection(self.root / collection_name)
+            self._collections[collection_name] = col
+        return col
+
+
+class _LocalCollection:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        meta = json.loads((path / _META_FILE).read_text(encoding="utf-8"))
+        self.dim: int = meta["dim"]
+        self.distance: str = meta["distance"]
+        self.indexed_fields: list[str] = meta.get("payload_indexes", [])
+        self.ids: list[Any] = []
+        self.payloads: list[dict[str, Any]] = []
+        self.rows: dict[Any, int] = {}
+        self._columns: dict[str, np.ndarray] = {}
+        # Keyword indexes: field -> value -> sorted row ids, rebuilt lazily after writes.
+        self._keyword_indexes: dict[str, dict[Any, np.ndarray]] = {}
+        self._load_payloads()
+        self._vectors = self._map_vectors()
+
+    @property
+    def count(self) -> int:
+        return len(self.ids)
+
+    def _load_payloads(self) -> None:
+        with (self.path / _PAYLOADS_FILE).open(encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                self._set_row(record["id"], record["row"], record["payload"])
+
+    def _set_row(self, point_id: Any, row: int, payload: dict[str, Any]) -> None:
+        if row == len(self.ids):
+            self.ids.append(point_id)
+            self.payloads.append(payload)
+        else:
+            self.payloads[row] = payload
+        self.rows[point_id] = row
+
+    def _map_vectors(self) -> np.ndarray:
+        # Only rows with a payload record count; trailing rows from an interrupted upsert are ignored.
+        rows = min(self.count, os.path.getsize(self.path / _VECTORS_FILE) // (4 * self.dim))
+        if rows == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.memmap(self.path / _VECTORS_FILE, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def upsert(self, points: list[qm.PointStruct]) -> None:
+        records: list[tuple[Any, int, dict[str, Any]]] = []
+        vectors: dict[int, np.ndarray] = {}
+        new_rows: dict[Any, int] = {}
+        for point in points:
+            vec = self._prepare(point.vector)
+            point_id = str(point.id) if not isinstance(point.id, int) else point.id
+            row = self.rows.get(point_id, new_rows.get(point_id))
+            if row is None:
+                row = new_rows[point_id] = self.count + len(new_rows)
+            vectors[row] = vec
+            records.append((point_id, row, point.payload or {}))
+
+        # Vectors first, so no payload record ever points at a row that is not on disk yet.
+        # Release the read-only map before touching the file underneath it.
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        with (self.path / _VECTORS_FILE).open("r+b") as fh:
+            for row, vec in sorted(vectors.items()):
+                fh.seek(row * 4 * self.dim)
+                fh.write(vec.astype(np.float32).tobytes())
+        with (self.path / _PAYLOADS_FILE).open("a", encoding="utf-8") as fh:
+            for point_id, row, payload in records:
+                fh.write(json.dumps({"id": point_id, "row": row, "payload": payload}, ensure_ascii=False) + "\n")
+                self._set_row(point_id, row, payload)
+        self._vectors = self._map_vectors()
+        self._columns.clear()
+        self._keyword_indexes.clear()
+
+    def create_payload_index(self, key: str) -> None:
+        if key in self.indexed_fields:
+            return
+        self.indexed_fields.append(key)
+        self._update_meta(payload_indexes=self.indexed_fields)
+
+    def record_quantization(self, config: qm.QuantizationConfig | qm.Disabled) -> None:
+        settings = None if isinstance(config, qm.Disabled) else config.model_dump(mode="json", exclude_none=True)
+        self._update_meta(quantization=settings)
+
+    def _update_meta(self, **fields: Any) -> None:
+        meta_path = self.path / _META_FILE
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        meta.update(fields)
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    def _keyword_index(self, key: str) -> dict[Any, np.ndarray]:
+        index = self._keyword_indexes.get(key)
+        if index is None:
+            rows_by_value: dict[Any, list[int]] = {}
+            for row, payload in enumerate(self.payloads):
+                value = payload.get(key)
+                if isinstance(value, (str, int, bool)):
+                    rows_by_value.setdefault(value, []).append(row)
+            index = {value: np.asarray(rows, dtype=np.int64) for value, rows in rows_by_value.items()}
+            self._keyword_indexes[key] = index
+        return index
+
+    def _prepare(self, vector: Any) -> np.ndarray:
+        if isinstance(vector, dict):
+            vector = vector.get("")
+        vec = np.asarray(vector, dtype=np.float32)
+        if vec.shape != (self.dim,):
+            raise ValueError(f"Vector dim mismatch: expected {self.dim}, got {vec.shape}")
+        if self.distance == "Cosine":
+            norm = float(np.linalg.norm(vec))
+            if norm > 0:
+                vec = vec / norm
+        return vec
+
+    def _column(self, key: str) -> np.ndarray:
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(self.count, dtype=object)
+            column[:] = [payload.get(key) for payload in self.payloads]
+            self._columns[key] = column
+        return column
+
+    def filter_mask(self, query_filter: qm.Filter | None) -> np.ndarray | None:
+        """
+        Boolean row mask for must/must_not FieldConditions with MatchValue or MatchAny; None means no filter.
+        """
+        if query_filter is None:
+            return None
+        mask = np.ones(self.count, dtype=bool)
+        for condition in _as_list(query_filter.must):
+            mask &= self._condition_mask(condition)
+        for condition in _as_list(query_filter.must_not):
+            mask &= ~self._condition_mask(condition)
+        return mask
+
+    def _condition_mask(self, condition: Any) -> np.ndarray:
+        if not isinstance(condition, qm.FieldCondition) or condition.match is None:
+            raise ValueError(f"Local index supports FieldCondition with match only, got {condition!r}")
+        if condition.key in self.indexed_fields and isinstance(condition.match, (qm.MatchValue, qm.MatchAny)):
+            values = [condition.match.value] if isinstance(condition.match, qm.MatchValue) else condition.match.any
+            mask = np.zeros(self.count, dtype=bool)
+            index = self._keyword_index(condition.key)
+            for value in values:
+                rows = index.get(value)
+                if rows is not None:
+                    mask[rows] = True
+            return mask
+
+        column = self._column(condition.key)
+        if isinstance(condition.match, qm.MatchValue):
+            return np.asarray(column == condition.match.value, dtype=bool)
+        if isinstance(condition.match, qm.MatchAny):
+            return np.isin(column, list(condition.match.any))
+        raise ValueError(f"Unsupported match type: {type(condition.match).__name__}")
+
+    def search(
+        self, query: list[float], query_filter: qm.Filter | None, limit: int, with_payload: bool
+    ) -> list[qm.ScoredPoint]:
+        q = self._prepare(query)
+        mask = self.filter_mask(query_filter)
+        if mask is None:
+            candidates = np.arange(self.count)
+            matrix = self._vectors
+        else:
+            candidates = np.flatnonzero(mask)
+            matrix = self._vectors[candidates]
+        if candidates.size == 0 or limit <= 0:
+            return []
+
+        scores = matrix @ q
+        k = min(limit, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            qm.ScoredPoint(
+                id=self.ids[int(candidates[i])],
+                version=0,
+                score=float(scores[i]),
+                payload=self.payloads[int(candidates[i])] if with_payload else None,
+            )
+            for i in top
+        ]
+
+
+def _distance_name(distance: Any) -> str:
+    return distance.value if isinstance(distance, qm.Distance) else str(distance)
+
+
+def _as_list(value: Any) -> list[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def open_client(url: str = "http://localhost:6333") -> Any:
+    """
+    Return the retrieval backend: a QdrantClient by default, or a LocalVectorIndex when RAG_BACKEND=local
+    (stored under RAG_LOCAL_INDEX_DIR, default belbin_engine_data/local_index).
+    """
+    if os.getenv("RAG_BACKEND", "qdrant").strip().lower() == "local":
+        return LocalVectorIndex(os.getenv("RAG_LOCAL_INDEX_DIR", str(LOCAL_INDEX_DIR)))
+
+    from qdrant_client import QdrantClient
+
+    return QdrantClient(url=url)
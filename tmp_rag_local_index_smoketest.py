@@ -0,0 +1,97 @@
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from qdrant_client.http import models as qm
+
+from tmp_rag_local_index import LocalVectorIndex
+from tmp_rag_quantization import apply_quantization, resolve_quantization
+
+DIM = 16
+
+
+def _vec(seed):
+    rng = random.Random(seed)
+    return [rng.uniform(-1.0, 1.0) for _ in range(DIM)]
+
+
+def _points(n):
+    return [
+        qm.PointStruct(
+            id=i,
+            vector=_vec(i),
+            payload={"type": "RULES" if i % 2 else "CONCEPT", "chunk_index": i, "text": f"chunk {i}"},
+        )
+        for i in range(n)
+    ]
+
+
+def main():
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        index = LocalVectorIndex(tmp)
+        index.create_collection("smoke", vectors_config=qm.VectorParams(size=DIM, distance=qm.Distance.COSINE))
+        index.upsert("smoke", _points(200))
+
+        res = index.query_points(collection_name="smoke", query=_vec(42), limit=3)
+        top = res.points[0].id if res.points else None
+        print(f"[EXACT] top_id={top} score={res.points[0].score:.4f}")
+        all_ok &= top == 42 and abs(res.points[0].score - 1.0) < 1e-5
+
+        rules_only = qm.Filter(must=[qm.FieldCondition(key="type", match=qm.MatchValue(value="RULES"))])
+        res = index.query_points(collection_name="smoke", query=_vec(42), query_filter=rules_only, limit=5)
+        types = {p.payload.get("type") for p in res.points}
+        print(f"[FILTER] types={sorted(types)} n={len(res.points)}")
+        all_ok &= types == {"RULES"} and len(res.points) == 5
+
+        # Reopen from disk: memory-mapped vectors + payload side store must round-trip.
+        reopened = LocalVectorIndex(tmp)
+        count = reopened.count("smoke", count_filter=rules_only).count
+        print(f"[REOPEN] rules_count={count}")
+        all_ok &= count == 100
+
+        # Overwrite an existing id in place.
+        reopened.upsert("smoke", [qm.PointStruct(id=42, vector=_vec(7), payload={"type": "TEMPLATE"})])
+        res = reopened.query_points(collection_name="smoke", query=_vec(7), limit=2)
+        ids = [p.id for p in res.points]
+        print(f"[UPSERT] ids={ids} total={reopened.count('smoke').count}")
+        all_ok &= set(ids) == {7, 42} and reopened.count("smoke").count == 200
+
+        # An upsert interrupted after its vectors but before its payloads leaves orphan rows, which stay hidden
+        # and are overwritten by the next upsert.
+        with (Path(tmp) / "smoke" / "vectors.f32").open("ab") as fh:
+            fh.write(b"\0" * 4 * DIM * 3)
+        recovered = LocalVectorIndex(tmp)
+        orphans_hidden = recovered.count("smoke").count == 200
+        recovered.upsert("smoke", [qm.PointStruct(id=500, vector=_vec(500), payload={"type": "RULES"})])
+        res = LocalVectorIndex(tmp).query_points(collection_name="smoke", query=_vec(500), limit=1)
+        top = res.points[0] if res.points else None
+        print(f"[INTERRUPTED] orphans_hidden={orphans_hidden} top_id={top and top.id} score={top and top.score:.4f}")
+        all_ok &= orphans_hidden and top is not None and top.id == 500 and abs(top.score - 1.0) < 1e-5
+
+        # --requantize on RAG_BACKEND=local: recorded in meta.json, search stays exact float32
+        apply_quantization(recovered, "smoke", resolve_quantization({"quantization": {"mode": "scalar"}}))
+        meta = json.loads((Path(tmp) / "smoke" / "meta.json").read_text(encoding="utf-8"))
+        apply_quantization(recovered, "smoke", resolve_quantization({}))
+        disabled = json.loads((Path(tmp) / "smoke" / "meta.json").read_text(encoding="utf-8"))
+        print(f"[REQUANTIZE] recorded={meta.get('quantization')} disabled={disabled.get('quantization')}")
+        all_ok &= "scalar" in (meta.get("quantization") or {}) and disabled.get("quantization") is None
+
+        runs = 200
+        start = time.perf_counter()
+        for _ in range(runs):
+            reopened.query_points(collection_name="smoke", query=_vec(1), query_filter=rules_only, limit=5)
+        per_query_ms = (time.perf_counter() - start) * 1000 / runs
+        print(f"[LATENCY] {per_query_ms:.3f} ms/query (200 points, filtered)")
+
+    if all_ok:
+        print("[OK] rag local index smoketest: 6/6 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
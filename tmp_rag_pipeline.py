@@ -0,0 +1,364 @@
+import argparse
+import asyncio
+import contextlib
+import functools
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from tmp_llm_answer_generator import (
+    AnswerGenerator,
+    default_generator,
+    guardrails_flags,
+    open_response_cache,
+    response_cache_params,
+)
+from tmp_rag_chunk_merge import merge_adjacent_chunks
+from tmp_rag_guardrails_impl import run_guardrails
+from tmp_rag_local_index import open_client
+from tmp_rag_prompt_wrapper import build_prompt
+from tmp_rag_query_planner import plan_query
+from tmp_rag_query_run import (
+    COLLECTION,
+    build_query_filter,
+    merge_adjacent_enabled,
+    open_query_cache,
+    points_to_chunks,
+    prompt_token_budget,
+    query_cache_filters,
+    retrieve,
+    retrieve_speculative,
+    speculative_filters_enabled,
+)
+from tmp_rag_sparse import has_sparse_vector
+
+PIPELINE_HOST = "127.0.0.1"
+PIPELINE_PORT = 8090
+PIPELINE_MAX_CONCURRENCY = 16
+PIPELINE_BLOCKING_WORKERS = 8
+QUERY_CACHE_SAVE_EVERY = 20
+
+
+@dataclass
+class StageTimeouts:
+    """Per-stage timeouts in seconds (None disables the timeout for that stage)."""
+
+    plan: float | None = 2.0
+    cache: float | None = 2.0
+    embed: float | None = 10.0
+    retrieve: float | None = 10.0
+    prompt: float | None = 2.0
+    generate: float | None = 60.0
+    guard: float | None = 10.0
+
+
+@dataclass
+class PipelineResult:
+    """
+    Outcome of one question.
+
+    status: PASS / WARN / REFUSE (guardrails verdict), TIMEOUT or ERROR (see failed_stage and error).
+    answer is None unless the status is PASS or WARN.
+    """
+
+    status: str
+    query: str
+    answer: str | None = None
+    reasons: list[dict[str, Any]] = field(default_factory=list)
+    failed_stage: str | None = None
+    error: str | None = None
+    filters: dict[str, Any] = field(default_factory=dict)
+    chunk_ids: list[str] = field(default_factory=list)
+    cached: dict[str, bool] = field(default_factory=lambda: {"retrieval": False, "response": False})
+    stage_ms: dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class StageError(Exception):
+    def __init__(self, stage: str, error: str, status: str = "ERROR") -> None:
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+        self.status = status
+
+
+class RagPipeline:
+    """
+    plan -> embed -> retrieve -> prompt -> generate -> guard as one long-lived async object.
+
+    Clients (vector store, embedding model, answer generator, caches) are created once and shared by all
+    questions. Blocking stages (planning, cache lookups and writes, search, prompt building, guardrails) run on a
+    pool of blocking_workers threads so concurrent questions do not stall the event loop.
+    Failures and timeouts come back as a PipelineResult status (ERROR / TIMEOUT) instead of exiting the process.
+
+    A thread cannot be cancelled: when a blocking stage times out, its thread finishes the work in the background
+    and the result is discarded. The fixed pool bounds how many such threads exist; while all are busy, new
+    blocking stages wait for a free thread within their own timeout.
+
+    The query cache is saved off the event loop after every save_every new entries and on close().
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        embedder: Any,
+        generator: AnswerGenerator,
+        *,
+        collection: str = COLLECTION,
+        retrieval_mode: str = "hybrid",
+        timeouts: StageTimeouts | None = None,
+        query_cache: Any = None,
+        response_cache: Any = None,
+        merge_adjacent: bool = True,
+        token_budget: int | None = None,
+        speculative_filters: bool = True,
+        blocking_workers: int = PIPELINE_BLOCKING_WORKERS,
+        save_every: int = QUERY_CACHE_SAVE_EVERY,
+    ) -> None:
+        self.client = client
+        self.embedder = embedder
+        self.generator = generator
+        self.collection = collection
+        self.retrieval_mode = retrieval_mode
+        self.timeouts = timeouts or StageTimeouts()
+        self.query_cache = query_cache
+        self.response_cache = response_cache
+        self.merge_adjacent = merge_adjacent
+        self.token_budget = token_budget
+        self.speculative_filters = speculative_filters
+        self.save_every = save_every
+        self._hybrid: bool | None = None
+        self._executor = ThreadPoolExecutor(max_workers=blocking_workers, thread_name_prefix="rag-stage")
+        # QueryCache and the response cache connection are not safe for concurrent use from several threads.
+        self._query_cache_lock = threading.Lock()
+        self._response_cache_lock = threading.Lock()
+        self._unsaved = 0
+        self._save_task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_env(cls, url: str = "http://localhost:6333") -> "RagPipeline":
+        """Same backends and switches as the CLI scripts (RAG_BACKEND, RAG_RETRIEVAL_MODE, caches, budget)."""
+        from beeai_framework.adapters.gemini.backend.embedding import GeminiEmbeddingModel
+
+        return cls(
+            client=open_client(url),
+            embedder=GeminiEmbeddingModel(model_id="text-embedding-004"),
+            generator=default_generator(),
+            retrieval_mode=os.getenv("RAG_RETRIEVAL_MODE", "hybrid").strip().lower(),
+            query_cache=open_query_cache(),
+            response_cache=open_response_cache(),
+            merge_adjacent=merge_adjacent_enabled(),
+            token_budget=prompt_token_budget(),
+            speculative_filters=speculative_filters_enabled(),
+        )
+
+    async def _stage(self, result: PipelineResult, name: str, awaitable: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(awaitable, timeout=getattr(self.timeouts, name))
+        except TimeoutError:
+            raise StageError(name, f"timed out after {getattr(self.timeouts, name)}s", status="TIMEOUT")
+        except Exception as e:
+            raise StageError(name, f"{type(e).__name__}: {e}")
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            result.stage_ms[name] = round(result.stage_ms.get(name, 0.0) + elapsed_ms, 2)
+
+    def _blocking(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> "asyncio.Future[Any]":
+        return asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def _locked(self, lock: threading.Lock, fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        def call() -> Any:
+            with lock:
+                return fn(*args)
+
+        return self._blocking(call)
+
+    def _query_cache_added(self) -> None:
+        self._unsaved += 1
+        if self._unsaved >= self.save_every and (self._save_task is None or self._save_task.done()):
+            self._save_task = asyncio.create_task(self._save_query_cache())
+
+    async def _save_query_cache(self) -> None:
+        if self.query_cache is None or not self._unsaved:
+            return
+        self._unsaved = 0
+        await self._locked(self._query_cache_lock, self.query_cache.save)
+
+    async def close(self) -> None:
+        """Saves unsaved query cache entries and closes the response cache; running stage threads are not awaited."""
+        if self._save_task is not None:
+            with contextlib.suppress(Exception):
+                await self._save_task
+        await self._save_query_cache()
+        if self.response_cache is not None:
+            await self._locked(self._response_cache_lock, self.response_cache.close)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _embed(self, text: str) -> list[float]:
+        output = await self.embedder.create([text])
+        return list(output.embeddings[0])
+
+    async def _search(self, planned: Any, embedding: list[float]) -> list[Any]:
+        if self._hybrid is None:
+            self._hybrid = self.retrieval_mode != "dense" and await self._blocking(
+                has_sparse_vector, self.client, self.collection
+            )
+        if self.speculative_filters:
+            return list(
+                await retrieve_speculative(self.client, planned, embedding, self._hybrid, run_blocking=self._blocking)
+            )
+        query_filter = build_query_filter(planned.filters)
+        return list(await self._blocking(retrieve, self.client, planned, embedding, query_filter, self._hybrid))
+
+    async def answer(self, user_input: str) -> PipelineResult:
+        result = PipelineResult(status="ERROR", query=user_input)
+        try:
+            await self._run(user_input, result)
+        except StageError as e:
+            result.status, result.answer = e.status, None
+            result.failed_stage, result.error = e.stage, e.error
+        except Exception as e:
+            # glue code between stages; still a structured result, not an HTTP 500 without a body
+            result.status, result.answer = "ERROR", None
+            result.failed_stage, result.error = "pipeline", f"{type(e).__name__}: {e}"
+        return result
+
+    async def _run(self, user_input: str, result: PipelineResult) -> None:
+        planned = await self._stage(result, "plan", self._blocking(plan_query, user_input))
+        result.filters = planned.filters
+        scope = (query_cache_filters(planned, self.speculative_filters), planned.topk, self.retrieval_mode)
+        query_cache, lock = self.query_cache, self._query_cache_lock
+
+        cached = None
+        if query_cache:
+            lookup = self._locked(lock, query_cache.lookup_exact, planned.query_text, *scope)
+            cached = await self._stage(result, "cache", lookup)
+        if cached:
+            embedding = cached["embedding"]
+        else:
+            embedding = await self._stage(result, "embed", self._embed(planned.query_text))
+            if query_cache:
+                lookup = self._locked(lock, query_cache.lookup_similar, embedding, *scope)
+                cached = await self._stage(result, "cache", lookup)
+
+        if cached:
+            points = cached["points"]
+            result.cached["retrieval"] = True
+        else:
+            points = await self._stage(result, "retrieve", self._search(planned, embedding))
+            if query_cache:
+                put = self._locked(lock, query_cache.put, planned.query_text, *scope, embedding, points)
+                await self._stage(result, "cache", put)
+                self._query_cache_added()
+
+        prompt_payload = await self._stage(result, "prompt", self._blocking(self._build_prompt, user_input, points))
+        result.chunk_ids = [chunk["id"] for chunk in prompt_payload.get("retrieved_chunks", [])]
+
+        flags = guardrails_flags()
+        hit = None
+        if self.response_cache:
+            model_id, params = self.generator.default_model_id, response_cache_params(flags, self.generator)
+            lookup = self._locked(self._response_cache_lock, self.response_cache.get, model_id, params, prompt_payload)
+            hit = await self._stage(result, "cache", lookup)
+        if hit:
+            answer_text, verdict = hit["answer_text"], hit["guardrails"]
+            result.cached["response"] = True
+        else:
+            answer_text = await self._stage(result, "generate", self.generator.generate(prompt_payload))
+            verdict = await self._stage(
+                result,
+                "guard",
+                self._blocking(
+                    run_guardrails,
+                    answer_text=answer_text,
+                    retrieved_chunks=prompt_payload.get("retrieved_chunks", []),
+                    prompt_context_string=prompt_payload.get("context", ""),
+                    **flags,
+                ),
+            )
+            if self.response_cache:
+                put = self._locked(
+                    self._response_cache_lock,
+                    self.response_cache.put,
+                    model_id,
+                    params,
+                    prompt_payload,
+                    answer_text,
+                    verdict,
+                )
+                await self._stage(result, "cache", put)
+
+        result.status = verdict.get("status") or "ERROR"
+        result.reasons = verdict.get("reasons", []) or []
+        result.answer = answer_text if result.status in {"PASS", "WARN"} else None
+
+    def _build_prompt(self, user_input: str, points: list[Any]) -> dict[str, Any]:
+        retrieved_chunks = points_to_chunks(points)
+        if self.merge_adjacent:
+            retrieved_chunks = merge_adjacent_chunks(retrieved_chunks)
+        return build_prompt(user_input, retrieved_chunks, token_budget=self.token_budget)
+
+
+# REFUSE is a valid answer to the question; only stage failures map to error codes.
+_HTTP_STATUS = {"PASS": 200, "WARN": 200, "REFUSE": 200, "TIMEOUT": 504, "ERROR": 500}
+
+
+def create_app(pipeline: RagPipeline, max_concurrency: int = PIPELINE_MAX_CONCURRENCY) -> Any:
+    """
+    Starlette app (the stack A2AServer serves on):
+    - POST /answer {"query": "..."} -> PipelineResult as JSON (504 on a stage timeout, 500 on other failures)
+    - GET /health
+    At most max_concurrency questions run at once; further requests wait.
+    """
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_: Starlette) -> AsyncIterator[None]:
+        yield
+        await pipeline.close()
+
+    async def answer(request: Request) -> JSONResponse:
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        query = body.get("query") if isinstance(body, dict) else None
+        if not isinstance(query, str) or not query.strip():
+            return JSONResponse({"error": 'expected JSON body {"query": "<question>"}'}, status_code=400)
+        async with semaphore:
+            result = await pipeline.answer(query)
+        return JSONResponse(result.to_dict(), status_code=_HTTP_STATUS.get(result.status, 500))
+
+    async def health(_: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok"})
+
+    return Starlette(routes=[Route("/answer", answer, methods=["POST"]), Route("/health", health)], lifespan=lifespan)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the RAG pipeline over HTTP.")
+    parser.add_argument("--host", default=PIPELINE_HOST)
+    parser.add_argument("--port", type=int, default=PIPELINE_PORT)
+    parser.add_argument("--qdrant_url", default="http://localhost:6333")
+    parser.add_argument("--max_concurrency", type=int, default=PIPELINE_MAX_CONCURRENCY)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(RagPipeline.from_env(args.qdrant_url), max_concurrency=args.max_concurrency),
+        host=args.host,
+        port=args.port,
+    )
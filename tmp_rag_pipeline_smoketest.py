@@ -0,0 +1,129 @@
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from qdrant_client.http import models as qm
+from starlette.testclient import TestClient
+
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+from beeai_framework_starter.helpers.fake_embedding_model import FakeEmbeddingModel
+from tmp_llm_answer_generator import AnswerGenerator
+from tmp_rag_local_index import LocalVectorIndex
+from tmp_rag_pipeline import RagPipeline, StageTimeouts, create_app
+from tmp_rag_query_cache import QueryCache
+import tmp_rag_query_run
+from tmp_rag_query_run import COLLECTION
+
+DOCS = [
+    "Alpha is first in the series.",
+    "Beta follows alpha in the sequence.",
+    "Gamma closes the series of letters.",
+]
+
+
+def _pipeline(tmp, answer, latency=0.0, timeouts=None, **kwargs):
+    embedder = FakeEmbeddingModel(dim=32)
+    index = LocalVectorIndex(tmp)
+    if not index.collection_exists(COLLECTION):
+        index.create_collection(COLLECTION, vectors_config=qm.VectorParams(size=32, distance=qm.Distance.COSINE))
+        index.upsert(
+            COLLECTION,
+            [
+                qm.PointStruct(
+                    id=i,
+                    vector=embedder.embed(text),
+                    payload={"source_file": f"doc{i}.md", "chunk_index": 0, "text": text},
+                )
+                for i, text in enumerate(DOCS)
+            ],
+        )
+    generator = AnswerGenerator(llm=FakeChatModel(lambda _: answer, latency=latency))
+    return RagPipeline(index, embedder, generator, retrieval_mode="dense", timeouts=timeouts, **kwargs)
+
+
+async def _concurrent(pipeline, queries):
+    return await asyncio.gather(*(pipeline.answer(query) for query in queries))
+
+
+class _BrokenCache:
+    def lookup_exact(self, *args):
+        raise OSError("cache file unreadable")
+
+
+async def _cached_run(tmp):
+    """save_every=2: the cache file appears after two new entries; close() writes the rest."""
+    path = Path(tmp) / "query_cache.json"
+    pipeline = _pipeline(tmp, "Alpha [C1].", query_cache=QueryCache(path), save_every=2)
+    for query in ("What is first?", "What follows alpha?"):
+        await pipeline.answer(query)
+    await pipeline._save_task
+    saved_early = len(json.loads(path.read_text())["entries"])
+    third = await pipeline.answer("What closes the series?")
+    repeat = await pipeline.answer("what is FIRST")
+    await pipeline.close()
+    return saved_early, len(json.loads(path.read_text())["entries"]), third, repeat
+
+
+def main():
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        pipeline = _pipeline(tmp, "Alpha is first in the series [C1].")
+        results = asyncio.run(_concurrent(pipeline, ["What is first in the series?"] * 4))
+        first = results[0]
+        statuses = [r.status for r in results]
+        print(f"[PASS] statuses={statuses} chunk_ids={first.chunk_ids} stages={list(first.stage_ms)}")
+        all_ok &= all(r.status == "PASS" and r.answer for r in results)
+        all_ok &= list(first.stage_ms) == ["plan", "embed", "retrieve", "prompt", "generate", "guard"]
+
+        refused = asyncio.run(_pipeline(tmp, "All data is accurate and complete.").answer("What is first?"))
+        print(f"[REFUSE] status={refused.status} answer={refused.answer} reasons={len(refused.reasons)}")
+        all_ok &= refused.status == "REFUSE" and refused.answer is None and bool(refused.reasons)
+
+        slow = _pipeline(tmp, "Alpha [C1].", latency=0.5, timeouts=StageTimeouts(generate=0.05))
+        timed_out = asyncio.run(slow.answer("What is first?"))
+        print(f"[TIMEOUT] status={timed_out.status} stage={timed_out.failed_stage} error={timed_out.error}")
+        all_ok &= timed_out.status == "TIMEOUT" and timed_out.failed_stage == "generate"
+
+        saved_early, saved_on_close, third, repeat = asyncio.run(_cached_run(tmp))
+        print(f"[QUERY_CACHE] saved_after_2={saved_early} on_close={saved_on_close} repeat_cached={repeat.cached}")
+        all_ok &= saved_early == 2 and saved_on_close == 3 and repeat.cached["retrieval"] and "cache" in third.stage_ms
+
+        broken = asyncio.run(_pipeline(tmp, "Alpha [C1].", query_cache=_BrokenCache()).answer("What is first?"))
+        print(f"[CACHE_ERROR] status={broken.status} stage={broken.failed_stage} error={broken.error}")
+        all_ok &= broken.status == "ERROR" and broken.failed_stage == "cache" and "OSError" in broken.error
+
+        # speculative filter plans fan out on the pipeline's bounded executor, not the loop's default one
+        threads = set()
+        real_retrieve = tmp_rag_query_run.retrieve
+
+        def _recording_retrieve(*args):
+            threads.add(threading.current_thread().name)
+            return real_retrieve(*args)
+
+        tmp_rag_query_run.retrieve = _recording_retrieve
+        try:
+            spec = asyncio.run(
+                _pipeline(tmp, "Alpha [C1].", speculative_filters=True).answer("belbin decision template")
+            )
+        finally:
+            tmp_rag_query_run.retrieve = real_retrieve
+        print(f"[BOUNDED_THREADS] status={spec.status} search_threads={sorted(threads)}")
+        all_ok &= len(threads) > 1 and all(name.startswith("rag-stage") for name in threads)
+
+        with TestClient(create_app(pipeline)) as http:
+            ok = http.post("/answer", json={"query": "What follows alpha?"})
+            bad = http.post("/answer", json={})
+            print(f"[HTTP] answer={ok.status_code} {ok.json()['status']} bad_request={bad.status_code}")
+            all_ok &= ok.status_code == 200 and ok.json()["status"] in {"PASS", "WARN"} and bad.status_code == 400
+
+    if all_ok:
+        print("[OK] rag pipeline smoketest: 7/7 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from tmp_rag_query_planner import RuleMatcher, load_rule_matcher, plan_query, resolve_planner_rules
+
+
+def _write(path, rules, mtime):
+    path.write_text(json.dumps({"planner_rules": rules}), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def main():
+    all_ok = True
+    matcher = load_rule_matcher(Path("missing_planner_config.json"))
+
+    hits = {q: [r.name for r in matcher.match(q)] for q in ("preview the memo", "Reviews by severity", "templates?")}
+    print(f"[WORD_BOUNDARY] {hits}")
+    all_ok &= hits == {"preview the memo": [], "Reviews by severity": ["review_policy"], "templates?": ["template"]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ingest_config.json"
+        rules = [
+            {"name": "glossary", "patterns": ["glossary", "term definition"], "filters": {"type": "GLOSSARY"}},
+            {"name": "template", "patterns": ["template*"], "filters": {"type": "TEMPLATE"}, "precedence": -1},
+        ]
+        _write(path, rules, 1_000_000)
+        planned = plan_query("term   definition template", stats=None, matcher=load_rule_matcher(path))
+        order = [plan.rule for plan in planned.filter_plans]
+        print(f"[PRECEDENCE] plans={order} filters={planned.filters}")
+        all_ok &= order == ["glossary", "template"] and planned.filters == {"type": "GLOSSARY"}
+
+        first = load_rule_matcher(path)
+        cached = load_rule_matcher(path) is first
+        _write(path, [{"name": "faq", "patterns": ["faq"], "filters": {"type": "FAQ"}}], 1_000_100)
+        reloaded = load_rule_matcher(path)
+        faq = [r.name for r in reloaded.match("see the FAQ")]
+        print(f"[HOT_RELOAD] cached_until_change={cached} reloaded={reloaded is not first} faq={faq}")
+        all_ok &= cached and reloaded is not first and faq == ["faq"]
+
+    nested = RuleMatcher(
+        resolve_planner_rules(
+            {
+                "planner_rules": [
+                    {"name": "belbin", "patterns": ["belbin"], "filters": {"topic": "belbin"}},
+                    {"name": "orchestra", "patterns": ["belbin orchestra"], "filters": {"topic": "orchestra"}},
+                    {"name": "roles", "patterns": ["orchestra roles"], "filters": {"topic": "roles"}},
+                    {"name": "template", "patterns": ["template*"], "filters": {"type": "TEMPLATE"}},
+                    {"name": "dt", "patterns": ["decision template"], "filters": {"type": "DT"}},
+                ]
+            }
+        )
+    )
+    found = {q: sorted(r.name for r in nested.match(q)) for q in ("belbin orchestra roles", "decision templates?")}
+    found["decision template"] = sorted(r.name for r in nested.match("Decision  Template"))
+    print(f"[NESTED] {found}")
+    all_ok &= found == {
+        "belbin orchestra roles": ["belbin", "orchestra", "roles"],
+        "decision templates?": ["template"],
+        "decision template": ["dt", "template"],
+    }
+
+    raw_rules = [{"name": f"t{i}", "patterns": [f"topic{i}"], "filters": {"topic": f"t{i}"}} for i in range(500)]
+    many = resolve_planner_rules({"planner_rules": raw_rules})
+    big = RuleMatcher(many)
+    start = time.perf_counter()
+    for _ in range(1000):
+        found = big.match("compare topic42 with topic420 and topic4200")
+    per_query_us = (time.perf_counter() - start) * 1000
+    print(f"[SCALE] rules=500 matched={[r.name for r in found]} per_query_us={per_query_us:.1f}")
+    all_ok &= sorted(r.name for r in found) == ["t42", "t420"]
+
+    if all_ok:
+        print("[OK] rag planner rules smoketest: 5/5 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
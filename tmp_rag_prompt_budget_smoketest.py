@@ -0,0 +1,110 @@
+import sys
+
+from tmp_rag_guardrails_impl import run_guardrails
+from tmp_rag_prompt_wrapper import approx_token_count, build_budgeted_context, build_prompt
+
+SHARED = "Decisions need two reviewers before release."
+CHUNKS = [
+    {
+        "score": 0.9,
+        "source_file": "policy.md",
+        "type": "RULES",
+        "topic": "decision_policy",
+        "chunk_index": 0,
+        "text": "The decision loop starts with a plan. " + SHARED,
+    },
+    {
+        "score": 0.85,
+        "source_file": "policy.md",
+        "type": "RULES",
+        "topic": "decision_policy",
+        "chunk_index": 1,
+        "text": SHARED + " Confidence scores are published weekly.",
+    },
+    {
+        "score": 0.8,
+        "source_file": "copy.md",
+        "type": "RULES",
+        "topic": "decision_policy",
+        "chunk_index": 4,
+        "text": "The decision loop starts with a plan. " + SHARED,
+    },
+    {
+        "score": 0.2,
+        "source_file": "long.md",
+        "type": "CONCEPT",
+        "topic": "belbin_orchestra",
+        "chunk_index": 0,
+        "text": "Belbin roles are assigned per agent. " * 40,
+    },
+]
+
+TRIMMED = (
+    "Rollouts follow the staged checklist from the platform team handbook. "
+    "Every stage waits for the previous stage to finish and reports its metrics to the dashboard. " + SHARED
+)
+
+
+def _trimmed_neighbour_keeps_window(first_score, second_score, budget):
+    """Window 0 gets trimmed before the shared window; window 1 must keep it, whichever is picked first."""
+    chunks = [
+        {
+            "score": first_score,
+            "source_file": "trim.md",
+            "type": "RULES",
+            "topic": "t",
+            "chunk_index": 0,
+            "text": TRIMMED,
+        },
+        {
+            "score": second_score,
+            "source_file": "trim.md",
+            "type": "RULES",
+            "topic": "t",
+            "chunk_index": 1,
+            "text": SHARED + " Hotfixes skip it.",
+        },
+    ]
+    context, included, _ = build_budgeted_context(chunks, budget)
+    first = next(c["text"] for c in included if c["id"] == "C1")
+    return first != TRIMMED and len(included) == 2 and context.count(SHARED) == 1
+
+
+def main():
+    all_ok = True
+    budget = 160
+    payload = build_prompt("How are decisions released?", CHUNKS, token_budget=budget)
+    context = payload["context"]
+    ids = [c["id"] for c in payload["retrieved_chunks"]]
+    print(f"[LABELS] included={ids} dropped={payload['dropped_chunk_ids']}")
+    all_ok &= ids[:2] == ["C1", "C2"] and "C3" in payload["dropped_chunk_ids"]
+    all_ok &= context.startswith("[C1] policy.md#0") and "[C3]" not in context
+
+    print(f"[OVERLAP] shared_text_occurrences={context.count(SHARED)}")
+    all_ok &= context.count(SHARED) == 1
+
+    trimmed = [_trimmed_neighbour_keeps_window(0.9, 0.8, 44), _trimmed_neighbour_keeps_window(0.8, 0.9, 60)]
+    print(f"[OVERLAP_TRIMMED] previous_trimmed={trimmed[0]} following_after_trimmed={trimmed[1]}")
+    all_ok &= all(trimmed)
+
+    print(f"[BUDGET] estimate={payload['prompt_tokens_estimate']} budget={budget}")
+    all_ok &= payload["prompt_tokens_estimate"] <= budget
+    long_chunk = [c for c in payload["retrieved_chunks"] if c["id"] == "C4"]
+    all_ok &= not long_chunk or approx_token_count(long_chunk[0]["text"]) < approx_token_count(CHUNKS[3]["text"])
+
+    result = run_guardrails(
+        answer_text="Decisions need two reviewers before release [C1]. Confidence scores are published weekly [C2].",
+        retrieved_chunks=payload["retrieved_chunks"],
+        prompt_context_string=context,
+    )
+    print(f"[GUARDRAILS] status={result['status']}")
+    all_ok &= result["status"] == "PASS"
+
+    if all_ok:
+        print("[OK] rag prompt budget smoketest: 5/5 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
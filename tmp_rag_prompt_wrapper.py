@@ -1,12 +1,185 @@
 import json
+import math
+import re
+from typing import Callable
 
+# MMR trade-off between retrieval score (1.0) and novelty w.r.t. already selected chunks (0.0).
+MMR_LAMBDA = 0.7
+# Candidates whose token overlap (Jaccard) with a selected chunk reaches this are treated as duplicates.
+MAX_REDUNDANCY = 0.9
+# Minimum size of a text overlap between adjacent chunk windows before it is stripped.
+MIN_WINDOW_OVERLAP_CHARS = 20
 
-def build_prompt(user_query: str, retrieved_chunks: list[dict]) -> dict:
+_WORD_RE = re.compile(r"\w+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+
+
+def approx_token_count(text: str) -> int:
+    """Cheap tokenizer stand-in (~4 characters per token for English)."""
+    return math.ceil(len(text) / 4)
+
+
+def window_overlap(previous: str, following: str, min_chars: int = MIN_WINDOW_OVERLAP_CHARS) -> int:
+    """
+    Length of the longest suffix of `previous` that is a prefix of `following` (the shared window produced by
+    character-overlap chunking). Returns 0 when the overlap is shorter than min_chars.
+    """
+    longest = min(len(previous), len(following))
+    for size in range(longest, min_chars - 1, -1):
+        if previous.endswith(following[:size]):
+            return size
+    return 0
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def trim_to_sentences(text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> str:
+    """Longest prefix of whole sentences within max_tokens; empty string if not even one sentence fits."""
+    kept: list[str] = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        candidate = " ".join([*kept, sentence]).strip()
+        if count_tokens(candidate) > max_tokens:
+            break
+        kept.append(sentence)
+    return " ".join(kept).strip()
+
+
+def _format_chunk(chunk_id: str, chunk: dict, text: str) -> str:
+    return (
+        f"[{chunk_id}] {chunk.get('source_file', '')}#{chunk.get('chunk_index', '')} "
+        f"({chunk.get('type', '')}/{chunk.get('topic', '')})\n{text}"
+    )
+
+
+def _select_mmr(candidates: list[dict]) -> list[dict]:
+    """Order candidates by MMR over normalized scores and word-set redundancy; drops near-duplicates."""
+    if not candidates:
+        return []
+    scores = [float(c["chunk"].get("score") or 0.0) for c in candidates]
+    low, high = min(scores), max(scores)
+    for c, score in zip(candidates, scores, strict=True):
+        c["relevance"] = 1.0 if high == low else (score - low) / (high - low)
+        c["words"] = _words(str(c["chunk"].get("text", "")))
+
+    ordered: list[dict] = []
+    remaining = list(candidates)
+    while remaining:
+        best, best_value, best_redundancy = None, -math.inf, 0.0
+        for c in remaining:
+            redundancy = max((_jaccard(c["words"], s["words"]) for s in ordered), default=0.0)
+            value = MMR_LAMBDA * c["relevance"] - (1 - MMR_LAMBDA) * redundancy
+            if value > best_value:
+                best, best_value, best_redundancy = c, value, redundancy
+        remaining.remove(best)
+        if best_redundancy < MAX_REDUNDANCY:
+            ordered.append(best)
+    return ordered
+
+
+def build_budgeted_context(
+    retrieved_chunks: list[dict],
+    token_budget: int,
+    count_tokens: Callable[[str], int] = approx_token_count,
+) -> tuple[str, list[dict], list[str]]:
+    """
+    Fit retrieved chunks into token_budget.
+
+    - Labels are fixed by retrieval rank ([C1] is always the first retrieved chunk), so citations stay
+      valid for guardrails even when chunks are dropped or reordered.
+    - Chunks are picked by score with MMR redundancy removal.
+    - When consecutive chunk_index windows of the same source_file are both picked, the overlapping
+      prefix of the later window is removed. Overlap is measured against the text actually emitted for the
+      neighbour, so nothing is removed when the neighbour was trimmed and no longer contains the window.
+    - A chunk that does not fit is trimmed at sentence boundaries; if no sentence fits it is dropped.
+
+    Returns (context, included chunks with "id" and the text actually sent, dropped chunk ids).
+    """
+    candidates = [{"id": f"C{idx}", "chunk": chunk} for idx, chunk in enumerate(retrieved_chunks, start=1)]
+    ordered = _select_mmr(candidates)
+    dropped = [c["id"] for c in candidates if c not in ordered]
+
+    selected: dict[tuple, dict] = {}
+    used = 0
+    for c in ordered:
+        chunk = c["chunk"]
+        text = str(chunk.get("text", ""))
+        source_file, chunk_index = chunk.get("source_file"), chunk.get("chunk_index")
+        if isinstance(chunk_index, int):
+            previous = selected.get((source_file, chunk_index - 1))
+            if previous:
+                text = text[window_overlap(previous["text"], text) :]
+
+        separator_tokens = count_tokens("\n\n") if selected else 0
+        remaining = token_budget - used - separator_tokens
+        block = _format_chunk(c["id"], chunk, text)
+        if count_tokens(block) > remaining:
+            header_tokens = count_tokens(_format_chunk(c["id"], chunk, ""))
+            text = trim_to_sentences(text, remaining - header_tokens, count_tokens)
+            if not text:
+                dropped.append(c["id"])
+                continue
+            block = _format_chunk(c["id"], chunk, text)
+        if isinstance(chunk_index, int):
+            # after trimming: a trimmed chunk may no longer end with the window the following chunk starts with
+            following = selected.get((source_file, chunk_index + 1))
+            if following:
+                cut = window_overlap(text, following["text"])
+                if cut:
+                    following["text"] = following["text"][cut:]
+        used += separator_tokens + count_tokens(block)
+        c["text"] = text
+        selected[(source_file, chunk_index if isinstance(chunk_index, int) else c["id"])] = c
+
+    included = sorted(selected.values(), key=lambda c: int(c["id"][1:]))
+    context = "\n\n".join(_format_chunk(c["id"], c["chunk"], c["text"]) for c in included)
+    included_chunks = [{**c["chunk"], "id": c["id"], "text": c["text"]} for c in included]
+    dropped_ids = sorted(dropped, key=lambda cid: int(cid[1:]))
+    return context, included_chunks, dropped_ids
+
+
+def build_prompt(
+    user_query: str,
+    retrieved_chunks: list[dict],
+    token_budget: int | None = None,
+    count_tokens: Callable[[str], int] = approx_token_count,
+) -> dict:
+    """
+    Build the prompt payload. With token_budget, the whole prompt (instructions, query and context) is kept
+    within the budget using build_budgeted_context and compact chunk headers.
+    """
     system_instruction = (
         "You are a helpful assistant. Answer ONLY using the provided context. "
         "If the answer is not in the context, say you do not know."
     )
 
+    instructions = (
+        "Cite sources using bracketed chunk labels like [C1]. "
+        "If multiple chunks support a statement, cite all relevant chunks."
+    )
+
+    if token_budget is not None:
+        fixed_tokens = count_tokens("\n".join([system_instruction, instructions, user_query]))
+        context, included_chunks, dropped_ids = build_budgeted_context(
+            retrieved_chunks, max(0, token_budget - fixed_tokens), count_tokens
+        )
+        return {
+            "system_instruction": system_instruction,
+            "user_query": user_query,
+            "context": context,
+            "instructions": instructions,
+            "retrieved_chunks": included_chunks,
+            "dropped_chunk_ids": dropped_ids,
+            "prompt_tokens_estimate": fixed_tokens + count_tokens(context),
+        }
+
     context_lines = []
     for idx, chunk in enumerate(retrieved_chunks, start=1):
         label = f"[C{idx}]"
@@ -26,16 +199,12 @@ def build_prompt(user_query: str, retrieved_chunks: list[dict]) -> dict:
 
     context = "\n\n".join(context_lines)
 
-    instructions = (
-        "Cite sources using bracketed chunk labels like [C1]. "
-        "If multiple chunks support a statement, cite all relevant chunks."
-    )
-
     return {
         "system_instruction": system_instruction,
         "user_query": user_query,
         "context": context,
         "instructions": instructions,
+        "retrieved_chunks": [{**chunk, "id": f"C{idx}"} for idx, chunk in enumerate(retrieved_chunks, start=1)],
     }
 
 
@@ -62,3 +231,6 @@ if __name__ == "__main__":
 
     payload = build_prompt(example_query, example_chunks)
     print(json.dumps(payload, indent=2))
+
+    budgeted = build_prompt(example_query, example_chunks, token_budget=100)
+    print(json.dumps(budgeted, indent=2))
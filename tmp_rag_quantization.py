@@ -0,0 +1,128 @@
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from qdrant_client.http import models as qm
+
+CONFIG_PATH = Path("belbin_engine_data/ingest/ingest_config.json")
+
+# Defaults for the "quantization" section of ingest_config.json.
+DEFAULT_QUANTIZATION = {
+    "mode": "none",  # "none" | "scalar" (int8, ~4x smaller) | "binary" (1 bit/dim, ~32x smaller)
+    "always_ram": True,  # keep quantized vectors in RAM
+    "on_disk_originals": True,  # full float32 vectors stay on disk, read only for rescoring
+    "quantile": 0.99,  # scalar only: clip outliers when choosing the int8 range
+    "rescore": True,
+    "oversampling": 2.0,  # candidates fetched per requested hit before rescoring
+}
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+
+def resolve_quantization(cfg: dict[str, Any]) -> dict[str, Any]:
+    """
+    Merge the "quantization" section of an ingest config over the defaults.
+    """
+    settings = {**DEFAULT_QUANTIZATION, **(cfg.get("quantization") or {})}
+    if settings["mode"] not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {settings['mode']} (expected one of {QUANTIZATION_MODES})")
+    return settings
+
+
+def load_quantization_settings(path: Path = CONFIG_PATH) -> dict[str, Any]:
+    cfg = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    return resolve_quantization(cfg)
+
+
+def build_quantization_config(settings: dict[str, Any]) -> qm.QuantizationConfig | None:
+    mode = settings["mode"]
+    if mode == "scalar":
+        return qm.ScalarQuantization(
+            scalar=qm.ScalarQuantizationConfig(
+                type=qm.ScalarType.INT8,
+                quantile=settings["quantile"],
+                always_ram=settings["always_ram"],
+            )
+        )
+    if mode == "binary":
+        return qm.BinaryQuantization(binary=qm.BinaryQuantizationConfig(always_ram=settings["always_ram"]))
+    return None
+
+
+def quantization_search_params(settings: dict[str, Any]) -> qm.SearchParams | None:
+    """
+    Dense search params for a quantized collection; None when quantization is off.
+    """
+    if settings["mode"] == "none":
+        return None
+    return qm.SearchParams(
+        quantization=qm.QuantizationSearchParams(
+            rescore=settings["rescore"],
+            oversampling=settings["oversampling"],
+        )
+    )
+
+
+def originals_on_disk(settings: dict[str, Any]) -> bool:
+    """Full-precision vectors go to disk only when a quantized copy stays in RAM to search."""
+    return settings["mode"] != "none" and bool(settings["on_disk_originals"])
+
+
+def apply_quantization(client: Any, collection: str, settings: dict[str, Any]) -> None:
+    """
+    Switch an existing collection to the configured quantization (Qdrant re-quantizes in the background).
+    """
+    quantization = build_quantization_config(settings) or qm.Disabled.DISABLED
+    client.update_collection(
+        collection_name=collection,
+        vectors_config={"": qm.VectorParamsDiff(on_disk=originals_on_disk(settings))},
+        quantization_config=quantization,
+    )
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def compare_quantization(
+    client: Any, collection: str, query_vectors: list[list[float]], topk: int, oversampling: float
+) -> dict[str, Any]:
+    """
+    Recall@k and latency of quantized search against an exact, unquantized full scan on the same collection.
+    """
+    variants = {
+        "exact_float32": qm.SearchParams(exact=True, quantization=qm.QuantizationSearchParams(ignore=True)),
+        "quantized": qm.SearchParams(
+            quantization=qm.QuantizationSearchParams(rescore=False, oversampling=oversampling)
+        ),
+        "quantized_rescored": qm.SearchParams(
+            quantization=qm.QuantizationSearchParams(rescore=True, oversampling=oversampling)
+        ),
+    }
+    latencies: dict[str, list[float]] = {name: [] for name in variants}
+    hits: dict[str, list[list[Any]]] = {name: [] for name in variants}
+    for vec in query_vectors:
+        for name, params in variants.items():
+            start = time.perf_counter()
+            res = client.query_points(
+                collection_name=collection, query=vec, limit=topk, search_params=params, with_payload=False
+            )
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            hits[name].append([point.id for point in res.points])
+
+    report: dict[str, Any] = {"queries": len(query_vectors), "topk": topk, "variants": {}}
+    for name in variants:
+        recalls = [
+            len(set(found) & set(truth)) / max(1, len(truth))
+            for found, truth in zip(hits[name], hits["exact_float32"], strict=True)
+        ]
+        report["variants"][name] = {
+            "recall_at_k": round(sum(recalls) / max(1, len(recalls)), 4),
+            "latency_ms_p50": round(percentile(latencies[name], 50), 3),
+            "latency_ms_p95": round(percentile(latencies[name], 95), 3),
+        }
+    return report
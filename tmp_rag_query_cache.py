@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from qdrant_client.http import models as qm
+
+from tmp_rag_sparse import tokenize
+
+QUERY_CACHE_PATH = Path("belbin_engine_data/cache/query_cache.json")
+QUERY_CACHE_MAX_ENTRIES = 1000
+QUERY_CACHE_TTL_S = 24 * 3600
+# Written by every ingest run (tmp_real_ingest_qdrant.py --ingest); a new version invalidates cached results.
+INDEX_VERSION_PATH = Path("belbin_engine_data/ingest/index_version.json")
+
+
+def write_index_version(
+    collection: str, points_count: int, config: dict[str, Any], path: Path = INDEX_VERSION_PATH
+) -> str:
+    """
+    Records a new index version after an ingest: collection points count + ingest config hash + ingest time
+    (a re-ingest of changed text keeps the count and the config, but must still invalidate).
+    """
+    config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    ingested_at = time.time_ns()
+    version = f"{collection}:{points_count}:{config_hash}:{ingested_at}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": version, "ingested_at": ingested_at / 1e9}), encoding="utf-8")
+    return version
+
+
+def read_index_version(path: Path = INDEX_VERSION_PATH) -> str | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8")).get("version")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Case-, whitespace- and punctuation-insensitive form of a query ("What is Belbin?" == "what is belbin").
+    Punctuation inside tokens ("7.3", "policy-7") is kept.
+    """
+    return " ".join(tokenize(text))
+
+
+def _scope_key(filters: dict[str, Any], topk: int, mode: str) -> str:
+    # A cached result is only reusable under the same filters, topk and retrieval mode.
+    return json.dumps({"filters": filters, "topk": topk, "mode": mode}, sort_keys=True)
+
+
+class QueryCache:
+    """
+    Two-tier retrieval cache.
+
+    - Exact tier: normalized query text (+ scope) -> query embedding and retrieved points.
+      A hit skips both the embedding call and the search.
+    - Semantic tier (optional, similarity_threshold set): the new query embedding is compared with cached
+      embeddings of the same scope; if cosine similarity >= threshold the stored points are reused.
+      A hit skips the search only.
+
+    Entries are LRU-evicted beyond max_entries and expire after ttl_s (None keeps them). With a path, entries and
+    hit counters persist across runs (save() writes them back). Persisted entries are dropped when they were
+    saved under another index_version (see write_index_version), i.e. after a re-ingest.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        similarity_threshold: float | None = None,
+        max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+        ttl_s: float | None = QUERY_CACHE_TTL_S,
+        index_version: str | None = None,
+    ) -> None:
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.index_version = index_version
+        self.entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self.stats = {"lookups": 0, "exact_hits": 0, "semantic_hits": 0, "misses": 0, "expired": 0}
+        if path is not None and path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("index_version") == index_version:
+                self.entries = OrderedDict((entry["key"], entry) for entry in data.get("entries", []))
+            self.stats.update(data.get("stats", {}))
+
+    def _expired(self, entry: dict[str, Any], now: float) -> bool:
+        return self.ttl_s is not None and now - entry.get("created_at", 0.0) > self.ttl_s
+
+    def _key(self, query_text: str, scope: str) -> str:
+        return f"{scope}|{normalize_query(query_text)}"
+
+    def lookup_exact(self, query_text: str, filters: dict[str, Any], topk: int, mode: str) -> dict[str, Any] | None:
+        """
+        Returns {"embedding", "points"} on a hit. Counts a lookup; call lookup_similar next on a miss.
+        """
+        self.stats["lookups"] += 1
+        key = self._key(query_text, _scope_key(filters, topk, mode))
+        entry = self.entries.get(key)
+        if entry is not None and self._expired(entry, time.time()):
+            del self.entries[key]
+            self.stats["expired"] += 1
+            entry = None
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        self.stats["exact_hits"] += 1
+        return {"embedding": entry["embedding"], "points": _to_points(entry["points"])}
+
+    def lookup_similar(
+        self, embedding: list[float], filters: dict[str, Any], topk: int, mode: str
+    ) -> dict[str, Any] | None:
+        """
+        Second tier: nearest cached query embedding within the cosine threshold. Records a miss otherwise.
+        """
+        if self.similarity_threshold is not None:
+            scope = _scope_key(filters, topk, mode)
+            now = time.time()
+            candidates = [
+                entry for entry in self.entries.values() if entry["scope"] == scope and not self._expired(entry, now)
+            ]
+            if candidates:
+                matrix = np.asarray([entry["embedding"] for entry in candidates], dtype=np.float32)
+                query = np.asarray(embedding, dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1) * max(float(np.linalg.norm(query)), 1e-12)
+                sims = (matrix @ query) / np.maximum(norms, 1e-12)
+                best = int(np.argmax(sims))
+                if float(sims[best]) >= self.similarity_threshold:
+                    entry = candidates[best]
+                    self.entries.move_to_end(entry["key"])
+                    self.stats["semantic_hits"] += 1
+                    return {
+                        "similarity": float(sims[best]),
+                        "matched_query": entry["query"],
+                        "points": _to_points(entry["points"]),
+                    }
+        self.stats["misses"] += 1
+        return None
+
+    def put(
+        self, query_text: str, filters: dict[str, Any], topk: int, mode: str, embedding: list[float], points: list[Any]
+    ) -> None:
+        scope = _scope_key(filters, topk, mode)
+        key = self._key(query_text, scope)
+        self.entries[key] = {
+            "key": key,
+            "scope": scope,
+            "query": query_text,
+            "embedding": [float(x) for x in embedding],
+            "created_at": time.time(),
+            "points": [{"id": p.id, "score": p.score, "payload": p.payload} for p in points],
+        }
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def hit_rates(self) -> dict[str, Any]:
+        lookups = max(1, self.stats["lookups"])
+        return {
+            **self.stats,
+            "exact_hit_rate": round(self.stats["exact_hits"] / lookups, 4),
+            "semantic_hit_rate": round(self.stats["semantic_hits"] / lookups, 4),
+            "hit_rate": round((self.stats["exact_hits"] + self.stats["semantic_hits"]) / lookups, 4),
+            "similarity_threshold": self.similarity_threshold,
+            "entries": len(self.entries),
+        }
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"index_version": self.index_version, "entries": list(self.entries.values()), "stats": self.stats}
+        # Write a sibling temp file and swap it in, so a crash mid-write never leaves a truncated cache behind.
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+def _to_points(records: list[dict[str, Any]]) -> list[qm.ScoredPoint]:
+    return [qm.ScoredPoint(id=r["id"], version=0, score=r["score"], payload=r["payload"]) for r in records]
@@ -0,0 +1,110 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from qdrant_client.http import models as qm
+
+from tmp_rag_query_cache import QueryCache, normalize_query, read_index_version, write_index_version
+from tmp_rag_query_planner import FilterPlan, PlannedQuery
+from tmp_rag_query_run import query_cache_filters
+
+
+def _points():
+    return [qm.ScoredPoint(id=1, version=0, score=0.9, payload={"text": "Belbin roles", "chunk_index": 0})]
+
+
+def main():
+    all_ok = True
+
+    normalized = normalize_query("  What is   BELBIN's policy 7.3?! ")
+    print(f"[NORMALIZE] {normalized!r}")
+    all_ok &= normalized == normalize_query("what is belbin s policy 7.3")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.json"
+        cache = QueryCache(path=path, similarity_threshold=0.95)
+        miss = cache.lookup_exact("What is Belbin?", {}, 5, "hybrid")
+        all_ok &= miss is None and cache.lookup_similar([1.0, 0.0, 0.0], {}, 5, "hybrid") is None
+        cache.put("What is Belbin?", {}, 5, "hybrid", [1.0, 0.0, 0.0], _points())
+        cache.save()
+
+        reopened = QueryCache(path=path, similarity_threshold=0.95)
+        exact = reopened.lookup_exact("what is belbin", {}, 5, "hybrid")
+        print(f"[EXACT] hit={exact is not None}")
+        all_ok &= exact is not None and exact["points"][0].id == 1
+
+        reopened.lookup_exact("Explain Belbin", {}, 5, "hybrid")
+        near = reopened.lookup_similar([0.99, 0.05, 0.0], {}, 5, "hybrid")
+        reopened.lookup_exact("Explain Belbin", {"type": "RULES"}, 5, "hybrid")
+        other_scope = reopened.lookup_similar([0.99, 0.05, 0.0], {"type": "RULES"}, 5, "hybrid")
+        print(f"[SEMANTIC] hit={near is not None} other_scope_hit={other_scope is not None}")
+        all_ok &= near is not None and other_scope is None
+
+        rates = reopened.hit_rates()
+        print(f"[RATES] {rates}")
+        all_ok &= rates["lookups"] == 4 and rates["misses"] == 2 and rates["semantic_hits"] == 1
+
+        short = QueryCache(similarity_threshold=0.95, ttl_s=0.2)
+        short.put("What is Belbin?", {}, 5, "hybrid", [1.0, 0.0, 0.0], _points())
+        fresh = short.lookup_exact("What is Belbin?", {}, 5, "hybrid") is not None
+        time.sleep(0.3)
+        stale_exact = short.lookup_exact("What is Belbin?", {}, 5, "hybrid")
+        short.put("Explain Belbin", {}, 5, "hybrid", [1.0, 0.0, 0.0], _points())
+        time.sleep(0.3)
+        stale_similar = short.lookup_similar([1.0, 0.0, 0.0], {}, 5, "hybrid")
+        print(f"[TTL] fresh_hit={fresh} expired_exact={stale_exact is None} expired_similar={stale_similar is None}")
+        all_ok &= fresh and stale_exact is None and stale_similar is None and short.stats["expired"] == 1
+
+        version_path = Path(tmp) / "index_version.json"
+        first = write_index_version("docs", 10, {"chunking": {"max_chars": 800}}, version_path)
+        versioned = QueryCache(path=Path(tmp) / "versioned.json", index_version=read_index_version(version_path))
+        versioned.put("What is Belbin?", {}, 5, "hybrid", [1.0, 0.0, 0.0], _points())
+        versioned.save()
+        same = QueryCache(path=versioned.path, index_version=read_index_version(version_path))
+        kept = same.lookup_exact("What is Belbin?", {}, 5, "hybrid") is not None
+        # same points count and config: the ingest time alone makes a new version
+        second = write_index_version("docs", 10, {"chunking": {"max_chars": 800}}, version_path)
+        reingested = QueryCache(path=versioned.path, index_version=read_index_version(version_path))
+        dropped = reingested.lookup_exact("What is Belbin?", {}, 5, "hybrid") is None
+        print(f"[REINGEST] new_version={first != second} kept_same_version={kept} dropped_after_ingest={dropped}")
+        all_ok &= first != second and kept and dropped
+
+        # a save that fails mid-write leaves the previous file intact and no temp file behind
+        before = path.read_text(encoding="utf-8")
+        broken = QueryCache(path=path)
+        broken.put("What is Belbin?", {}, 5, "hybrid", [1.0, 0.0, 0.0], _points())
+        broken.entries["What is Belbin?"] = {"key": "x", "unserializable": object()}
+        try:
+            broken.save()
+            raised = False
+        except TypeError:
+            raised = True
+        intact = path.read_text(encoding="utf-8") == before
+        leftovers = [p.name for p in Path(tmp).iterdir() if p.suffix == ".tmp"]
+        print(f"[ATOMIC_SAVE] raised={raised} previous_intact={intact} leftovers={leftovers}")
+        all_ok &= raised and intact and not leftovers
+
+    # speculative retrieval merges every filter plan, so the scope covers them all
+    plans = [FilterPlan({"type": "RULES"}, 0, "rules"), FilterPlan({"type": "TEMPLATE"}, 1, "template")]
+    planned = PlannedQuery("belbin rules", {"type": "RULES"}, 5, filter_plans=plans)
+    narrowed = PlannedQuery("belbin rules", {"type": "RULES"}, 5, filter_plans=plans[:1])
+    scoped = QueryCache()
+    scoped.put(planned.query_text, query_cache_filters(planned, True), 5, "hybrid", [1.0, 0.0, 0.0], _points())
+    same_plans = scoped.lookup_exact(planned.query_text, query_cache_filters(planned, True), 5, "hybrid")
+    fewer_plans = scoped.lookup_exact(narrowed.query_text, query_cache_filters(narrowed, True), 5, "hybrid")
+    best_only = scoped.lookup_exact(planned.query_text, query_cache_filters(planned, False), 5, "hybrid")
+    print(
+        f"[PLAN_SCOPE] same_plans_hit={same_plans is not None} fewer_plans_hit={fewer_plans is not None} "
+        f"best_plan_only_hit={best_only is not None}"
+    )
+    all_ok &= same_plans is not None and fewer_plans is None and best_only is None
+
+    if all_ok:
+        print("[OK] rag query cache smoketest: 8/8 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,344 @@
 import json
-from dataclasses import dataclass, asdict
-from typing import Any
+import math
+import re
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Any, Iterable
 import sys
 
+# Written by tmp_real_ingest_qdrant.py --ingest next to ingest_config.json, counted over the whole collection.
+FILTER_STATS_PATH = Path("belbin_engine_data/ingest/filter_stats.json")
+
+# Filters matching at least this share of the collection are cheaper as post-filters:
+# an unfiltered ANN search with modest oversampling beats a filtered graph traversal.
+POST_FILTER_MIN_SELECTIVITY = 0.5
+# Unindexed fields force a payload scan on pre-filter, so post-filter already pays off at lower selectivity.
+POST_FILTER_MIN_SELECTIVITY_UNINDEXED = 0.1
+# Post-filter oversampling: fetch topk / selectivity * factor candidates, capped at topk * max.
+POST_FILTER_OVERSAMPLE = 1.5
+POST_FILTER_MAX_MULTIPLIER = 20
+
+# Planner rules live in the "planner_rules" section of the ingest config (same file as file_rules);
+# these defaults apply when the section is absent. Patterns match whole words; a trailing "*" also matches
+# longer words ("review*" -> reviews, reviewer). Higher precedence wins; by default later rules win.
+PLANNER_CONFIG_PATH = Path("belbin_engine_data/ingest/ingest_config.json")
+DEFAULT_PLANNER_RULES: list[dict[str, Any]] = [
+    {
+        "name": "decision_policy",
+        "patterns": ["decision*", "confidence"],
+        "filters": {"type": "RULES", "topic": "decision_policy"},
+    },
+    {
+        "name": "review_policy",
+        "patterns": ["severity", "review*", "critique*"],
+        "filters": {"type": "RULES", "topic": "review_policy"},
+    },
+    {"name": "template", "patterns": ["template*"], "filters": {"type": "TEMPLATE"}},
+    {
+        "name": "belbin_orchestra",
+        "patterns": ["belbin", "orchestra*"],
+        "filters": {"type": "CONCEPT", "topic": "belbin_orchestra"},
+    },
+]
+# Candidate filter plans kept per query (lowest priority values first).
+MAX_FILTER_PLANS = 3
+
+
+@dataclass
+class FilterStats:
+    """Collection payload statistics used to estimate filter selectivity."""
+
+    points: int
+    indexed_fields: list[str]
+    value_counts: dict[str, dict[str, int]]
+
+    def selectivity(self, filters: dict[str, Any]) -> float | None:
+        """
+        Estimated share of points matching all equality filters (fields assumed independent).
+        None (unknown) when a filter field has no value counts.
+        """
+        if any(key not in self.value_counts for key in filters):
+            return None
+        if self.points <= 0:
+            return 0.0
+        estimate = 1.0
+        for key, value in filters.items():
+            estimate *= self.value_counts[key].get(str(value), 0) / self.points
+        return estimate
+
+
+@dataclass
+class FilterPlan:
+    """One candidate filter set for a query; lower priority values are preferred."""
+
+    filters: dict[str, Any]
+    priority: int
+    rule: str
+
+
 @dataclass
 class PlannedQuery:
     """Represents a planned RAG query with metadata."""
+
     query_text: str
     filters: dict[str, Any]
     topk: int
+    # "none" (no filters), "pre" (filter inside the vector search) or "post" (unfiltered search, filter hits after).
+    filter_strategy: str = "none"
+    estimated_selectivity: float | None = None
+    # Candidates to fetch before post-filtering; None unless filter_strategy == "post".
+    candidate_limit: int | None = None
+    unindexed_fields: list[str] = field(default_factory=list)
+    # All candidate filter plans, best first; filters above is the first plan's filter set.
+    filter_plans: list[FilterPlan] = field(default_factory=list)
+
+
+@dataclass
+class PlannerRule:
+    name: str
+    patterns: list[str]
+    filters: dict[str, Any]
+    precedence: int
+
+
+def resolve_planner_rules(cfg: dict[str, Any]) -> list[PlannerRule]:
+    """
+    Validate the "planner_rules" section of an ingest config (defaults when absent).
+    """
+    rules = []
+    for position, raw in enumerate(cfg.get("planner_rules", DEFAULT_PLANNER_RULES)):
+        patterns = [" ".join(str(p).lower().split()) for p in raw.get("patterns", [])]
+        if not raw.get("name") or not patterns or not raw.get("filters"):
+            raise ValueError(f"Planner rule {position} needs name, patterns and filters: {raw}")
+        rules.append(PlannerRule(raw["name"], patterns, dict(raw["filters"]), int(raw.get("precedence", position))))
+    return rules
+
+
+def _trie_pattern(node: dict[str, Any]) -> str:
+    # "" marks the end of a pattern: True for prefix patterns ("word*"), False for whole words.
+    branches = [
+        (r"\s+" if char == " " else re.escape(char)) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char != ""
+    ]
+    if node.get("") is True:
+        return "(?:" + "|".join([*branches, r"\w*"]) + ")"
+    if not branches:
+        return ""
+    group = "(?:" + "|".join(branches) + ")"
+    return group + "?" if "" in node else group
+
+
+_WORD_ENDS = re.compile(r"\w\b")
 
 
-def plan_query(user_input: str) -> PlannedQuery:
+class RuleMatcher:
+    """
+    All rule patterns compiled into one trie-shaped regex with word boundaries, so a query is scanned once
+    regardless of the number of rules. The regex is a lookahead: every word where a pattern starts is a match,
+    and every word-boundary prefix of that match is looked up too, so nested and overlapping patterns
+    ("belbin" inside "belbin orchestra") all report their rules.
+    """
+
+    def __init__(self, rules: list[PlannerRule]) -> None:
+        self.rules = rules
+        self._exact: dict[str, list[int]] = {}
+        self._prefix: dict[str, list[int]] = {}
+        trie: dict[str, Any] = {}
+        for idx, rule in enumerate(rules):
+            for pattern in rule.patterns:
+                is_prefix = pattern.endswith("*")
+                word = pattern.rstrip("*")
+                (self._prefix if is_prefix else self._exact).setdefault(word, []).append(idx)
+                node = trie
+                for char in word:
+                    node = node.setdefault(char, {})
+                node[""] = node.get("") is True or is_prefix
+        self._regex = re.compile(r"\b(?=(" + _trie_pattern(trie) + r")\b)") if trie else None
+
+    def _rules_for(self, matched: str) -> set[int]:
+        hits = set(self._exact.get(matched, []))
+        for end in range(len(matched), 0, -1):
+            hits.update(self._prefix.get(matched[:end], []))
+        return hits
+
+    def match(self, text: str) -> list[PlannerRule]:
+        """Matching rules, highest precedence first."""
+        if self._regex is None:
+            return []
+        normalized = " ".join(text.lower().split())
+        hits: set[int] = set()
+        for m in self._regex.finditer(normalized):
+            longest = m.group(1)
+            for end in _WORD_ENDS.finditer(longest):
+                hits |= self._rules_for(longest[: end.end()])
+        return sorted((self.rules[idx] for idx in hits), key=lambda rule: rule.precedence, reverse=True)
+
+
+_matcher_cache: dict[Path, tuple[float | None, RuleMatcher]] = {}
+
+
+def load_rule_matcher(path: Path = PLANNER_CONFIG_PATH) -> RuleMatcher:
+    """Compiled planner rules; recompiled only when the config file changes (hot reload)."""
+    try:
+        mtime: float | None = path.stat().st_mtime
+    except FileNotFoundError:
+        mtime = None
+    cached = _matcher_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    cfg = json.loads(path.read_text(encoding="utf-8")) if mtime is not None else {}
+    matcher = RuleMatcher(resolve_planner_rules(cfg))
+    _matcher_cache[path] = (mtime, matcher)
+    return matcher
+
+
+def planner_filter_fields(cfg: dict[str, Any]) -> list[str]:
+    """Payload fields the planner rules filter on."""
+    return sorted({key for rule in resolve_planner_rules(cfg) for key in rule.filters})
+
+
+def build_filter_stats(
+    payloads: Iterable[dict[str, Any]], indexed_fields: list[str], counted_fields: Iterable[str] = ()
+) -> FilterStats:
+    """Value counts of the indexed fields plus `counted_fields` (e.g. unindexed fields the planner rules use)."""
+    fields = list(dict.fromkeys([*indexed_fields, *counted_fields]))
+    value_counts: dict[str, dict[str, int]] = {key: {} for key in fields}
+    points = 0
+    for payload in payloads:
+        points += 1
+        for key in fields:
+            value = payload.get(key)
+            if value is None:
+                continue
+            counts = value_counts[key]
+            counts[str(value)] = counts.get(str(value), 0) + 1
+    return FilterStats(points=points, indexed_fields=list(indexed_fields), value_counts=value_counts)
+
+
+def collection_filter_stats(
+    client: Any, collection: str, indexed_fields: list[str], counted_fields: Iterable[str] = (), batch_size: int = 1024
+) -> FilterStats:
+    """
+    Stats over every point in the collection (payload-only scroll of the counted fields), so a partial
+    re-ingest cannot replace corpus-wide counts with the counts of the files it touched.
+    """
+    fields = list(dict.fromkeys([*indexed_fields, *counted_fields]))
+
+    def payloads() -> Iterable[dict[str, Any]]:
+        offset = None
+        while True:
+            records, offset = client.scroll(
+                collection_name=collection, limit=batch_size, offset=offset, with_payload=fields, with_vectors=False
+            )
+            for record in records:
+                yield record.payload or {}
+            if offset is None:
+                return
+
+    return build_filter_stats(payloads(), indexed_fields, fields)
+
+
+def save_filter_stats(stats: FilterStats, path: Path = FILTER_STATS_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(asdict(stats), indent=2), encoding="utf-8")
+
+
+_stats_cache: dict[Path, tuple[float, FilterStats]] = {}
+
+
+def load_filter_stats(path: Path = FILTER_STATS_PATH) -> FilterStats | None:
+    """Load stats written at ingest time; re-read only when the file changes. None if absent."""
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    cached = _stats_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    stats = FilterStats(**json.loads(path.read_text(encoding="utf-8")))
+    _stats_cache[path] = (mtime, stats)
+    return stats
+
+
+def choose_filter_strategy(planned: PlannedQuery, stats: FilterStats | None) -> PlannedQuery:
+    """
+    Pick pre- vs post-filtering from index coverage and estimated selectivity.
+    Without stats, or when the selectivity of a filter field is unknown, filters stay pre-filters.
+    """
+    if not planned.filters:
+        planned.filter_strategy = "none"
+        return planned
+
+    planned.filter_strategy = "pre"
+    if stats is None:
+        return planned
+
+    planned.unindexed_fields = [key for key in planned.filters if key not in stats.indexed_fields]
+    selectivity = stats.selectivity(planned.filters)
+    if selectivity is None:
+        return planned
+    planned.estimated_selectivity = round(selectivity, 4)
+    threshold = POST_FILTER_MIN_SELECTIVITY_UNINDEXED if planned.unindexed_fields else POST_FILTER_MIN_SELECTIVITY
+    if selectivity >= threshold:
+        planned.filter_strategy = "post"
+        planned.candidate_limit = min(
+            math.ceil(planned.topk / selectivity * POST_FILTER_OVERSAMPLE),
+            planned.topk * POST_FILTER_MAX_MULTIPLIER,
+        )
+    return planned
+
+
+def matches_filters(payload: dict[str, Any] | None, filters: dict[str, Any]) -> bool:
+    payload = payload or {}
+    return all(payload.get(key) == value for key, value in filters.items())
+
+
+def variant_queries(planned: PlannedQuery, stats: FilterStats | None = None) -> list[PlannedQuery]:
+    """
+    One PlannedQuery per candidate filter plan (best first), each with its own pre/post strategy.
+    """
+    stats = stats if stats is not None else load_filter_stats()
+    variants = []
+    for plan in planned.filter_plans:
+        variant = PlannedQuery(planned.query_text, dict(plan.filters), planned.topk, filter_plans=[plan])
+        variants.append(choose_filter_strategy(variant, stats))
+    return variants
+
+
+def plan_query(user_input: str, stats: FilterStats | None = None, matcher: RuleMatcher | None = None) -> PlannedQuery:
     """
     Plan a RAG query from user input.
-    
+
     Args:
         user_input: The raw user query string
-        
+        stats: Payload statistics for filter planning; defaults to FILTER_STATS_PATH when present
+        matcher: Compiled keyword rules; defaults to the planner_rules of PLANNER_CONFIG_PATH
+
     Returns:
         PlannedQuery with planning details
     """
-    text = user_input.lower()
-    filters: dict[str, Any] = {}
-
-    if "decision" in text or "confidence" in text:
-        filters["type"] = "RULES"
-        filters["topic"] = "decision_policy"
-    if "severity" in text or "review" in text or "critique" in text:
-        filters["type"] = "RULES"
-        filters["topic"] = "review_policy"
-    if "template" in text:
-        filters["type"] = "TEMPLATE"
-    if "belbin" in text or "orchestra" in text:
-        filters["type"] = "CONCEPT"
-        filters["topic"] = "belbin_orchestra"
-
-    return PlannedQuery(
+    matched = (matcher or load_rule_matcher()).match(user_input)
+    filter_plans = [
+        FilterPlan(filters=dict(rule.filters), priority=priority, rule=rule.name)
+        for priority, rule in enumerate(matched)
+    ][:MAX_FILTER_PLANS]
+
+    planned = PlannedQuery(
         query_text=user_input,
-        filters=filters,
-        topk=5
+        filters=dict(filter_plans[0].filters) if filter_plans else {},
+        topk=5,
+        filter_plans=filter_plans,
     )
+    return choose_filter_strategy(planned, stats if stats is not None else load_filter_stats())
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python tmp_rag_query_planner.py '<query>'")
         sys.exit(1)
-    
+
     user_query = sys.argv[1]
     planned = plan_query(user_query)
-    
+
     print(json.dumps(asdict(planned), indent=2))
@@ -1,59 +1,265 @@
 import asyncio
+import functools
 import json
+import os
 import sys
-from qdrant_client import QdrantClient
+from dataclasses import replace
+from pathlib import Path
 from qdrant_client.http import models as qm
 from beeai_framework.adapters.gemini.backend.embedding import GeminiEmbeddingModel
-from tmp_rag_query_planner import plan_query
+from tmp_rag_query_cache import QUERY_CACHE_PATH, QUERY_CACHE_TTL_S, QueryCache, read_index_version
+from tmp_rag_query_planner import matches_filters, plan_query, variant_queries
+from tmp_rag_chunk_merge import merge_adjacent_chunks
+from tmp_rag_local_index import open_client
 from tmp_rag_prompt_wrapper import build_prompt
+from tmp_rag_quantization import load_quantization_settings, quantization_search_params
+from tmp_rag_sparse import encode_query, has_sparse_vector, hybrid_query_points
+
+COLLECTION = "belbin_rag_v1"
+
+# Filtered hits scoring below this (dense cosine) do not count; missing hits are filled from the unfiltered search.
+# Hybrid search returns rank-based RRF scores, so there only the hit count triggers the fallback.
+FILTER_FALLBACK_SCORE_THRESHOLD = 0.35
+
+
+@functools.cache
+def default_search_params() -> qm.SearchParams | None:
+    """
+    Rescoring/oversampling for quantized collections (ingest_config.json "quantization"), read once per process;
+    restart after changing the quantization config.
+    """
+    return quantization_search_params(load_quantization_settings())
+
+
+def search_points(client, embedding, query_text, query_filter, limit, hybrid):
+    search_params = default_search_params()
+    if hybrid:
+        return hybrid_query_points(
+            client,
+            collection_name=COLLECTION,
+            dense=embedding,
+            sparse=encode_query(query_text),
+            query_filter=query_filter,
+            limit=limit,
+            search_params=search_params,
+        ).points
+    return client.query_points(
+        collection_name=COLLECTION,
+        query=embedding,
+        query_filter=query_filter,
+        limit=limit,
+        search_params=search_params,
+    ).points
+
+
+def retrieve(client, planned, embedding, query_filter, hybrid):
+    """
+    Run the search with the planner's filter strategy. Post-filtering searches unfiltered with
+    oversampling and drops non-matching hits; if too few survive it falls back to a pre-filtered search.
+    """
+    if planned.filter_strategy != "post":
+        return search_points(client, embedding, planned.query_text, query_filter, planned.topk, hybrid)
+
+    candidates = search_points(client, embedding, planned.query_text, None, planned.candidate_limit, hybrid)
+    points = [p for p in candidates if matches_filters(p.payload, planned.filters)][: planned.topk]
+    if len(points) < planned.topk:
+        print(f"Post-filter kept {len(points)}/{planned.topk}; falling back to pre-filter")
+        return search_points(client, embedding, planned.query_text, query_filter, planned.topk, hybrid)
+    return points
+
+
+def merge_speculative_hits(filtered_hits, fallback_hits, topk, score_threshold):
+    """
+    Merge hits of the candidate filter plans (best plan first): drop hits below score_threshold, dedupe by
+    point id keeping the best score, rank by score (plan priority breaks ties), then top up from fallback_hits.
+    """
+    best = {}
+    for priority, hits in enumerate(filtered_hits):
+        for hit in hits:
+            if score_threshold is not None and hit.score < score_threshold:
+                continue
+            if hit.id not in best or hit.score > best[hit.id][1].score:
+                best[hit.id] = (priority, hit)
+    ranked = sorted(best.values(), key=lambda item: (-item[1].score, item[0]))
+    merged = [hit for _, hit in ranked][:topk]
+    seen = {hit.id for hit in merged}
+    for hit in fallback_hits:
+        if len(merged) >= topk:
+            break
+        if hit.id not in seen:
+            merged.append(hit)
+            seen.add(hit.id)
+    return merged
+
+
+async def retrieve_speculative(
+    client,
+    planned,
+    embedding,
+    hybrid,
+    score_threshold=FILTER_FALLBACK_SCORE_THRESHOLD,
+    stats=None,
+    run_blocking=asyncio.to_thread,
+):
+    """
+    Run every candidate filter plan and an unfiltered search concurrently, then merge (merge_speculative_hits).
+    The unfiltered search is the fallback for too-narrow filters, without a serial retry-on-empty round-trip.
+    stats overrides the filter stats file for the per-plan pre/post choice. run_blocking(fn, *args) runs each
+    search off the event loop (default: asyncio.to_thread; the pipeline service passes its bounded executor).
+    """
+    variants = variant_queries(planned, stats)
+    if not variants:
+        return await run_blocking(retrieve, client, planned, embedding, None, hybrid)
+
+    unfiltered = replace(planned, filters={}, filter_strategy="none", candidate_limit=None, filter_plans=[])
+    searches = [
+        run_blocking(retrieve, client, variant, embedding, build_query_filter(variant.filters), hybrid)
+        for variant in variants
+    ]
+    searches.append(run_blocking(retrieve, client, unfiltered, embedding, None, hybrid))
+    *filtered_hits, fallback_hits = await asyncio.gather(*searches)
+    threshold = None if hybrid else score_threshold
+    return merge_speculative_hits(filtered_hits, fallback_hits, planned.topk, threshold)
+
+
+def query_cache_filters(planned, speculative):
+    """
+    Filters that scope a query cache entry. A speculative search merges hits from every candidate filter plan,
+    so its entry is keyed on all plans' filters, not just the best one.
+    """
+    if speculative and len(planned.filter_plans) > 1:
+        return {"plans": [plan.filters for plan in planned.filter_plans]}
+    return planned.filters
+
+
+def speculative_filters_enabled():
+    # RAG_SPECULATIVE_FILTERS=0 searches with the best filter plan only (no concurrent variants or fallback).
+    return os.getenv("RAG_SPECULATIVE_FILTERS", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def build_query_filter(filters):
+    if not filters:
+        return None
+    conditions = [qm.FieldCondition(key=field, match=qm.MatchValue(value=value)) for field, value in filters.items()]
+    return qm.Filter(must=conditions)
+
+
+def points_to_chunks(points):
+    retrieved_chunks = []
+    for point in points:
+        payload = point.payload
+        retrieved_chunks.append(
+            {
+                "point_id": str(point.id),
+                "score": point.score,
+                "source_file": payload.get("source_file"),
+                "type": payload.get("type"),
+                "topic": payload.get("topic"),
+                "chunk_index": payload.get("chunk_index"),
+                "text": payload.get("text"),
+            }
+        )
+    return retrieved_chunks
+
+
+def merge_adjacent_enabled():
+    # RAG_MERGE_ADJACENT=0 disables stitching of neighbouring windows.
+    return os.getenv("RAG_MERGE_ADJACENT", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def prompt_token_budget():
+    # RAG_PROMPT_TOKEN_BUDGET caps the whole prompt (MMR selection, overlap removal, sentence trimming).
+    token_budget = os.getenv("RAG_PROMPT_TOKEN_BUDGET")
+    return int(token_budget) if token_budget else None
+
+
+def open_query_cache():
+    """
+    RAG_QUERY_CACHE=1 enables the persistent retrieval cache; RAG_QUERY_CACHE_SIMILARITY (e.g. 0.95)
+    enables the near-duplicate embedding tier. RAG_QUERY_CACHE_TTL_S overrides the entry lifetime (0 = no expiry).
+    Entries saved before the last ingest are dropped.
+    """
+    if os.getenv("RAG_QUERY_CACHE", "").strip().lower() not in {"1", "true", "yes", "on"}:
+        return None
+    threshold = os.getenv("RAG_QUERY_CACHE_SIMILARITY")
+    ttl_s = float(os.getenv("RAG_QUERY_CACHE_TTL_S", str(QUERY_CACHE_TTL_S)))
+    return QueryCache(
+        path=Path(os.getenv("RAG_QUERY_CACHE_PATH", str(QUERY_CACHE_PATH))),
+        similarity_threshold=float(threshold) if threshold else None,
+        ttl_s=ttl_s or None,
+        index_version=read_index_version(),
+    )
+
 
 async def main_async():
     if len(sys.argv) < 2:
         print("Usage: python tmp_rag_query_run.py '<query>'")
         sys.exit(1)
-    
+
     user_input = sys.argv[1]
-    
+
     # Plan the query
     planned = plan_query(user_input)
     print(f"Planned Query:")
     print(f"  query_text: {planned.query_text}")
     print(f"  filters: {planned.filters}")
+    if len(planned.filter_plans) > 1:
+        print(f"  filter_plans: {[plan.rule for plan in planned.filter_plans]}")
     print(f"  topk: {planned.topk}")
+    print(f"  filter_strategy: {planned.filter_strategy}")
+    if planned.estimated_selectivity is not None:
+        print(f"  estimated_selectivity: {planned.estimated_selectivity}")
     print()
-    
-    # Create Gemini embedding
-    model = GeminiEmbeddingModel(model_id="text-embedding-004")
-    run = model.create([planned.query_text])
-    result = await run.handler()
-    embedding = result.embeddings[0]
-    
+
+    # RAG_RETRIEVAL_MODE=dense forces the old dense-only search; hybrid is used whenever
+    # the collection carries the BM25 sparse vector.
+    requested_mode = os.getenv("RAG_RETRIEVAL_MODE", "hybrid").strip().lower()
+    cache = open_query_cache()
+    speculative = speculative_filters_enabled()
+    scope = (query_cache_filters(planned, speculative), planned.topk, requested_mode)
+    cached = cache.lookup_exact(planned.query_text, *scope) if cache else None
+
+    if cached:
+        embedding = cached["embedding"]
+    else:
+        # Create Gemini embedding
+        model = GeminiEmbeddingModel(model_id="text-embedding-004")
+        run = model.create([planned.query_text])
+        result = await run.handler()
+        embedding = result.embeddings[0]
+        if cache:
+            cached = cache.lookup_similar(embedding, *scope)
+            if cached:
+                print(f"Query cache: near-duplicate of {cached['matched_query']!r} (cos={cached['similarity']:.4f})")
+
     # Build Qdrant filter
-    query_filter = None
-    if planned.filters:
-        conditions = []
-        for field, value in planned.filters.items():
-            conditions.append(
-                qm.FieldCondition(
-                    key=field,
-                    match=qm.MatchValue(value=value)
-                )
-            )
-        query_filter = qm.Filter(must=conditions)
-    
-    # Query Qdrant
-    client = QdrantClient(url="http://localhost:6333")
+    query_filter = build_query_filter(planned.filters)
+
+    # Query Qdrant (or the local memory-mapped index when RAG_BACKEND=local)
+    client = open_client("http://localhost:6333")
     try:
-        results = client.query_points(
-            collection_name="belbin_rag_v1",
-            query=embedding,
-            query_filter=query_filter,
-            limit=planned.topk
-        )
-        
+        if cached:
+            points = cached["points"]
+            print("Retrieval mode: cached")
+            if cache and "similarity" in cached:
+                # Remember this phrasing too, so the next identical query is an exact hit.
+                cache.put(planned.query_text, *scope, embedding, points)
+        else:
+            hybrid = requested_mode != "dense" and has_sparse_vector(client, COLLECTION)
+            if speculative:
+                points = await retrieve_speculative(client, planned, embedding, hybrid)
+            else:
+                points = retrieve(client, planned, embedding, query_filter, hybrid)
+            print(f"Retrieval mode: {'hybrid (dense + bm25, rrf)' if hybrid else 'dense'}")
+            if cache:
+                cache.put(planned.query_text, *scope, embedding, points)
+        if cache:
+            cache.save()
+            print(f"Query cache: {json.dumps(cache.hit_rates())}")
+
         # Print results
         print("Results:")
-        for point in results.points:
+        for point in points:
             payload = point.payload
             snippet = payload.get("text", "")[:200]
             print(f"  Score: {point.score}")
@@ -64,21 +270,16 @@ async def main_async():
             print(f"  Snippet: {snippet}")
             print()
 
-        retrieved_chunks = []
-        for point in results.points:
-            payload = point.payload
-            retrieved_chunks.append(
-                {
-                    "score": point.score,
-                    "source_file": payload.get("source_file"),
-                    "type": payload.get("type"),
-                    "topic": payload.get("topic"),
-                    "chunk_index": payload.get("chunk_index"),
-                    "text": payload.get("text"),
-                }
-            )
-
-        prompt_payload = build_prompt(user_input, retrieved_chunks)
+        retrieved_chunks = points_to_chunks(points)
+
+        # Stitch neighbouring windows of the same file.
+        if merge_adjacent_enabled():
+            merged_chunks = merge_adjacent_chunks(retrieved_chunks)
+            if len(merged_chunks) < len(retrieved_chunks):
+                print(f"Merged adjacent chunks: {len(retrieved_chunks)} -> {len(merged_chunks)}")
+            retrieved_chunks = merged_chunks
+
+        prompt_payload = build_prompt(user_input, retrieved_chunks, token_budget=prompt_token_budget())
         print("=== PROMPT PAYLOAD ===")
         print(json.dumps(prompt_payload, indent=2))
     except Exception as e:
@@ -0,0 +1,118 @@
+import re
+import zlib
+from collections import Counter
+from typing import Any, Iterable
+
+from qdrant_client.http import models as qm
+
+# Named sparse vector stored next to the (unnamed) dense vector.
+SPARSE_VECTOR_NAME = "bm25"
+
+# BM25 document-side parameters. IDF is applied server-side by Qdrant
+# (SparseVectorParams(modifier=IDF)), so only the saturated term frequency is stored.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Reciprocal rank fusion constant (Cormack et al.); 60 is the usual default.
+RRF_K = 60
+
+# Each sub-search fetches this many candidates per requested result before fusion.
+PREFETCH_MULTIPLIER = 4
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[._-][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercase lexical tokenizer that keeps identifiers like "v1.2" or "policy-7" intact.
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+def token_index(token: str) -> int:
+    # Stable across processes (unlike hash()), so ingest and query agree on indices.
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def average_doc_length(texts: Iterable[str]) -> float:
+    lengths = [len(tokenize(text)) for text in texts]
+    if not lengths:
+        return 1.0
+    return max(1.0, sum(lengths) / len(lengths))
+
+
+def encode_document(text: str, avgdl: float) -> qm.SparseVector:
+    """
+    BM25 document vector: saturated, length-normalized term frequencies keyed by token index.
+    """
+    tokens = tokenize(text)
+    counts = _count_by_index(tokens)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / max(avgdl, 1.0))
+    indices = sorted(counts)
+    values = [counts[i] * (BM25_K1 + 1) / (counts[i] + norm) for i in indices]
+    return qm.SparseVector(indices=indices, values=values)
+
+
+def encode_query(text: str) -> qm.SparseVector:
+    """
+    BM25 query vector: each distinct query term contributes once.
+    """
+    indices = sorted(_count_by_index(tokenize(text)))
+    return qm.SparseVector(indices=indices, values=[1.0] * len(indices))
+
+
+def _count_by_index(tokens: list[str]) -> Counter[int]:
+    return Counter(token_index(token) for token in tokens)
+
+
+def has_sparse_vector(client: Any, collection: str, name: str = SPARSE_VECTOR_NAME) -> bool:
+    info = client.get_collection(collection_name=collection)
+    sparse = info.config.params.sparse_vectors or {}
+    return name in sparse
+
+
+def hybrid_query_points(
+    client: Any,
+    collection_name: str,
+    dense: list[float],
+    sparse: qm.SparseVector,
+    query_filter: qm.Filter | None,
+    limit: int,
+    sparse_name: str = SPARSE_VECTOR_NAME,
+    search_params: qm.SearchParams | None = None,
+) -> Any:
+    """
+    Dense + sparse retrieval fused server-side with Qdrant prefetch + RRF.
+    Returns the same QueryResponse shape as a dense-only client.query_points call.
+    search_params (e.g. quantization rescoring) apply to the dense prefetch only.
+    """
+    prefetch_limit = max(limit * PREFETCH_MULTIPLIER, limit)
+    return client.query_points(
+        collection_name=collection_name,
+        prefetch=[
+            qm.Prefetch(query=dense, filter=query_filter, limit=prefetch_limit, params=search_params),
+            qm.Prefetch(query=sparse, using=sparse_name, filter=query_filter, limit=prefetch_limit),
+        ],
+        query=qm.FusionQuery(fusion=qm.Fusion.RRF),
+        limit=limit,
+        with_payload=True,
+    )
+
+
+def reciprocal_rank_fusion(result_lists: list[list[Any]], limit: int, k: int = RRF_K) -> list[qm.ScoredPoint]:
+    """
+    Local RRF over ranked lists of ScoredPoint-like hits (anything with .id and .payload).
+    Used when the backend cannot fuse server-side. Returned scores are RRF scores.
+    """
+    scores: dict[Any, float] = {}
+    first_seen: dict[Any, Any] = {}
+    for hits in result_lists:
+        for rank, hit in enumerate(hits, start=1):
+            scores[hit.id] = scores.get(hit.id, 0.0) + 1.0 / (k + rank)
+            first_seen.setdefault(hit.id, hit)
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [
+        qm.ScoredPoint(id=point_id, version=0, score=score, payload=first_seen[point_id].payload)
+        for point_id, score in ranked
+    ]
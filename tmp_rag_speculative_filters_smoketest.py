@@ -0,0 +1,84 @@
+import asyncio
+import sys
+import tempfile
+
+from qdrant_client.http import models as qm
+
+from beeai_framework_starter.helpers.fake_embedding_model import FakeEmbeddingModel
+from tmp_rag_local_index import LocalVectorIndex
+from tmp_rag_query_planner import plan_query
+import tmp_rag_query_run
+from tmp_rag_query_run import COLLECTION, merge_speculative_hits, retrieve_speculative
+
+DOCS = [
+    ("TEMPLATE", None, "Decision template: record the decision, owner and confidence."),
+    ("TEMPLATE", None, "Review template: list findings by severity."),
+    ("CONCEPT", "belbin_orchestra", "The Belbin orchestra assigns roles to agents."),
+    ("CONCEPT", "other", "Glossary of terms used across the project."),
+]
+
+
+def _hit(point_id, score):
+    return qm.ScoredPoint(id=point_id, version=0, score=score, payload={})
+
+
+def main():
+    all_ok = True
+
+    planned = plan_query("belbin decision template")
+    rules = [plan.rule for plan in planned.filter_plans]
+    print(f"[PLANS] rules={rules} filters={planned.filters}")
+    all_ok &= rules == ["belbin_orchestra", "template", "decision_policy"]
+    all_ok &= planned.filters == {"type": "CONCEPT", "topic": "belbin_orchestra"}
+
+    merged = merge_speculative_hits(
+        [[_hit(1, 0.9), _hit(2, 0.2)], [_hit(1, 0.8), _hit(3, 0.7)]], [_hit(4, 0.6), _hit(3, 0.5)], 3, 0.35
+    )
+    print(f"[MERGE] ids={[h.id for h in merged]} scores={[h.score for h in merged]}")
+    all_ok &= [h.id for h in merged] == [1, 3, 4] and merged[0].score == 0.9
+
+    embedder = FakeEmbeddingModel(dim=32)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = LocalVectorIndex(tmp)
+        index.create_collection(COLLECTION, vectors_config=qm.VectorParams(size=32, distance=qm.Distance.COSINE))
+        index.upsert(
+            COLLECTION,
+            [
+                qm.PointStruct(id=i, vector=embedder.embed(text), payload={"type": t, "topic": topic, "text": text})
+                for i, (t, topic, text) in enumerate(DOCS)
+            ],
+        )
+
+        loads = 0
+        load_settings = tmp_rag_query_run.load_quantization_settings
+
+        def _counting_load():
+            nonlocal loads
+            loads += 1
+            return load_settings()
+
+        tmp_rag_query_run.load_quantization_settings = _counting_load
+        tmp_rag_query_run.default_search_params.cache_clear()
+        try:
+            # No decision_policy RULES exist: the template plan and the unfiltered fallback still fill the results.
+            planned = plan_query("decision confidence template")
+            embedding = embedder.embed(planned.query_text)
+            points = asyncio.run(retrieve_speculative(index, planned, embedding, hybrid=False))
+            print(f"[SPECULATIVE] ids={[p.id for p in points]} top_type={points[0].payload['type']}")
+            all_ok &= points[0].id == 0 and len(points) == min(planned.topk, len(DOCS))
+
+            asyncio.run(retrieve_speculative(index, planned, embedding, hybrid=False))
+            print(f"[SETTINGS_ONCE] searches={2 * (len(planned.filter_plans) + 1)} config_reads={loads}")
+            all_ok &= loads == 1
+        finally:
+            tmp_rag_query_run.load_quantization_settings = load_settings
+            tmp_rag_query_run.default_search_params.cache_clear()
+
+    if all_ok:
+        print("[OK] rag speculative filters smoketest: 4/4 passed")
+        sys.exit(0)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,19 +4,49 @@ import hashlib
 import json
 import uuid
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
 
 from beeai_framework.adapters.gemini.backend.embedding import GeminiEmbeddingModel
-from qdrant_client import QdrantClient
 from qdrant_client.http import models as qm
 
+from tmp_rag_local_index import open_client
+from tmp_rag_quantization import (
+    QUANTIZATION_MODES,
+    apply_quantization,
+    build_quantization_config,
+    compare_quantization,
+    originals_on_disk,
+    quantization_search_params,
+    resolve_quantization,
+)
+from tmp_rag_query_cache import write_index_version
+from tmp_rag_query_planner import (
+    FILTER_STATS_PATH,
+    collection_filter_stats,
+    planner_filter_fields,
+    save_filter_stats,
+)
+from tmp_rag_sparse import (
+    SPARSE_VECTOR_NAME,
+    average_doc_length,
+    encode_document,
+    encode_query,
+    has_sparse_vector,
+    hybrid_query_points,
+)
+
 # paths
 INGEST_DIR = Path("belbin_engine_data/ingest/seed")
 CONFIG_PATH = Path("belbin_engine_data/ingest/ingest_config.json")
+EVAL_QUERIES_PATH = Path("belbin_engine_data/eval/queries.jsonl")
 
 EXPECTED_DIM = 768
 MODEL_ID = "text-embedding-004"
 
+# Payload fields used in equality filters (planner, --type/--topic/--source_file).
+# Overridable via "filterable_fields" in ingest_config.json.
+DEFAULT_FILTERABLE_FIELDS = ["type", "topic", "source_file"]
+
 
 def chunk_text(text: str, max_chars: int, overlap: int) -> List[str]:
     chunks = []
@@ -54,7 +84,7 @@ def stable_point_id(filename: str, chunk_index: int, text: str) -> str:
     return str(uuid.UUID(h[:32]))
 
 
-async def embed_text(model: GeminiEmbeddingModel, text: str) -> List[float]:
+async def embed_text(model: Any, text: str) -> List[float]:
     run = model.create([text])
     out = await run.handler()  # handler itself is a coroutine returning the output
     vec = out.embeddings[0]
@@ -63,6 +93,109 @@ async def embed_text(model: GeminiEmbeddingModel, text: str) -> List[float]:
     return vec
 
 
+def ensure_collection(client: Any, collection: str, quantization: Dict) -> bool:
+    """
+    Create the collection (dense + BM25 sparse, optionally quantized) if it does not exist yet.
+    Returns True when the collection can store sparse vectors.
+    """
+    if not client.collection_exists(collection_name=collection):
+        client.create_collection(
+            collection_name=collection,
+            vectors_config=qm.VectorParams(
+                size=EXPECTED_DIM, distance=qm.Distance.COSINE, on_disk=originals_on_disk(quantization)
+            ),
+            sparse_vectors_config={SPARSE_VECTOR_NAME: qm.SparseVectorParams(modifier=qm.Modifier.IDF)},
+            quantization_config=build_quantization_config(quantization),
+        )
+    return has_sparse_vector(client, collection)
+
+
+def load_eval_queries(path: Path) -> List[str]:
+    """
+    Eval query set: JSONL with at least a "query" field per line.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Missing eval query set: {path}")
+    queries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            queries.append(json.loads(line)["query"])
+    return queries
+
+
+def ensure_payload_indexes(client: Any, collection: str, fields: List[str]) -> List[str]:
+    """
+    Create keyword payload indexes for filterable fields that are not indexed yet.
+    Returns the newly created field names.
+    """
+    info = client.get_collection(collection_name=collection)
+    existing = set((getattr(info, "payload_schema", None) or {}).keys())
+    created = []
+    for field in fields:
+        if field in existing:
+            continue
+        client.create_payload_index(
+            collection_name=collection,
+            field_name=field,
+            field_schema=qm.PayloadSchemaType.KEYWORD,
+            wait=True,
+        )
+        created.append(field)
+    return created
+
+
+async def ingest_files(
+    client: Any,
+    collection: str,
+    files: List[Path],
+    embedding_model: Any,
+    *,
+    max_chars: int,
+    overlap: int,
+    rules: List[Dict],
+    source_type: str,
+    language: str,
+    sparse_enabled: bool,
+) -> Tuple[List[Dict], int]:
+    """
+    Chunk, embed and upsert files. Returns the ingested payloads and the number of chunks.
+    """
+    # BM25 length normalization needs the corpus-wide average chunk length, so chunk everything first.
+    chunked_files = [(p, chunk_text(p.read_text(encoding="utf-8"), max_chars, overlap)) for p in files]
+    avgdl = average_doc_length(chunk for _, chunks in chunked_files for chunk in chunks)
+
+    ingested_payloads: List[Dict] = []
+    total_chunks = 0
+    for p, chunks in chunked_files:
+        file_type, topic = match_file_rule(p.name, rules)
+
+        points: List[qm.PointStruct] = []
+        for idx, chunk in enumerate(chunks):
+            vec = await embed_text(embedding_model, chunk)
+            payload = {
+                "type": file_type,
+                "topic": topic,
+                "source_file": p.name,
+                "chunk_index": idx,
+                "source_type": source_type,
+                "language": language,
+                "text": chunk,
+            }
+            point_id = stable_point_id(p.name, idx, chunk)
+            vector: qm.VectorStruct = vec
+            if sparse_enabled:
+                vector = {"": vec, SPARSE_VECTOR_NAME: encode_document(chunk, avgdl)}
+            points.append(qm.PointStruct(id=point_id, vector=vector, payload=payload))
+
+        if points:
+            client.upsert(collection_name=collection, points=points)
+            ingested_payloads.extend(point.payload or {} for point in points)
+
+        total_chunks += len(chunks)
+        print(f"- {p.name}: {len(chunks)} chunks")
+    return ingested_payloads, total_chunks
+
+
 async def main_async() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--ingest", action="store_true")
@@ -72,6 +205,19 @@ async def main_async() -> None:
     parser.add_argument("--topic")
     parser.add_argument("--source_file")
     parser.add_argument("--count_only", action="store_true")
+    parser.add_argument("--dense_only", action="store_true", help="Skip sparse vectors and RRF fusion.")
+    parser.add_argument(
+        "--quantization", choices=QUANTIZATION_MODES, help="Override quantization.mode from ingest config."
+    )
+    parser.add_argument(
+        "--requantize", action="store_true", help="Apply the quantization settings to an existing collection."
+    )
+    parser.add_argument(
+        "--compare_quantization",
+        action="store_true",
+        help="Report recall@k and latency of quantized vs exact float32 search over the eval query set.",
+    )
+    parser.add_argument("--eval_queries", default=str(EVAL_QUERIES_PATH))
     args = parser.parse_args()
 
     cfg = load_config()
@@ -90,37 +236,33 @@ async def main_async() -> None:
     language = metadata_defaults.get("language", "UNKNOWN")
 
     rules = resolve_file_rules(cfg)
+    filterable_fields = cfg.get("filterable_fields", DEFAULT_FILTERABLE_FIELDS)
+    quantization = resolve_quantization(cfg)
+    if args.quantization:
+        quantization["mode"] = args.quantization
 
-    client = QdrantClient(url="http://localhost:6333")
+    # RAG_BACKEND=local ingests into the in-process memory-mapped index instead of Qdrant.
+    client = open_client("http://localhost:6333")
 
     total_chunks = 0
     total_points = 0
 
     print("REAL INGEST -> QDRANT")
     print(f"collection: {collection}")
+    print(f"backend: {type(client).__name__}")
     print(f"ingest: {args.ingest}")
     print("")
 
     conditions = []
     if args.type:
-        conditions.append(
-            qm.FieldCondition(key="type", match=qm.MatchValue(value=args.type))
-        )
+        conditions.append(qm.FieldCondition(key="type", match=qm.MatchValue(value=args.type)))
     if args.topic:
-        conditions.append(
-            qm.FieldCondition(key="topic", match=qm.MatchValue(value=args.topic))
-        )
+        conditions.append(qm.FieldCondition(key="topic", match=qm.MatchValue(value=args.topic)))
     if args.source_file:
-        conditions.append(
-            qm.FieldCondition(
-                key="source_file", match=qm.MatchValue(value=args.source_file)
-            )
-        )
+        conditions.append(qm.FieldCondition(key="source_file", match=qm.MatchValue(value=args.source_file)))
 
     if args.count_only and not conditions:
-        print(
-            "ERROR: --count_only requires at least one filter (--type, --topic, or --source_file)"
-        )
+        print("ERROR: --count_only requires at least one filter (--type, --topic, or --source_file)")
         raise SystemExit(1)
 
     if args.count_only:
@@ -133,8 +275,21 @@ async def main_async() -> None:
         print("COUNT:", count_res.count)
         return
 
+    if args.requantize:
+        apply_quantization(client, collection, quantization)
+        print("REQUANTIZED:", quantization["mode"])
+        return
+
     embedding_model = GeminiEmbeddingModel(model_id=MODEL_ID)
 
+    if args.compare_quantization:
+        queries = load_eval_queries(Path(args.eval_queries))
+        query_vectors = [await embed_text(embedding_model, q) for q in queries]
+        report = compare_quantization(client, collection, query_vectors, args.topk, quantization["oversampling"])
+        print("QUANTIZATION COMPARISON")
+        print(json.dumps(report, indent=2))
+        return
+
     if args.ingest:
         if not INGEST_DIR.exists():
             raise FileNotFoundError(f"Missing ingest seed directory: {INGEST_DIR}")
@@ -144,67 +299,89 @@ async def main_async() -> None:
             raise FileNotFoundError(f"No .md files found in {INGEST_DIR}")
 
         print(f"files: {len(files)}")
+
+        sparse_available = ensure_collection(client, collection, quantization)
+        sparse_enabled = sparse_available and not args.dense_only
+        if not args.dense_only and not sparse_enabled:
+            print(f"WARNING: collection has no '{SPARSE_VECTOR_NAME}' sparse vector; ingesting dense only")
+        print(f"sparse: {sparse_enabled}")
+        print(f"quantization: {quantization['mode']}")
+        created_indexes = ensure_payload_indexes(client, collection, filterable_fields)
+        print(f"payload indexes: {filterable_fields} (created: {created_indexes or 'none'})")
         print("")
 
-        for p in files:
-            text = p.read_text(encoding="utf-8")
-            chunks = chunk_text(text, max_chars, overlap)
-            file_type, topic = match_file_rule(p.name, rules)
-
-            points: List[qm.PointStruct] = []
-            for idx, chunk in enumerate(chunks):
-                vec = await embed_text(embedding_model, chunk)
-                payload = {
-                    "type": file_type,
-                    "topic": topic,
-                    "source_file": p.name,
-                    "chunk_index": idx,
-                    "source_type": source_type,
-                    "language": language,
-                    "text": chunk,
-                }
-                point_id = stable_point_id(p.name, idx, chunk)
-                points.append(qm.PointStruct(id=point_id, vector=vec, payload=payload))
-
-            if points:
-                client.upsert(collection_name=collection, points=points)
-
-            total_chunks += len(chunks)
-            total_points += len(points)
-            print(f"- {p.name}: {len(chunks)} chunks")
+        ingested_payloads, total_chunks = await ingest_files(
+            client,
+            collection,
+            files,
+            embedding_model,
+            max_chars=max_chars,
+            overlap=overlap,
+            rules=rules,
+            source_type=source_type,
+            language=language,
+            sparse_enabled=sparse_enabled,
+        )
+        total_points = len(ingested_payloads)
 
         print("")
         print("SUMMARY")
         print("files:", len(files))
         print("total chunks:", total_chunks)
         print("upserted points:", total_points)
+
+        # Value counts for the planner's selectivity estimates (pre- vs post-filter choice), over the whole
+        # collection: points from earlier ingests of other files count too.
+        save_filter_stats(collection_filter_stats(client, collection, filterable_fields, planner_filter_fields(cfg)))
+        print("filter stats:", FILTER_STATS_PATH)
+        # Cached retrieval results from before this ingest are stale now.
+        points_count = client.count(collection_name=collection, exact=True).count
+        print("index version:", write_index_version(collection, points_count, cfg))
         print("")
 
     query_filter = qm.Filter(must=conditions) if conditions else None
 
     query_vec = await embed_text(embedding_model, args.query)
-    res = client.query_points(
-        collection_name=collection,
-        query=query_vec,
-        limit=args.topk,
-        with_payload=True,
-        query_filter=query_filter,
-    )
+    hybrid = not args.dense_only and has_sparse_vector(client, collection)
+    if hybrid:
+        res = hybrid_query_points(
+            client,
+            collection_name=collection,
+            dense=query_vec,
+            sparse=encode_query(args.query),
+            query_filter=query_filter,
+            limit=args.topk,
+            search_params=quantization_search_params(quantization),
+        )
+    else:
+        res = client.query_points(
+            collection_name=collection,
+            query=query_vec,
+            limit=args.topk,
+            with_payload=True,
+            query_filter=query_filter,
+            search_params=quantization_search_params(quantization),
+        )
     hits = res.points
 
     print("RETRIEVAL TEST")
     print("query:", args.query)
     print("topk:", args.topk)
+    print("mode:", "hybrid (dense + bm25, rrf)" if hybrid else "dense")
     print("")
     for hit in hits:
         payload = hit.payload or {}
         snippet = (payload.get("text", "")[:200]).replace("\n", " ")
         print("score:", hit.score)
         print(
-            "source_file:", payload.get("source_file"),
-            "type:", payload.get("type"),
-            "topic:", payload.get("topic"),
-            "chunk_index:", payload.get("chunk_index"),
+            "source_file:",
+            payload.get("source_file"),
+            "type:",
+            payload.get("type"),
+            "topic:",
+            payload.get("topic"),
+            "chunk_index:",
+            payload.get("chunk_index"),
         )
         print("snippet:", snippet)
         print("")
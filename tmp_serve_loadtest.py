@@ -0,0 +1,365 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from tmp_rag_quantization import percentile
+
+TARGETS = ("a2a", "mcp")
+DEFAULT_URLS = {"a2a": "http://127.0.0.1:9999", "mcp": "http://127.0.0.1:7777/mcp"}
+DEFAULT_PROMPTS = [
+    ("What's the current weather in Berlin?", 3.0),
+    ("Plan a rainy afternoon in Boston.", 1.0),
+    ("Hi!", 1.0),
+]
+FAIL_MARKER = "[fail]"  # the fake server's agent errors on prompts containing it
+
+
+class LoadError(Exception):
+    def __init__(self, kind: str, detail: str = "") -> None:
+        super().__init__(f"{kind}: {detail}" if detail else kind)
+        self.kind = kind
+
+
+def parse_prompt_mix(values: list[str] | None, path: str | None = None) -> list[tuple[str, float]]:
+    """
+    Prompt mix from `--prompt "text"` / `--prompt "text::weight"` values and/or a JSONL file of
+    {"prompt": ..., "weight": ...} lines (weight defaults to 1). Falls back to DEFAULT_PROMPTS.
+    """
+    mix: list[tuple[str, float]] = []
+    for value in values or []:
+        text, sep, weight = value.rpartition("::")
+        mix.append((text, float(weight)) if sep else (value, 1.0))
+    if path:
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                record = json.loads(line)
+                mix.append((record["prompt"], float(record.get("weight", 1.0))))
+    return mix or list(DEFAULT_PROMPTS)
+
+
+# --- deterministic fake server ---------------------------------------------------------------------------------
+
+
+def fake_agent(latency: float) -> Any:
+    """RequirementAgent on FakeChatModel: answers with the prompt it got after `latency` seconds, no tools."""
+    from beeai_framework.agents.requirement import RequirementAgent
+    from beeai_framework.backend import AssistantMessage, UserMessage
+    from beeai_framework.backend.message import MessageToolCallContent
+
+    from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+
+    def respond(messages: list[Any]) -> AssistantMessage:
+        prompt = [m.text for m in messages if isinstance(m, UserMessage)][-1]
+        if FAIL_MARKER in prompt:
+            raise RuntimeError("fake model failure")
+        args = json.dumps({"response": f"Echo: {prompt}"})
+        return AssistantMessage(MessageToolCallContent(id="call_final", tool_name="final_answer", args=args))
+
+    return RequirementAgent(llm=FakeChatModel(respond, latency=latency), name="FakeAgent", description="Echoes.")
+
+
+def serve_fake(target: str, port: int, latency: float) -> None:
+    """Blocking: serves fake_agent over A2A jsonrpc or MCP streamable-http on 127.0.0.1:`port`."""
+    agent = fake_agent(latency)
+    if target == "a2a":
+        from beeai_framework.adapters.a2a import A2AServer, A2AServerConfig
+        from beeai_framework.serve.utils import LRUMemoryManager
+
+        a2a = A2AServer(config=A2AServerConfig(port=port, protocol="jsonrpc"), memory_manager=LRUMemoryManager(1000))
+        a2a.register(agent)
+        a2a.serve()
+    else:
+        from beeai_framework.adapters.mcp import MCPServer, MCPServerConfig
+        from beeai_framework.adapters.mcp.serve.server import MCPSettings
+
+        settings = MCPSettings(port=port, log_level="WARNING")
+        mcp = MCPServer(config=MCPServerConfig(transport="streamable-http", settings=settings))
+        mcp.register_many([agent])
+        mcp.serve()
+
+
+def spawn_fake_server(target: str, port: int, latency: float) -> subprocess.Popen[bytes]:
+    command = [sys.executable, __file__, "--fake_server", target, "--port", str(port), "--latency", str(latency)]
+    return subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_ready(target: str, url: str, timeout: float = 30.0) -> None:
+    """Polls until the server answers (A2A: GET /health, MCP: a session initializes)."""
+    deadline = time.monotonic() + timeout
+    while True:
+        with contextlib.suppress(Exception):
+            if target == "a2a":
+                async with httpx.AsyncClient() as client:
+                    if (await client.get(f"{url.rstrip('/')}/health", timeout=1.0)).status_code == 200:
+                        return
+            else:
+                async with _mcp_session(url):
+                    return
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{target} server at {url} not ready after {timeout}s")
+        await asyncio.sleep(0.2)
+
+
+# --- clients ---------------------------------------------------------------------------------------------------
+
+Send = Callable[[str], Awaitable[None]]
+
+
+@contextlib.asynccontextmanager
+async def _a2a_client(url: str, timeout: float, stateful: bool) -> AsyncIterator[Send]:
+    """Raw JSON-RPC message/send, so the numbers include the server and HTTP only, not a client SDK."""
+    context_id = str(uuid.uuid4()) if stateful else None
+    async with httpx.AsyncClient(timeout=timeout) as client:
+
+        async def send(prompt: str) -> None:
+            message: dict[str, Any] = {
+                "kind": "message",
+                "role": "user",
+                "messageId": str(uuid.uuid4()),
+                "parts": [{"kind": "text", "text": prompt}],
+            }
+            if context_id:
+                message["contextId"] = context_id
+            payload = {"jsonrpc": "2.0", "id": str(uuid.uuid4()), "method": "message/send"}
+            response = await client.post(url, json={**payload, "params": {"message": message}})
+            if response.status_code != 200:
+                raise LoadError(f"http_{response.status_code}")
+            body = response.json()
+            if "error" in body:
+                raise LoadError("jsonrpc_error", str(body["error"].get("message", "")))
+            state = body.get("result", {}).get("status", {}).get("state", "completed")
+            if state != "completed":
+                raise LoadError(f"task_{state}")
+
+        yield send
+
+
+@contextlib.asynccontextmanager
+async def _mcp_session(url: str) -> AsyncIterator[Any]:
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    async with streamablehttp_client(url) as (read, write, _), ClientSession(read, write) as session:
+        await session.initialize()
+        yield session
+
+
+@contextlib.asynccontextmanager
+async def _mcp_client(url: str, timeout: float, tool: str | None) -> AsyncIterator[Send]:
+    """One MCP session per virtual user, calling the agent tool with {"input": prompt}."""
+    async with _mcp_session(url) as session:
+        tools = [t.name for t in (await session.list_tools()).tools]
+        name = tool or (tools[0] if len(tools) == 1 else None)
+        if name not in tools:
+            raise LoadError("no_tool", f"pick one of {tools} with --tool")
+
+        async def send(prompt: str) -> None:
+            result = await asyncio.wait_for(session.call_tool(name, {"input": prompt}), timeout)
+            if result.isError:
+                raise LoadError("tool_error")
+
+        yield send
+
+
+# --- load generation -------------------------------------------------------------------------------------------
+
+
+async def run_load(
+    target: str,
+    url: str,
+    *,
+    prompts: list[tuple[str, float]],
+    concurrency: int = 8,
+    requests: int | None = 100,
+    duration_s: float | None = None,
+    rate: float | None = None,
+    warmup: int = 0,
+    timeout: float = 60.0,
+    stateful: bool = False,
+    tool: str | None = None,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Closed loop: `concurrency` virtual users send back to back. With `rate` (req/s) request i is scheduled at
+    start + i / rate and its latency counts from that time, so a slow server is not hidden by users waiting.
+    Stops after `requests` measured requests or `duration_s` seconds, whichever comes first. Connecting the
+    users (MCP sessions) happens before the clock starts; a user that cannot connect counts as one error.
+    """
+    if not requests and duration_s is None:
+        raise ValueError("run_load needs a request count or a duration, or it never stops")
+    rng = random.Random(seed)
+    texts, weights = [p for p, _ in prompts], [w for _, w in prompts]
+    latencies: list[float] = []
+    errors: Counter[str] = Counter()
+    by_prompt: Counter[str] = Counter()
+    issued = 0
+    start = measured_start = 0.0
+
+    def next_request() -> tuple[int, str] | None:
+        nonlocal issued
+        elapsed = time.perf_counter() - start
+        if requests is not None and issued >= requests + warmup:
+            return None
+        if duration_s is not None and elapsed >= duration_s:
+            return None
+        issued += 1
+        return issued - 1, rng.choices(texts, weights)[0]
+
+    connecting = concurrency
+    started = asyncio.Event()
+
+    def connected() -> None:
+        # The clock starts once every user has connected (or failed to), so session setup is not measured.
+        nonlocal connecting, start, measured_start
+        connecting -= 1
+        if connecting == 0:
+            start = measured_start = time.perf_counter()
+            started.set()
+
+    async def user() -> None:
+        nonlocal measured_start
+        counted = False
+        try:
+            client = _a2a_client(url, timeout, stateful) if target == "a2a" else _mcp_client(url, timeout, tool)
+            async with client as send:
+                counted = True
+                connected()
+                await started.wait()
+                while (request := next_request()) is not None:
+                    index, prompt = request
+                    scheduled = start + index / rate if rate else time.perf_counter()
+                    if rate:
+                        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                    if index == warmup:
+                        measured_start = time.perf_counter()
+                    try:
+                        await send(prompt)
+                        failure = None
+                    except LoadError as e:
+                        failure = e.kind
+                    except TimeoutError:
+                        failure = "timeout"
+                    except Exception as e:
+                        failure = type(e).__name__
+                    if index < warmup:
+                        continue
+                    by_prompt[prompt] += 1
+                    if failure:
+                        errors[failure] += 1
+                    else:
+                        latencies.append((time.perf_counter() - scheduled) * 1000)
+        except Exception as e:
+            if not counted:  # the user could not connect at all
+                errors[f"connect_{e.kind if isinstance(e, LoadError) else type(e).__name__}"] += 1
+                connected()
+            else:
+                raise
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - measured_start
+
+    total = len(latencies) + sum(errors.values())
+    return {
+        "target": target,
+        "url": url,
+        "concurrency": concurrency,
+        "rate": rate,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": dict(errors),
+        "error_rate": round(sum(errors.values()) / total, 4) if total else 0.0,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            **{f"p{pct}": round(percentile(latencies, pct), 2) for pct in (50, 90, 95, 99)},
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "max": round(max(latencies), 2) if latencies else 0.0,
+        },
+        "prompt_mix": dict(by_prompt),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Load generator for the A2A (jsonrpc) and MCP (streamable-http) servers.",
+    )
+    parser.add_argument("--target", choices=TARGETS, default="a2a")
+    parser.add_argument("--url", default=None, help="Server URL (default: the starter's A2A / MCP address).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Virtual users sending back to back.")
+    parser.add_argument("--requests", type=int, default=100, help="Measured requests (0 = until --duration).")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds.")
+    parser.add_argument("--rate", type=float, default=None, help="Target requests per second across all users.")
+    parser.add_argument("--warmup", type=int, default=0, help="Requests sent first and not measured.")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--prompt", action="append", help='Prompt, optionally weighted: "text::3". Repeatable.')
+    parser.add_argument("--prompts", default=None, help='JSONL with {"prompt": ..., "weight": ...} lines.')
+    parser.add_argument("--stateful", action="store_true", help="A2A: each user keeps one context (session).")
+    parser.add_argument("--tool", default=None, help="MCP: tool to call when the server exposes several.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn_fake", action="store_true", help="Start a local fake-model server to measure.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake model latency in seconds.")
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--fake_server", choices=TARGETS, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--out", default=None, help="Also write the JSON report to this path.")
+    args = parser.parse_args()
+    if args.requests <= 0 and args.duration is None:
+        parser.error("--requests 0 runs until --duration; pass --duration or a positive --requests")
+    return args
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    url = args.url or DEFAULT_URLS[args.target]
+    server = None
+    if args.spawn_fake:
+        port = args.port or (19999 if args.target == "a2a" else 17777)
+        url = f"http://127.0.0.1:{port}" + ("/mcp" if args.target == "mcp" else "")
+        server = spawn_fake_server(args.target, port, args.latency)
+    try:
+        await wait_ready(args.target, url)
+        report = await run_load(
+            args.target,
+            url,
+            prompts=parse_prompt_mix(args.prompt, args.prompts),
+            concurrency=args.concurrency,
+            requests=args.requests or None,
+            duration_s=args.duration,
+            rate=args.rate,
+            warmup=args.warmup,
+            timeout=args.timeout,
+            stateful=args.stateful,
+            tool=args.tool,
+            seed=args.seed,
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+
+
+def main() -> None:
+    args = parse_args()
+    if args.fake_server:  # the server runs its own event loop
+        serve_fake(args.fake_server, args.port, args.latency)
+        return
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
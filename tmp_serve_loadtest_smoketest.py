@@ -0,0 +1,74 @@
+import asyncio
+import socket
+import subprocess
+import sys
+
+from tmp_serve_loadtest import parse_prompt_mix, run_load, spawn_fake_server, wait_ready
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _sane(report, requests):
+    latency = report["latency_ms"]
+    ordered = latency["p50"] <= latency["p90"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+    return report["requests"] == requests and ordered and report["throughput_rps"] > 0
+
+
+async def main():
+    all_ok = True
+
+    mix = parse_prompt_mix(["Weather in Berlin?::3", "Hi!"])
+    print(f"[MIX] {mix} default={len(parse_prompt_mix(None))}")
+    all_ok &= mix == [("Weather in Berlin?", 3.0), ("Hi!", 1.0)] and len(parse_prompt_mix(None)) == 3
+
+    servers = []
+    try:
+        for target in ("a2a", "mcp"):
+            port = _free_port()
+            url = f"http://127.0.0.1:{port}" + ("/mcp" if target == "mcp" else "")
+            servers.append(spawn_fake_server(target, port, latency=0.01))
+            await wait_ready(target, url)
+
+            prompts = [("hello", 3.0), ("boom [fail]", 1.0)]
+            report = await run_load(target, url, prompts=prompts, concurrency=4, requests=24, warmup=2)
+            failures = sum(report["errors"].values())
+            print(f"[{target.upper()}] ok={report['ok']} errors={report['errors']} rps={report['throughput_rps']}")
+            all_ok &= _sane(report, 24) and failures == report["prompt_mix"].get("boom [fail]", 0) > 0
+
+            paced = await run_load(target, url, prompts=[("hello", 1.0)], concurrency=4, requests=10, rate=20)
+            print(f"[{target.upper()}_RATE] duration_s={paced['duration_s']} ok={paced['ok']}")
+            all_ok &= paced["ok"] == 10 and paced["duration_s"] >= 0.45
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait(timeout=10)
+
+    down = await run_load("a2a", f"http://127.0.0.1:{_free_port()}", prompts=mix, concurrency=2, requests=4)
+    print(f"[DOWN] errors={down['errors']} error_rate={down['error_rate']}")
+    all_ok &= down["ok"] == 0 and down["error_rate"] == 1.0 and down["errors"].get("ConnectError") == 4
+
+    # --requests 0 only stops on --duration; without one the run would never end
+    unbounded = subprocess.run(
+        [sys.executable, "tmp_serve_loadtest.py", "--requests", "0"], capture_output=True, text=True, timeout=60
+    )
+    try:
+        await run_load("a2a", "http://127.0.0.1:1", prompts=mix, requests=0)
+        rejected = False
+    except ValueError:
+        rejected = True
+    print(f"[UNBOUNDED] cli_exit={unbounded.returncode} run_load_rejected={rejected}")
+    all_ok &= unbounded.returncode == 2 and "--duration" in unbounded.stderr and rejected
+
+    if all_ok:
+        print("[OK] serve loadtest smoketest: 7/7 passed")
+        return 0
+    print("[FAIL] serve loadtest smoketest")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
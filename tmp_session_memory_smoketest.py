@@ -0,0 +1,93 @@
+import asyncio
+import json
+import re
+import sys
+
+from beeai_framework.agents.requirement import RequirementAgent
+from beeai_framework.backend import AssistantMessage, SystemMessage, UserMessage
+from beeai_framework.backend.message import MessageToolCallContent
+from beeai_framework.memory import UnconstrainedMemory
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from beeai_framework_starter.helpers.fake_chat_model import FakeChatModel
+from beeai_framework_starter.helpers.session_memory import BoundedSessionMemory, estimate_tokens
+
+prompt_tokens: list[int] = []
+
+
+def _answer(messages):
+    """Agent model: records the prompt size and answers with a long-ish reply."""
+    prompt_tokens.append(sum(estimate_tokens(m) for m in messages))
+    question = [m.text for m in messages if isinstance(m, UserMessage)][-1]
+    args = json.dumps({"response": f"Here is a detailed answer to '{question}'. " + "Lorem ipsum dolor sit. " * 20})
+    return AssistantMessage(MessageToolCallContent(id="call_final", tool_name="final_answer", args=args))
+
+
+def _summarize(messages):
+    """Summarizer model: keeps the questions it was shown (the prompt repeats the previous summary)."""
+    return "; ".join(dict.fromkeys(re.findall(r"Question \d+\?", messages[-1].text)))
+
+
+async def _chat(memory, turns):
+    agent = RequirementAgent(llm=FakeChatModel(_answer), memory=memory)
+    for turn in range(turns):
+        await agent.run(f"Question {turn}?")
+
+
+def _recorded(reader, name):
+    for resource_metrics in reader.get_metrics_data().resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                if metric.name == name:
+                    return metric.data.data_points
+    return []
+
+
+async def main():
+    all_ok = True
+    reader = InMemoryMetricReader()
+    meter = MeterProvider(metric_readers=[reader]).get_meter("smoke")
+    summarizer = FakeChatModel(_summarize)
+    options = {"max_turns": 3, "max_tokens": 1000}
+
+    unbounded = UnconstrainedMemory()
+    await _chat(unbounded, 12)
+    unbounded_prompts = prompt_tokens[:]
+    prompt_tokens.clear()
+
+    memory = BoundedSessionMemory(summarizer, options, meter=meter)
+    await _chat(memory, 12)
+    users = [m.text for m in memory.messages if isinstance(m, UserMessage)]
+    print(f"[WINDOW] kept={users} tokens={memory.tokens} summaries={summarizer.calls}")
+    all_ok &= users == [f"Your task: Question {turn}?" for turn in (9, 10, 11)]
+    all_ok &= memory.tokens <= options["max_tokens"]
+
+    summaries = [m for m in memory.messages if isinstance(m, SystemMessage)]
+    print(f"[SUMMARY] count={len(summaries)} summary={memory.summary!r}")
+    all_ok &= len(summaries) == 1 and memory.messages[0] is summaries[0]
+    all_ok &= all(f"Question {turn}?" in memory.summary for turn in range(9))
+
+    print(f"[FLAT] bounded={prompt_tokens[3:]} unbounded_last={unbounded_prompts[-1]}")
+    all_ok &= max(prompt_tokens[4:]) - min(prompt_tokens[4:]) < 100 and prompt_tokens[-1] * 2 < unbounded_prompts[-1]
+
+    session = await memory.clone()
+    session.reset()
+    await session.add(UserMessage("Fresh session"))
+    print(f"[CLONE] session={[m.text for m in session.messages]} original_kept={len(memory.messages)}")
+    all_ok &= [m.text for m in session.messages] == ["Fresh session"] and len(memory.messages) > 1
+
+    points = _recorded(reader, "agent.memory.tokens")
+    summarizations = sum(point.value for point in _recorded(reader, "agent.memory.summarizations"))
+    print(f"[METRICS] tokens_max={points[0].max if points else None} summarizations={summarizations}")
+    all_ok &= bool(points) and points[0].max <= options["max_tokens"] and summarizations == summarizer.calls
+
+    if all_ok:
+        print("[OK] session memory smoketest: 5/5 passed")
+        return 0
+    print("[FAIL] session memory smoketest")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))